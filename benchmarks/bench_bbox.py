@@ -0,0 +1,94 @@
+"""Bounding-box query latency with the R*Tree spatial index versus a full scan.
+
+    python -m benchmarks.bench_bbox --events 1000000
+
+Events are spread uniformly over a 1000 x 1000 plane. Each box size is queried with
+crud.count_events and crud.list_events (first page of 50), once with the spatial
+index enabled and once with SPATIAL_INDEX_MAX_CANDIDATES = 0, which forces the scan.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+BOX_SIDES = [1, 10, 50, 200, 1000]
+
+
+def seed(conn, n_events: int) -> None:
+    from src.event_tracker import crud
+
+    rng = random.Random(42)
+    batch = []
+    for i in range(n_events):
+        batch.append(
+            (
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+                f"label_{rng.randint(0, 19)}",
+                None,
+                rng.uniform(0, 1000),
+                rng.uniform(0, 1000),
+                None,
+            )
+        )
+        if len(batch) == 50000:
+            crud.insert_event_rows(conn, batch)
+            batch.clear()
+    crud.insert_event_rows(conn, batch)
+    conn.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = os.path.join(tmp, "bench.db")
+
+        from src.event_tracker import crud
+        from src.event_tracker.db import get_conn, init_db
+
+        init_db()
+        conn = get_conn()
+        started = time.perf_counter()
+        seed(conn, args.events)
+        print(f"seeded {args.events} events in {time.perf_counter() - started:.1f}s")
+        print(
+            f"{'box':>10} {'matches':>9} {'count scan':>11} {'count idx':>10} {'page scan':>10} {'page idx':>9}  (ms)"
+        )
+
+        default_candidates = crud.SPATIAL_INDEX_MAX_CANDIDATES
+        for side in BOX_SIDES:
+            box = {"min_x": 100.0, "max_x": 100.0 + side, "min_y": 100.0, "max_y": 100.0 + side}
+            results = {}
+            for mode, candidates in (("scan", 0), ("idx", default_candidates)):
+                crud.SPATIAL_INDEX_MAX_CANDIDATES = candidates
+                results[f"count {mode}"] = timed(
+                    lambda: crud.count_events(conn, **box), args.repeat
+                )
+                results[f"page {mode}"] = timed(
+                    lambda: crud.list_events(conn, limit=50, **box), args.repeat
+                )
+            crud.SPATIAL_INDEX_MAX_CANDIDATES = default_candidates
+            matches = crud.count_events(conn, **box)
+            print(
+                f"{side:>4}x{side:<5} {matches:>9} {results['count scan']:>11.2f} {results['count idx']:>10.2f}"
+                f" {results['page scan']:>10.2f} {results['page idx']:>9.2f}"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
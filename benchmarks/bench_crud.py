@@ -0,0 +1,228 @@
+"""Micro-benchmarks of the crud functions and CSV conversion on synthetic data.
+
+    python -m benchmarks.bench_crud --events 1000000 --json crud.json
+    python -m benchmarks.bench_crud --db /tmp/bench-10m.db --json crud-10m.json
+
+Seeds a temporary database with benchmarks.synthetic (or reuses a seeded --db)
+and times every case --repeat times after --warmup untimed calls, calling crud
+directly on one connection. Write cases (create/delete) run last and delete what
+they created; --skip-writes leaves a shared --db untouched. --hot-window N
+answers queries over the newest N events from the in-memory hot window (needs numpy).
+
+Before timing, the query plans of the ORDERED_CASES are checked: if one of them
+sorts its rows instead of reading them in index order, the run stops with an error.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Any, Callable
+
+from benchmarks.results import print_table, summarize, write_results
+
+# Read cases whose pages must be read in ts index order; sorting in a temp B-tree would
+# read every matching event for one page, so the case slows down as the table grows
+ORDERED_CASES = (
+    "list_events newest",
+    "list_events label",
+    "list_events source",
+    "list_events one month",
+    "list_events cursor mid",
+    "list_events offset 10000",
+)
+
+
+def sample(fn: Callable[[], Any], repeat: int, warmup: int) -> list[float]:
+    """Per-call latencies in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def sorted_statements(conn, fn: Callable[[], Any]) -> list[str]:
+    """SELECT statements run by a call whose query plan sorts rows in a temp B-tree"""
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    return [
+        statement
+        for statement in statements
+        if statement.lstrip().upper().startswith("SELECT")
+        and any(
+            "USE TEMP B-TREE FOR ORDER BY" in row[3]
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")
+        )
+    ]
+
+
+def read_cases(conn, rng: random.Random) -> list[tuple[str, Callable[[], Any]]]:
+    """(name, call) for every read path the API uses"""
+    from src.event_tracker import crud, csv_export, export, partitions, timestamps
+
+    last_id = conn.execute("SELECT value FROM event_meta WHERE key = 'last_id'").fetchone()[0]
+    middle = crud.get_event(conn, last_id // 2) or crud.list_events(conn, limit=1)[0]
+    after = (timestamps.to_micros(middle["ts"]), middle["id"])
+    month = middle["ts"][:7]
+    one_month = {
+        "start": f"{month}-01T00:00:00",
+        "end": timestamps.to_iso(timestamps.month_start(partitions.next_month(month)) - 1),
+    }
+    one_day = {"start": f"{middle['ts'][:10]}T00:00:00", "end": f"{middle['ts'][:10]}T23:59:59"}
+    box = {"min_x": 400.0, "max_x": 450.0, "min_y": 400.0, "max_y": 450.0}
+    rows_for_csv = crud.list_events(conn, limit=10000)
+
+    def export_day() -> int:
+        return sum(len(chunk) for chunk in csv_export.iter_csv(crud.iter_events(conn, **one_day)))
+
+    return [
+        ("get_event", lambda: crud.get_event(conn, rng.randint(1, last_id))),
+        ("list_events newest", lambda: crud.list_events(conn, limit=50)),
+        ("list_events label", lambda: crud.list_events(conn, limit=50, label="label_3")),
+        ("list_events source", lambda: crud.list_events(conn, limit=50, source="camera")),
+        (
+            "list_events label list",
+            lambda: crud.list_events(conn, limit=50, label=["label_0", "label_1", "label_7"]),
+        ),
+        (
+            "list_events source+label",
+            lambda: crud.list_events(conn, limit=50, label="label_2", source="manual"),
+        ),
+        ("list_events one month", lambda: crud.list_events(conn, limit=50, **one_month)),
+        ("list_events bbox", lambda: crud.list_events(conn, limit=50, **box)),
+        ("list_events search", lambda: crud.list_events(conn, limit=50, q="kitchen")),
+        ("list_events cursor mid", lambda: crud.list_events(conn, limit=50, after=after)),
+        ("list_events offset 10000", lambda: crud.list_events(conn, limit=50, offset=10000)),
+        ("count_events all", lambda: crud.count_events(conn)),
+        ("count_events label", lambda: crud.count_events(conn, label="label_3")),
+        ("count_events one month", lambda: crud.count_events(conn, **one_month)),
+        ("count_events bbox", lambda: crud.count_events(conn, **box)),
+        ("count_events capped", lambda: crud.count_events(conn, cap=10000, source="camera")),
+        ("event_stats day", lambda: crud.event_stats(conn, interval="day")),
+        (
+            "event_stats hour by label, month",
+            lambda: crud.event_stats(conn, interval="hour", group_by=["label"], **one_month),
+        ),
+        ("event_stats day bbox", lambda: crud.event_stats(conn, interval="day", **box)),
+        ("events_after last 1000", lambda: crud.events_after(conn, last_id - 1000)),
+        ("iter_events+iter_csv one day", export_day),
+        ("events_to_csv 10000 rows", lambda: csv_export.events_to_csv(rows_for_csv)),
+        (
+            "export ndjson one day",
+            lambda: sum(
+                len(chunk)
+                for chunk in export.iter_export(crud.iter_events(conn, **one_day), "ndjson", "none")
+            ),
+        ),
+    ]
+
+
+def write_cases(
+    conn, rng: random.Random
+) -> tuple[list[tuple[str, Callable[[], Any]]], Callable[[], None]]:
+    """(name, call) for the write paths, and a cleanup deleting the events they left behind"""
+    from src.event_tracker import crud
+    from src.event_tracker.schemas import EventCreate
+
+    created: list[int] = []
+
+    def event() -> EventCreate:
+        return EventCreate(
+            ts=f"2026-06-{rng.randint(1, 28):02d}T12:00:00",
+            label=f"label_{rng.randint(0, 9)}",
+            x=rng.uniform(0, 1000),
+            y=rng.uniform(0, 1000),
+        )
+
+    def create_one() -> None:
+        created.append(crud.create_event(conn, event())["id"])
+
+    def create_batch() -> None:
+        created.extend(crud.create_events(conn, [event() for _ in range(1000)]))
+
+    def delete_one() -> None:
+        crud.delete_event(conn, created.pop())
+
+    def cleanup() -> None:
+        while created:
+            delete_one()
+
+    cases = [
+        ("create_event", create_one),
+        ("create_events 1000", create_batch),
+        ("delete_event", delete_one),
+    ]
+    return cases, cleanup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument(
+        "--db", help="reuse a database seeded by benchmarks.synthetic instead of seeding one"
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-writes", action="store_true")
+    parser.add_argument(
+        "--hot-window", type=int, default=0, help="EVENTS_HOT_WINDOW_EVENTS for the run"
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = args.db or os.path.join(tmp, "bench.db")
+        os.environ["EVENTS_HOT_WINDOW_EVENTS"] = str(args.hot_window)
+
+        from benchmarks.synthetic import seed_events
+        from src.event_tracker.db import get_conn, init_db
+
+        init_db()
+        conn = get_conn()
+        if not args.db:
+            started = time.perf_counter()
+            seed_events(conn, args.events, seed=args.seed)
+            print(f"seeded {args.events} events in {time.perf_counter() - started:.1f}s")
+        n_events = conn.execute("SELECT COALESCE(SUM(n), 0) FROM event_label_counts").fetchone()[0]
+
+        rng = random.Random(args.seed)
+        results = {}
+        cases = read_cases(conn, rng)
+        for name, fn in cases:
+            if name in ORDERED_CASES and sorted_statements(conn, fn):
+                raise SystemExit(f"{name} sorts its rows instead of reading the ts index in order")
+        cleanup = None
+        if not args.skip_writes:
+            writes, cleanup = write_cases(conn, rng)
+            cases += writes
+        for name, fn in cases:
+            results[name] = summarize(sample(fn, args.repeat, args.warmup))
+        if cleanup is not None:
+            cleanup()
+        conn.close()
+
+    print_table(results)
+    if args.json:
+        params = {
+            "events": n_events,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "writes": not args.skip_writes,
+            "hot_window": args.hot_window,
+        }
+        write_results(args.json, "crud", params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Export size and speed per format and compression, scaled to one million rows.
+
+    python -m benchmarks.bench_export --events 200000
+
+Each combination streams every event through export.iter_export straight from a
+SQLite cursor, the same path GET /events/export uses. Combinations whose optional
+package (pyarrow, zstandard) is missing are skipped.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+COMBINATIONS = [
+    ("csv", "none"),
+    ("csv", "gzip"),
+    ("csv", "zstd"),
+    ("ndjson", "none"),
+    ("ndjson", "gzip"),
+    ("ndjson", "zstd"),
+    ("arrow", "none"),
+    ("arrow", "zstd"),
+    ("parquet", "none"),
+    ("parquet", "zstd"),
+]
+
+
+def seed(conn, n_events: int) -> None:
+    from src.event_tracker import crud
+
+    rng = random.Random(42)
+    batch = []
+    for _ in range(n_events):
+        batch.append(
+            (
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+                f"label_{rng.randint(0, 19)}",
+                rng.choice([None, "", "observed in the field", "automatic detection"]),
+                rng.uniform(0, 1000),
+                rng.uniform(0, 1000),
+                rng.choice(["manual", "video", "sensor", None]),
+            )
+        )
+        if len(batch) == 50000:
+            crud.insert_event_rows(conn, batch)
+            batch.clear()
+    crud.insert_event_rows(conn, batch)
+    conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = os.path.join(tmp, "bench.db")
+
+        from src.event_tracker import crud, export
+        from src.event_tracker.db import get_conn, init_db
+
+        init_db()
+        conn = get_conn()
+        seed(conn, args.events)
+        scale = 1000000 / args.events
+        print(f"{'format':<10} {'compression':<12} {'MB / 1M rows':>13} {'s / 1M rows':>12}")
+        for fmt, compression in COMBINATIONS:
+            try:
+                export.check_available(fmt, compression)
+            except export.ExportUnavailable as exc:
+                print(f"{fmt:<10} {compression:<12} skipped: {exc}")
+                continue
+            started = time.perf_counter()
+            size = sum(
+                len(chunk) for chunk in export.iter_export(crud.iter_events(conn), fmt, compression)
+            )
+            elapsed = time.perf_counter() - started
+            print(
+                f"{fmt:<10} {compression:<12} {size * scale / 1e6:>13.1f} {elapsed * scale:>12.2f}"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
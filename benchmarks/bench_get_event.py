@@ -0,0 +1,90 @@
+"""Requests/sec on GET /events/{id} with and without the connection pool.
+
+    python -m benchmarks.bench_get_event --events 10000 --requests 5000
+
+Runs the app in-process through TestClient, so absolute numbers include the test
+client's overhead; the difference between the two runs is the cost of opening a
+new sqlite3 connection per request.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+
+def unpooled_with_connection(fn, *args, **kwargs):
+    """The pre-pool behaviour: one new connection per database call"""
+    from src.event_tracker.db import get_conn
+
+    conn = get_conn()
+    try:
+        return fn(conn, *args, **kwargs)
+    finally:
+        conn.close()
+
+
+def seed(n_events: int) -> None:
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+    from src.event_tracker.schemas import EventCreate
+
+    conn = get_conn()
+    events = [
+        EventCreate(
+            ts=f"2026-01-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+            label=f"label_{i % 20}",
+            x=float(i),
+            y=float(i),
+        )
+        for i in range(n_events)
+    ]
+    crud.create_events(conn, events)
+    conn.close()
+
+
+def run(client: TestClient, n_requests: int, n_events: int) -> float:
+    ids = [random.randint(1, n_events) for _ in range(n_requests)]
+    started = time.perf_counter()
+    for event_id in ids:
+        response = client.get(f"/events/{event_id}")
+        assert response.status_code == 200
+    return n_requests / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = os.path.join(tmp, "bench.db")
+
+        from src.event_tracker import aio
+        from src.event_tracker.db import close_pool, init_db
+        from src.event_tracker.main import app
+
+        init_db()
+        seed(args.events)
+        with TestClient(app) as client:
+            pooled_with_connection = aio._with_connection
+            aio._with_connection = unpooled_with_connection
+            run(client, 200, args.events)
+            unpooled = run(client, args.requests, args.events)
+
+            aio._with_connection = pooled_with_connection
+            run(client, 200, args.events)
+            pooled = run(client, args.requests, args.events)
+        close_pool()
+
+    print(f"new connection per request: {unpooled:8.0f} req/s")
+    print(f"pooled connections:         {pooled:8.0f} req/s")
+    print(f"speedup:                    {pooled / unpooled:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""GET /events?q= latency from the FTS5 index versus a LIKE scan of the descriptions.
+
+    python -m benchmarks.bench_search --events 1000000
+
+Descriptions are drawn from a vocabulary with a few common and many rare words.
+Each query runs the first page (50 rows) plus the total count through crud, the
+same calls GET /events makes.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+COMMON = ["sensor", "door", "alarm", "motion", "camera"]
+RARE = [f"code{n:04d}" for n in range(2000)]
+
+QUERIES = [
+    ("common word", {"q": "sensor"}, "%sensor%"),
+    ("rare word", {"q": "code0042"}, "%code0042 %"),
+    ("prefix", {"q": "code004*"}, "%code004%"),
+    ("two words", {"q": "alarm code0042"}, None),
+    (
+        "rare word, one month",
+        {"q": "code0042", "start": "2026-03-01T00:00:00", "end": "2026-03-31T23:59:59"},
+        None,
+    ),
+    ("rare word, relevance", {"q": "code0042", "sort": "relevance"}, None),
+]
+
+
+def seed(conn, n_events: int) -> None:
+    from src.event_tracker import crud
+
+    rng = random.Random(42)
+    batch = []
+    for _ in range(n_events):
+        words = rng.sample(COMMON, 2) + [rng.choice(RARE) for _ in range(2)]
+        rng.shuffle(words)
+        batch.append(
+            (
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+                f"label_{rng.randint(0, 19)}",
+                " ".join(words) + " ",
+                None,
+                None,
+                None,
+            )
+        )
+        if len(batch) == 50000:
+            crud.insert_event_rows(conn, batch)
+            batch.clear()
+    crud.insert_event_rows(conn, batch)
+    conn.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = os.path.join(tmp, "bench.db")
+
+        from src.event_tracker import crud
+        from src.event_tracker.db import get_conn, init_db
+
+        init_db()
+        conn = get_conn()
+        started = time.perf_counter()
+        seed(conn, args.events)
+        print(f"seeded {args.events} events in {time.perf_counter() - started:.1f}s")
+
+        def search(query: dict) -> None:
+            filters = {key: value for key, value in query.items() if key != "sort"}
+            crud.list_events(conn, limit=50, **query)
+            crud.count_events(conn, **filters)
+
+        def scan(pattern: str) -> None:
+            conn.execute(
+                "SELECT * FROM events WHERE description LIKE ? ORDER BY ts DESC, id DESC LIMIT 50",
+                (pattern,),
+            ).fetchall()
+            conn.execute(
+                "SELECT COUNT(*) FROM events WHERE description LIKE ?", (pattern,)
+            ).fetchone()
+
+        print(f"{'query':<28} {'matches':>9} {'fts ms':>9} {'LIKE ms':>9}")
+        for name, query, pattern in QUERIES:
+            matches = crud.count_events(
+                conn, **{key: value for key, value in query.items() if key != "sort"}
+            )
+            fts = timed(lambda: search(query), args.repeat)
+            like = f"{timed(lambda: scan(pattern), args.repeat):>9.1f}" if pattern else f"{'-':>9}"
+            print(f"{name:<28} {matches:>9} {fts:>9.1f} {like}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
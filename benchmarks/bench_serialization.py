@@ -0,0 +1,136 @@
+"""CPU time per list page: the old dict/jsonable_encoder path against the tuple fast path.
+
+    python -m benchmarks.bench_serialization --events 100000 --json serialization.json
+
+Seeds a temporary database with benchmarks.synthetic (or reuses a seeded --db) and,
+for every page size, measures the process CPU time of fetching one GET /events page
+and encoding its body:
+
+  dict+jsonable_encoder  crud.list_events rows encoded the way FastAPI does for a
+                         response_model (what GET /events did before fastjson)
+  pydantic model         EventListResponse validation and model_dump_json
+  tuples+fastjson        crud.list_event_rows and fastjson.encode_page (orjson if installed)
+  tuples+fastjson stdlib the same with the json module fallback
+
+The `saved_ms` of each fast-path case is the p50 CPU time it saves per page over
+dict+jsonable_encoder.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable
+
+from benchmarks.results import print_table, summarize, write_results
+
+
+def sample_cpu(fn: Callable[[], Any], repeat: int, warmup: int) -> list[float]:
+    """Per-call process CPU time in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        fn()
+        samples.append((time.process_time() - started) * 1000)
+    return samples
+
+
+def page_cases(conn, limit: int) -> list[tuple[str, Callable[[], Any]]]:
+    """(name, call) producing the JSON body of one page of `limit` events"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from src.event_tracker import crud, fastjson
+    from src.event_tracker.schemas import EventListResponse
+
+    page = {"total": None, "total_exact": True, "limit": limit, "offset": 0, "next_cursor": None}
+
+    def old_path() -> bytes:
+        items = crud.list_events(conn, limit=limit)
+        return JSONResponse(jsonable_encoder({**page, "items": items})).body
+
+    def model_path() -> bytes:
+        items = crud.list_events(conn, limit=limit)
+        return EventListResponse.model_validate({**page, "items": items}).model_dump_json().encode()
+
+    def fast_path() -> bytes:
+        return fastjson.encode_page(crud.list_event_rows(conn, limit=limit), **page)
+
+    def stdlib_path() -> bytes:
+        orjson, fastjson.orjson = fastjson.orjson, None
+        try:
+            return fastjson.encode_page(crud.list_event_rows(conn, limit=limit), **page)
+        finally:
+            fastjson.orjson = orjson
+
+    cases = [
+        (f"page {limit}: dict+jsonable_encoder", old_path),
+        (f"page {limit}: pydantic model", model_path),
+        (f"page {limit}: tuples+fastjson stdlib", stdlib_path),
+    ]
+    if fastjson.orjson is not None:
+        cases.append((f"page {limit}: tuples+fastjson orjson", fast_path))
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument(
+        "--db", help="reuse a database seeded by benchmarks.synthetic instead of seeding one"
+    )
+    parser.add_argument(
+        "--limit", type=int, action="append", help="page size (repeatable); default 50 and 200"
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    limits = args.limit or [50, 200]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = args.db or os.path.join(tmp, "bench.db")
+        # Time the serialization work itself, not the instrumentation around it
+        os.environ["EVENTS_METRICS"] = "0"
+
+        from benchmarks.synthetic import seed_events
+        from src.event_tracker.db import get_conn, init_db
+
+        init_db()
+        conn = get_conn()
+        if not args.db:
+            seed_events(conn, args.events, seed=args.seed)
+
+        results = {}
+        for limit in limits:
+            cases = page_cases(conn, limit)
+            baseline = None
+            for name, fn in cases:
+                summary = summarize(sample_cpu(fn, args.repeat, args.warmup))
+                if baseline is None:
+                    baseline = summary["p50_ms"]
+                else:
+                    summary["saved_ms"] = round(baseline - summary["p50_ms"], 4)
+                results[name] = summary
+        conn.close()
+
+    print_table(results)
+    for name, summary in results.items():
+        if "saved_ms" in summary:
+            print(f"{name}: saves {summary['saved_ms']:.3f} ms CPU per page")
+    if args.json:
+        params = {
+            "events": args.events,
+            "limits": limits,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        }
+        write_results(args.json, "serialization", params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""GET /events/stats latency from hourly rollups versus raw-event aggregation.
+
+    python -m benchmarks.bench_stats --events 1000000
+
+Events are spread over one year. Each query runs through crud.event_stats with
+USE_ROLLUPS on and off.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+QUERIES = [
+    ("day, whole year", {"interval": "day"}),
+    (
+        "hour by label, one month",
+        {
+            "interval": "hour",
+            "group_by": ["label"],
+            "start": "2026-03-01T00:00:00",
+            "end": "2026-03-31T23:59:59",
+        },
+    ),
+    (
+        "day by label+source, mid-hour range",
+        {
+            "interval": "day",
+            "group_by": ["label", "source"],
+            "start": "2026-02-10T07:30:00",
+            "end": "2026-09-20T16:45:00",
+        },
+    ),
+    ("hour, one label", {"interval": "hour", "label": "label_3"}),
+]
+
+
+def seed(conn, n_events: int) -> None:
+    from src.event_tracker import crud
+
+    rng = random.Random(42)
+    batch = []
+    for _ in range(n_events):
+        batch.append(
+            (
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+                f"label_{rng.randint(0, 4)}",
+                None,
+                rng.uniform(0, 1000),
+                rng.uniform(0, 1000),
+                rng.choice(["manual", "video", "sensor"]),
+            )
+        )
+        if len(batch) == 50000:
+            crud.insert_event_rows(conn, batch)
+            batch.clear()
+    crud.insert_event_rows(conn, batch)
+    conn.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = os.path.join(tmp, "bench.db")
+
+        from src.event_tracker import crud
+        from src.event_tracker.db import get_conn, init_db
+
+        init_db()
+        conn = get_conn()
+        seed(conn, args.events)
+        print(f"{'query':<40} {'raw ms':>9} {'rollup ms':>10}")
+        for name, query in QUERIES:
+            crud.USE_ROLLUPS = False
+            raw = timed(lambda: crud.event_stats(conn, **query), args.repeat)
+            crud.USE_ROLLUPS = True
+            rollup = timed(lambda: crud.event_stats(conn, **query), args.repeat)
+            print(f"{name:<40} {raw:>9.1f} {rollup:>10.1f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
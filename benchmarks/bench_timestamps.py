@@ -0,0 +1,202 @@
+"""Range queries and index size with ts stored as ISO 8601 text versus integer microseconds.
+
+    python -m benchmarks.bench_timestamps --events 1000000 --json timestamps.json
+
+Fills two tables shaped like a month partition with the same benchmarks.synthetic
+rows: one keeps ts as the ISO 8601 text databases stored before the integer
+timestamps, the other as INTEGER microseconds since 1970 UTC. Both get a partition's
+(ts), (label, ts) and (source, ts) indexes. Every query runs against both:
+
+  count day / week  COUNT(*) over a ts range, answered from the ts index
+  label week        COUNT(*) of one label over a range, from the (label, ts) index
+  page day          the newest 50 events of a day, ts returned as ISO text
+  hourly day        per-hour counts over a day
+  read 10000        the newest 10000 events, ts returned as ISO text (the integer
+                    table converts it in SQLite, as crud does)
+
+The `speedup` of each integer case is the text p50 over the integer p50. Then the
+bytes of every table and index are printed (from SQLite's dbstat table, when built in).
+"""
+
+import argparse
+import itertools
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+from benchmarks.results import print_table, summarize, write_results
+
+# Declared ts type of each compared table
+LAYOUTS = {"text": "TEXT", "integer": "INTEGER"}
+
+
+def sample(fn: Callable[[], Any], repeat: int, warmup: int) -> list[float]:
+    """Per-call latencies in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def build(conn: sqlite3.Connection, n_events: int, seed: int, months: int) -> None:
+    """Create and fill the text and integer tables with the same events"""
+    from benchmarks.synthetic import generate_rows
+    from src.event_tracker.timestamps import to_micros
+
+    for layout, ts_type in LAYOUTS.items():
+        table = f"events_{layout}"
+        conn.execute(
+            f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, ts {ts_type} NOT NULL, label TEXT NOT NULL, "
+            "description TEXT, x REAL, y REAL, source TEXT)"
+        )
+    rows = generate_rows(n_events, seed=seed, months=months)
+    while True:
+        batch = list(itertools.islice(rows, 50000))
+        if not batch:
+            break
+        conn.executemany(
+            "INSERT INTO events_text (ts, label, description, x, y, source) VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        conn.executemany(
+            "INSERT INTO events_integer (ts, label, description, x, y, source) VALUES (?, ?, ?, ?, ?, ?)",
+            [(to_micros(ts), *rest) for ts, *rest in batch],
+        )
+    for layout in LAYOUTS:
+        table = f"events_{layout}"
+        conn.execute(f"CREATE INDEX {table}_ts ON {table} (ts)")
+        conn.execute(f"CREATE INDEX {table}_label_ts ON {table} (label, ts)")
+        conn.execute(f"CREATE INDEX {table}_source_ts ON {table} (source, ts)")
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def query_cases(conn: sqlite3.Connection) -> list[tuple[str, dict[str, Callable[[], Any]]]]:
+    """(name, {layout: call}) running the same query against both tables"""
+    from src.event_tracker.timestamps import HOUR, floor_sql, iso_sql, to_micros
+
+    middle = conn.execute(
+        "SELECT ts FROM events_text ORDER BY ts LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM events_text)"
+    ).fetchone()[0]
+    day = (f"{middle[:10]}T00:00:00", f"{middle[:10]}T23:59:59")
+    week_end = conn.execute(
+        "SELECT ts FROM events_text WHERE ts >= ? ORDER BY ts LIMIT 1 OFFSET (SELECT COUNT(*) / 50 FROM events_text)",
+        (middle,),
+    ).fetchone()[0]
+    week = (middle, week_end)
+    label = conn.execute(
+        "SELECT label FROM events_text GROUP BY label ORDER BY COUNT(*) DESC LIMIT 1 OFFSET 3"
+    ).fetchone()[0]
+
+    bounds = {"text": lambda bound: bound, "integer": to_micros}
+    hour_sql = {"text": "substr(ts, 1, 13)", "integer": floor_sql("ts", HOUR)}
+    ts_sql = {"text": "ts", "integer": iso_sql("ts")}
+
+    def query(layout: str, sql: str, params: tuple) -> Callable[[], Any]:
+        table = f"events_{layout}"
+        statement = sql.format(table=table, hour=hour_sql[layout], ts=ts_sql[layout])
+        values = tuple(
+            bounds[layout](value) if isinstance(value, str) and value[:4].isdigit() else value
+            for value in params
+        )
+        return lambda: conn.execute(statement, values).fetchall()
+
+    specs = [
+        ("count day", "SELECT COUNT(*) FROM {table} WHERE ts >= ? AND ts <= ?", day),
+        ("count week", "SELECT COUNT(*) FROM {table} WHERE ts >= ? AND ts <= ?", week),
+        (
+            "label week",
+            "SELECT COUNT(*) FROM {table} WHERE label = ? AND ts >= ? AND ts <= ?",
+            (label, *week),
+        ),
+        (
+            "page day",
+            "SELECT id, {ts}, label, description, x, y, source FROM {table} WHERE ts >= ? AND ts <= ? ORDER BY ts DESC, id DESC LIMIT 50",
+            day,
+        ),
+        (
+            "hourly day",
+            "SELECT {hour}, COUNT(*) FROM {table} WHERE ts >= ? AND ts <= ? GROUP BY 1",
+            day,
+        ),
+        (
+            "read 10000",
+            "SELECT id, {ts}, label, description, x, y, source FROM {table} ORDER BY ts DESC, id DESC LIMIT 10000",
+            (),
+        ),
+    ]
+    return [
+        (name, {layout: query(layout, sql, params) for layout in LAYOUTS})
+        for name, sql, params in specs
+    ]
+
+
+def object_sizes(conn: sqlite3.Connection) -> Optional[dict[str, int]]:
+    """Bytes of every table and index, or None when SQLite was built without dbstat"""
+    try:
+        rows = conn.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name LIKE 'events_%' GROUP BY name ORDER BY name"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    return {name: size for name, size in rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument(
+        "--months", type=int, default=1, help="months the events span; 1 is one partition's worth"
+    )
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        started = time.perf_counter()
+        build(conn, args.events, args.seed, args.months)
+        print(f"seeded {args.events} events twice in {time.perf_counter() - started:.1f}s")
+
+        results: dict[str, dict] = {}
+        for name, calls in query_cases(conn):
+            text = summarize(sample(calls["text"], args.repeat, args.warmup))
+            integer = summarize(sample(calls["integer"], args.repeat, args.warmup))
+            integer["speedup"] = (
+                round(text["p50_ms"] / integer["p50_ms"], 2) if integer["p50_ms"] else None
+            )
+            results[f"{name}: text"] = text
+            results[f"{name}: integer"] = integer
+        sizes = object_sizes(conn)
+        conn.close()
+
+    print_table(results)
+    for name, summary in results.items():
+        if "speedup" in summary:
+            print(f"{name}: {summary['speedup']}x the text p50")
+    if sizes is not None:
+        print(f"{'object':<28} {'bytes':>14}")
+        for name, size in sizes.items():
+            print(f"{name:<28} {size:>14}")
+    if args.json:
+        params = {
+            "events": args.events,
+            "months": args.months,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        }
+        sized = {f"size {name}": {"bytes": size} for name, size in (sizes or {}).items()}
+        write_results(args.json, "timestamps", params, {**results, **sized})
+
+
+if __name__ == "__main__":
+    main()
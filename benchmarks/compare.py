@@ -0,0 +1,62 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+A benchmark regresses when its p50 (or --metric) latency grew by more than
+--threshold percent. Exits with status 1 if anything regressed, so it can gate CI.
+"""
+
+import argparse
+import sys
+
+from benchmarks.results import read_results
+
+
+def compare(
+    baseline: dict, candidate: dict, metric: str = "p50_ms", threshold: float = 10.0
+) -> tuple[list[tuple], list[str]]:
+    """Rows of (name, old, new, change %, regressed) for benchmarks in both files, and the regressed names"""
+    rows = []
+    regressed = []
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or not old.get(metric) or new.get(metric) is None:
+            continue
+        change = (new[metric] - old[metric]) / old[metric] * 100
+        is_regression = change > threshold
+        rows.append((name, old[metric], new[metric], change, is_regression))
+        if is_regression:
+            regressed.append(name)
+    return rows, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--metric", default="p50_ms", choices=["min_ms", "p50_ms", "p90_ms", "p99_ms", "mean_ms"]
+    )
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    baseline, candidate = read_results(args.baseline), read_results(args.candidate)
+    if baseline["suite"] != candidate["suite"]:
+        parser.error(f"Cannot compare suite {baseline['suite']!r} with {candidate['suite']!r}")
+    if baseline["params"] != candidate["params"]:
+        print("warning: the runs used different parameters", file=sys.stderr)
+
+    rows, regressed = compare(baseline, candidate, args.metric, args.threshold)
+    old_commit = (baseline["environment"].get("commit") or "?")[:10]
+    new_commit = (candidate["environment"].get("commit") or "?")[:10]
+    width = max((len(row[0]) for row in rows), default=9)
+    print(f"{'benchmark':<{width}} {old_commit:>12} {new_commit:>12} {'change':>8}")
+    for name, old, new, change, is_regression in rows:
+        print(
+            f"{name:<{width}} {old:>12.3f} {new:>12.3f} {change:>+7.1f}%{'  REGRESSION' if is_regression else ''}"
+        )
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""HTTP load driver for the API endpoints: p50/p99 latency and throughput per scenario.
+
+    python -m benchmarks.load_http --events 1000000 --concurrency 32 --duration 10 --json http.json
+    python -m benchmarks.load_http --url http://127.0.0.1:8000 --scenario list_label --scenario mixed
+    python -m benchmarks.load_http --workers 1 --workers 2 --workers 4 --client-procs 4 --scenario list_label
+
+Without --url it seeds a database with benchmarks.synthetic (or uses --db) and
+starts uvicorn on it in a subprocess. Each scenario then runs for --duration
+seconds with --concurrency clients issuing requests back to back (closed loop),
+so throughput is what the server sustains at that concurrency. Only 2xx and 304
+responses count as successes; everything else is reported under `errors`.
+
+Repeating --workers restarts the server with each number of worker processes and
+reports every scenario per count, with its `scaling`: throughput relative to the
+first count. The clients share one process unless --client-procs spreads them over
+several; give the load generator enough cores, or it is what stops scaling.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+
+import httpx
+
+from benchmarks.results import print_table, summarize, write_results
+
+# (method, path, query params, JSON body) of one request
+Request = tuple[str, str, Optional[dict], Any]
+
+
+def _box(rng: random.Random, size: float) -> dict:
+    x, y = rng.uniform(0, 1000 - size), rng.uniform(0, 1000 - size)
+    return {"min_x": x, "max_x": x + size, "min_y": y, "max_y": y + size}
+
+
+def _day(rng: random.Random) -> dict:
+    day = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    return {"start": f"{day}T00:00:00", "end": f"{day}T23:59:59"}
+
+
+def _event(rng: random.Random) -> dict:
+    return {
+        "ts": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+        "label": f"label_{rng.randint(0, 49)}",
+        "x": rng.uniform(0, 1000),
+        "y": rng.uniform(0, 1000),
+        "source": "load",
+    }
+
+
+def scenarios(max_id: int) -> dict[str, Callable[[random.Random], Request]]:
+    """Request factories by scenario name"""
+    reads: dict[str, Callable[[random.Random], Request]] = {
+        "get_event": lambda rng: ("GET", f"/events/{rng.randint(1, max_id)}", None, None),
+        "list_newest": lambda rng: ("GET", "/events", {"limit": 50}, None),
+        "list_label": lambda rng: (
+            "GET",
+            "/events",
+            {"label": f"label_{rng.randint(0, 49)}", "limit": 50},
+            None,
+        ),
+        "list_day_page": lambda rng: (
+            "GET",
+            "/events",
+            {**_day(rng), "limit": 50, "offset": rng.randint(0, 5) * 50},
+            None,
+        ),
+        "list_bbox": lambda rng: ("GET", "/events", {**_box(rng, 20), "limit": 50}, None),
+        "search": lambda rng: (
+            "GET",
+            "/events",
+            {"q": rng.choice(["kitchen", "door alarm", "pump*", "unit042"]), "limit": 50},
+            None,
+        ),
+        "stats_day": lambda rng: (
+            "GET",
+            "/events/stats",
+            {"interval": "day", "group_by": "label"},
+            None,
+        ),
+        "export_day": lambda rng: ("GET", "/events/export", {**_day(rng), "format": "csv"}, None),
+    }
+    writes: dict[str, Callable[[random.Random], Request]] = {
+        "create": lambda rng: ("POST", "/events", None, _event(rng)),
+        "bulk_100": lambda rng: ("POST", "/events/bulk", None, [_event(rng) for _ in range(100)]),
+    }
+    read_names = ["get_event", "list_newest", "list_label", "list_day_page", "list_bbox", "search"]
+
+    def mixed(rng: random.Random) -> Request:
+        # Read-mostly traffic: nine reads for every write
+        if rng.random() < 0.1:
+            return writes["create"](rng)
+        return reads[rng.choice(read_names)](rng)
+
+    return {**reads, **writes, "mixed": mixed}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[random.Random], Request],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> tuple[list[float], dict[str, int], float]:
+    """Drive one scenario: (latency samples of successes in ms, error counts, seconds elapsed)"""
+    samples: list[float] = []
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(rng: random.Random) -> None:
+        while time.perf_counter() < deadline:
+            method, path, params, body = make_request(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                await response.aread()
+                status = str(response.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            elapsed = (time.perf_counter() - started) * 1000
+            if status.startswith("2") or status == "304":
+                samples.append(elapsed)
+            else:
+                errors[status] = errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + i)) for i in range(concurrency)))
+    return samples, errors, time.perf_counter() - started
+
+
+def client_process(
+    url: str, name: str, max_id: int, concurrency: int, duration: float, seed: int
+) -> tuple[list[float], dict[str, int], float]:
+    """run_scenario with its own HTTP client; the entry point of each --client-procs process"""
+
+    async def run() -> tuple[list[float], dict[str, int], float]:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            return await run_scenario(client, scenarios(max_id)[name], concurrency, duration, seed)
+
+    return asyncio.run(run())
+
+
+def merge(parts: list[tuple[list[float], dict[str, int], float]]) -> dict[str, Any]:
+    """Summarize the samples of every client process over the longest of their run times"""
+    samples = [sample for part_samples, _, _ in parts for sample in part_samples]
+    errors: dict[str, int] = {}
+    for _, part_errors, _ in parts:
+        for status, count in part_errors.items():
+            errors[status] = errors.get(status, 0) + count
+    if not samples:
+        return {
+            "n": 0,
+            "p50_ms": float("nan"),
+            "p99_ms": float("nan"),
+            "ops_per_s": 0.0,
+            "errors": errors,
+        }
+    return summarize(samples, max(elapsed for _, _, elapsed in parts), errors=errors)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path: str, workers: int) -> tuple[subprocess.Popen, str]:
+    """Start uvicorn with `workers` processes on the database and wait until /health answers"""
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.event_tracker.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "EVENTS_DB_PATH": db_path},
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30s")
+
+
+def drive(
+    url: str, names: list[str], concurrency: int, duration: float, seed: int, client_procs: int = 1
+) -> dict[str, dict]:
+    """Run the scenarios one after another, the clients split over `client_procs` processes"""
+    newest = httpx.get(
+        f"{url}/events", params={"limit": 1, "include_total": "false"}, timeout=60
+    ).json()["items"]
+    max_id = newest[0]["id"] if newest else 1
+    unknown = [name for name in names if name not in scenarios(max_id)]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios {unknown}, expected some of {list(scenarios(max_id))}")
+    shares = [
+        share
+        for share in (
+            concurrency // client_procs + (i < concurrency % client_procs)
+            for i in range(client_procs)
+        )
+        if share
+    ]
+    results = {}
+    with (
+        multiprocessing.get_context("spawn").Pool(len(shares))
+        if len(shares) > 1
+        else nullcontext() as pool
+    ):
+        for name in names:
+            jobs = [
+                (url, name, max_id, share, duration, seed + 1000 * i)
+                for i, share in enumerate(shares)
+            ]
+            parts = (
+                pool.starmap(client_process, jobs)
+                if pool is not None
+                else [client_process(*jobs[0])]
+            )
+            results[name] = merge(parts)
+            print(f"  {name}: {results[name]['ops_per_s']} req/s", file=sys.stderr)
+    return results
+
+
+def scaling(per_count: dict[int, dict[str, dict]]) -> dict[str, dict]:
+    """Results per scenario and worker count, each with its throughput relative to the first count"""
+    first = next(iter(per_count.values()))
+    results = {}
+    for workers, counted in per_count.items():
+        for name, summary in counted.items():
+            base = first[name]["ops_per_s"]
+            results[f"{name} @ {workers} workers"] = {
+                **summary,
+                "scaling": round(summary["ops_per_s"] / base, 2) if base else None,
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one")
+    parser.add_argument(
+        "--db", help="serve a database seeded by benchmarks.synthetic instead of seeding one"
+    )
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        action="append",
+        help="uvicorn worker processes for the started server (repeatable); default 1",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--client-procs",
+        type=int,
+        default=1,
+        help="processes the --concurrency clients are spread over",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument(
+        "--scenario", action="append", help="scenario to run (repeatable); default all"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    names = args.scenario or list(scenarios(1))
+    worker_counts = args.workers or [1]
+    params = {
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "seed": args.seed,
+        "workers": worker_counts if len(worker_counts) > 1 else worker_counts[0],
+        "client_procs": args.client_procs,
+    }
+    if args.url:
+        results = drive(
+            args.url, names, args.concurrency, args.duration, args.seed, args.client_procs
+        )
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = args.db or os.path.join(tmp, "bench.db")
+            if not args.db:
+                os.environ["EVENTS_DB_PATH"] = db_path
+                from benchmarks.synthetic import seed_events
+                from src.event_tracker.db import get_conn, init_db
+
+                init_db()
+                conn = get_conn()
+                started = time.perf_counter()
+                seed_events(conn, args.events, seed=args.seed)
+                conn.close()
+                print(
+                    f"seeded {args.events} events in {time.perf_counter() - started:.1f}s",
+                    file=sys.stderr,
+                )
+                params["events"] = args.events
+            per_count = {}
+            for workers in worker_counts:
+                print(f"{workers} worker process(es)", file=sys.stderr)
+                server, url = start_server(db_path, workers)
+                try:
+                    per_count[workers] = drive(
+                        url, names, args.concurrency, args.duration, args.seed, args.client_procs
+                    )
+                finally:
+                    server.terminate()
+                    server.wait()
+            results = scaling(per_count) if len(worker_counts) > 1 else per_count[worker_counts[0]]
+
+    print_table(results)
+    for name, summary in results.items():
+        if "scaling" in summary:
+            print(f"{name}: {summary['scaling']}x the throughput of {worker_counts[0]} worker(s)")
+    if args.json:
+        write_results(args.json, "http", params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark result files: latency summaries plus the commit and machine they came from.
+
+Every suite writes one JSON document:
+
+    {"suite": "crud", "environment": {...}, "params": {...},
+     "results": {"list_events newest": {"p50_ms": ..., "p99_ms": ..., ...}, ...}}
+
+Compare two of them with `python -m benchmarks.compare old.json new.json`.
+"""
+
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict[str, Any]:
+    """Commit, interpreter, SQLite and machine details stored with every result file"""
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float("nan")
+    rank = min(len(sorted_values), max(1, math.ceil(q / 100 * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+def summarize(
+    samples_ms: list[float], elapsed_s: Optional[float] = None, **extra: Any
+) -> dict[str, Any]:
+    """Latency percentiles of per-call samples and calls per second.
+
+    Without `elapsed_s` the calls ran one after another, so throughput is the
+    inverse of the mean latency; load drivers pass their wall-clock time instead.
+    """
+    ordered = sorted(samples_ms)
+    total_ms = sum(ordered)
+    if elapsed_s is None:
+        elapsed_s = total_ms / 1000
+    return {
+        "n": len(ordered),
+        "min_ms": round(ordered[0], 4) if ordered else None,
+        "p50_ms": round(percentile(ordered, 50), 4),
+        "p90_ms": round(percentile(ordered, 90), 4),
+        "p99_ms": round(percentile(ordered, 99), 4),
+        "max_ms": round(ordered[-1], 4) if ordered else None,
+        "mean_ms": round(total_ms / len(ordered), 4) if ordered else None,
+        "ops_per_s": round(len(ordered) / elapsed_s, 1) if elapsed_s else None,
+        **extra,
+    }
+
+
+def write_results(path: str, suite: str, params: dict[str, Any], results: dict[str, dict]) -> None:
+    """Save a suite's results with its parameters and environment"""
+    document = {"suite": suite, "environment": environment(), "params": params, "results": results}
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+    print(f"wrote {path}", file=sys.stderr)
+
+
+def read_results(path: str) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def print_table(results: dict[str, dict]) -> None:
+    """One line per benchmark with its latency percentiles and throughput"""
+    width = max((len(name) for name in results), default=4)
+    print(f"{'benchmark':<{width}} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>10}")
+    for name, summary in results.items():
+        print(
+            f"{name:<{width}} {summary['p50_ms']:>10.3f} {summary['p99_ms']:>10.3f} {summary['ops_per_s'] or 0:>10.1f}"
+        )
@@ -0,0 +1,161 @@
+"""Synthetic event generator with realistic label, time and position distributions.
+
+    python -m benchmarks.synthetic --events 10000000 --db /tmp/bench-10m.db
+
+Seeds a database the other benchmarks can reuse with --db, since seeding tens of
+millions of rows takes minutes. Rows are deterministic for a given --seed:
+
+- labels follow a Zipf distribution (a few labels are most of the events),
+- timestamps arrive in order over --months months with a daytime peak,
+- x/y cluster around a few hotspots, and some events have no position,
+- sources are mostly set, and about a third of the events have a description.
+"""
+
+import argparse
+import bisect
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator
+
+# Relative event volume per hour of day, lowest at night and peaking in the afternoon
+HOURLY_WEIGHTS = [2, 1, 1, 1, 1, 2, 4, 7, 9, 10, 10, 10, 9, 10, 11, 12, 12, 11, 9, 7, 5, 4, 3, 2]
+
+SOURCES = ["camera", "sensor", "manual", "import", None]
+SOURCE_WEIGHTS = [45, 30, 10, 5, 10]
+
+WORDS = [
+    "sensor",
+    "door",
+    "alarm",
+    "motion",
+    "camera",
+    "crack",
+    "rust",
+    "leak",
+    "smoke",
+    "noise",
+    "pressure",
+    "valve",
+    "pump",
+    "north",
+    "south",
+    "corridor",
+    "kitchen",
+    "office",
+    "loading",
+    "dock",
+]
+
+SEED_BATCH_SIZE = 50000
+
+
+def _cumulative(weights: list[float]) -> list[float]:
+    return list(itertools.accumulate(weights))
+
+
+def _day_fraction_warp() -> list[float]:
+    """Cumulative share of a day's events at the end of each hour"""
+    total = sum(HOURLY_WEIGHTS)
+    return [share / total for share in _cumulative(HOURLY_WEIGHTS)]
+
+
+def generate_rows(
+    n_events: int,
+    seed: int = 42,
+    start: str = "2026-01-01T00:00:00",
+    months: int = 12,
+    n_labels: int = 50,
+) -> Iterator[tuple]:
+    """Yield (ts, label, description, x, y, source) tuples in timestamp order"""
+    rng = random.Random(seed)
+    begin = datetime.fromisoformat(start)
+    end = begin
+    for _ in range(months):
+        end = (end.replace(day=1) + timedelta(days=32)).replace(day=1)
+    n_days = (end - begin).days
+    day_warp = _day_fraction_warp()
+
+    labels = [f"label_{i}" for i in range(n_labels)]
+    label_weights = _cumulative([1 / (rank + 1) ** 1.1 for rank in range(n_labels)])
+    source_weights = _cumulative(SOURCE_WEIGHTS)
+    hotspots = [(rng.uniform(0, 1000), rng.uniform(0, 1000), rng.uniform(10, 80)) for _ in range(8)]
+
+    step = n_days / max(n_events, 1)
+    for i in range(n_events):
+        # Spread events evenly over the days, then move each within its day by the hourly profile
+        position = (i + rng.random()) * step
+        day = int(position)
+        fraction = position - day
+        hour = min(bisect.bisect_right(day_warp, fraction), 23)
+        low = day_warp[hour - 1] if hour else 0.0
+        within_hour = (fraction - low) / (day_warp[hour] - low)
+        ts = begin + timedelta(days=day, hours=hour, seconds=int(within_hour * 3600))
+
+        if rng.random() < 0.1:
+            x = y = None
+        else:
+            center_x, center_y, spread = hotspots[int(rng.random() * len(hotspots))]
+            x = min(max(rng.gauss(center_x, spread), 0.0), 1000.0)
+            y = min(max(rng.gauss(center_y, spread), 0.0), 1000.0)
+
+        description = None
+        if rng.random() < 0.3:
+            description = " ".join(rng.sample(WORDS, 3)) + f" unit{rng.randint(0, 999):03d}"
+
+        yield (
+            ts.isoformat(timespec="seconds"),
+            rng.choices(labels, cum_weights=label_weights)[0],
+            description,
+            x,
+            y,
+            rng.choices(SOURCES, cum_weights=source_weights)[0],
+        )
+
+
+def seed_events(
+    conn, n_events: int, seed: int = 42, months: int = 12, progress: bool = False
+) -> None:
+    """Insert generated events through crud in batched transactions"""
+    from src.event_tracker import crud
+
+    started = time.perf_counter()
+    rows = generate_rows(n_events, seed=seed, months=months)
+    inserted = 0
+    while True:
+        batch = list(itertools.islice(rows, SEED_BATCH_SIZE))
+        if not batch:
+            break
+        crud.insert_event_rows(conn, batch)
+        conn.commit()
+        inserted += len(batch)
+        if progress and inserted % (SEED_BATCH_SIZE * 20) == 0:
+            print(
+                f"  {inserted} events, {inserted / (time.perf_counter() - started):.0f}/s",
+                flush=True,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--db", required=True, help="database file to create and seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--months", type=int, default=12)
+    args = parser.parse_args()
+
+    os.environ["EVENTS_DB_PATH"] = args.db
+    from src.event_tracker.db import get_conn, init_db
+
+    init_db()
+    conn = get_conn()
+    started = time.perf_counter()
+    seed_events(conn, args.events, seed=args.seed, months=args.months, progress=True)
+    conn.close()
+    print(f"seeded {args.events} events into {args.db} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
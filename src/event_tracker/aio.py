@@ -0,0 +1,314 @@
+import asyncio
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, TypeVar
+
+from src.event_tracker import crud, export, importer
+from src.event_tracker.cache import EventCache, ResultCache, get_event_cache
+from src.event_tracker.db import get_pool
+from src.event_tracker.filters import EventFilters
+from src.event_tracker.hub import Subscription, get_hub
+from src.event_tracker.metrics import CallStats, get_metrics
+from src.event_tracker.pool import ConnectionPool
+from src.event_tracker.schemas import EventCreate
+
+T = TypeVar("T")
+
+
+class DBOverloaded(Exception):
+    """Raised when a lane already has as many calls queued or running as it accepts"""
+
+
+class DBExecutor:
+    """A lane of dedicated threads for blocking SQLite calls made from async endpoints.
+
+    The lane runs at most `workers` calls at once and admits at most `max_pending`
+    calls (running plus queued); beyond that callers get DBOverloaded right away
+    instead of piling up. Lanes are independent, so a busy lane never delays another.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int) -> None:
+        if workers < 1 or max_pending < workers:
+            raise ValueError("A lane needs at least one worker and max_pending >= workers")
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"db-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._completed = 0
+
+    @contextmanager
+    def admission(self) -> Iterator[None]:
+        """Hold one of the lane's `max_pending` slots, or raise DBOverloaded"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise DBOverloaded(f"Too many pending {self.name} database calls")
+            self._pending += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    async def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking function on the lane's threads without admission control"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def call_admitted(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking function on the lane's threads, subject to admission control"""
+        with self.admission():
+            return await self.call(fn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn(conn, *args, **kwargs)` with a pooled connection on the lane's threads"""
+        return await self.call_admitted(_with_connection, fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        """Snapshot of the lane's load"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        """Wait for running calls to finish and stop the threads"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _acquire(pool: ConnectionPool) -> sqlite3.Connection:
+    """Check out a connection, recording the wait when metrics are enabled"""
+    metrics = get_metrics()
+    if metrics is None:
+        return pool.acquire()
+    started = time.perf_counter()
+    conn = pool.acquire()
+    metrics.observe("events_db_acquire_duration_seconds", time.perf_counter() - started)
+    return conn
+
+
+def _with_connection(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call `fn` with a connection checked out of the shared pool (runs on a lane thread)"""
+    pool = get_pool()
+    conn = _acquire(pool)
+    try:
+        metrics = get_metrics()
+        if metrics is None:
+            return fn(conn, *args, **kwargs)
+        with metrics.track_call(fn.__name__):
+            return fn(conn, *args, **kwargs)
+    finally:
+        pool.release(conn)
+
+
+def _charged(stats: CallStats, fn: Callable[..., T], *args: Any) -> T:
+    """Call `fn`, adding its time and SQL work to `stats` when metrics are enabled"""
+    metrics = get_metrics()
+    if metrics is None:
+        return fn(*args)
+    with metrics.charge(stats):
+        return fn(*args)
+
+
+_lanes: dict[str, DBExecutor] = {}
+_lanes_lock = threading.Lock()
+
+# Lane settings: (workers env var, default), (max pending env var, default)
+_LANE_CONFIG = {
+    "interactive": (("EVENTS_DB_WORKERS", 4), ("EVENTS_DB_MAX_PENDING", 256)),
+    "heavy": (("EVENTS_DB_HEAVY_WORKERS", 2), ("EVENTS_DB_HEAVY_MAX_PENDING", 4)),
+}
+
+
+def get_lane(name: str) -> DBExecutor:
+    """Get (creating on first use) the `interactive` or `heavy` lane.
+
+    Point reads and writes use `interactive`; exports, aggregations and bulk writes use
+    `heavy`, so they cannot starve small requests. Sizes come from EVENTS_DB_WORKERS,
+    EVENTS_DB_MAX_PENDING, EVENTS_DB_HEAVY_WORKERS and EVENTS_DB_HEAVY_MAX_PENDING.
+    A streaming export keeps its connection between chunks, so EVENTS_DB_POOL_SIZE
+    should be at least EVENTS_DB_WORKERS + EVENTS_DB_HEAVY_MAX_PENDING.
+    """
+    with _lanes_lock:
+        lane = _lanes.get(name)
+        if lane is None:
+            (workers_var, workers), (pending_var, pending) = _LANE_CONFIG[name]
+            lane = DBExecutor(
+                name,
+                workers=int(os.environ.get(workers_var, workers)),
+                max_pending=int(os.environ.get(pending_var, pending)),
+            )
+            _lanes[name] = lane
+        return lane
+
+
+def lane_stats() -> dict:
+    """Load snapshot of every lane started so far"""
+    with _lanes_lock:
+        return {name: lane.stats() for name, lane in _lanes.items()}
+
+
+def shutdown_lanes() -> None:
+    """Stop all lanes, waiting for running calls"""
+    with _lanes_lock:
+        lanes = list(_lanes.values())
+        _lanes.clear()
+    for lane in lanes:
+        lane.shutdown()
+
+
+async def create_event(event_create: EventCreate) -> dict:
+    """Async crud.create_event"""
+    return await get_lane("interactive").run(crud.create_event, event_create)
+
+
+async def create_events(events: list[EventCreate]) -> list[int]:
+    """Async crud.create_events"""
+    return await get_lane("heavy").run(crud.create_events, events)
+
+
+def _get_cached_event(cache: EventCache, event_id: int) -> Optional[dict]:
+    """crud.get_event through the event cache (runs on a lane thread).
+
+    A lookup first checks the database for deletes by other processes, so it runs
+    here next to the read of a miss rather than on the event loop.
+    """
+    event = cache.get(event_id)
+    if event is not None:
+        return event
+    epoch = cache.epoch
+    event = _with_connection(crud.get_event, event_id)
+    if event is not None:
+        cache.put(event, epoch)
+    return event
+
+
+async def get_event(event_id: int) -> Optional[dict]:
+    """Async crud.get_event, answered from the event cache when possible"""
+    cache = get_event_cache()
+    if cache is None:
+        return await get_lane("interactive").run(crud.get_event, event_id)
+    return await get_lane("interactive").call_admitted(_get_cached_event, cache, event_id)
+
+
+async def result_generation(results: ResultCache, lane: str = "interactive") -> int:
+    """Async ResultCache.generation, on the lane that runs the query it keys.
+
+    Reading the generation checks the database for other connections' commits, so
+    it must not run on the event loop.
+    """
+    return await get_lane(lane).call_admitted(results.generation)
+
+
+async def delete_event(event_id: int) -> bool:
+    """Async crud.delete_event"""
+    return await get_lane("interactive").run(crud.delete_event, event_id)
+
+
+async def list_events(**filters: Any) -> list[dict]:
+    """Async crud.list_events"""
+    return await get_lane("interactive").run(crud.list_events, **filters)
+
+
+async def list_event_rows(**filters: Any) -> list[tuple]:
+    """Async crud.list_event_rows"""
+    return await get_lane("interactive").run(crud.list_event_rows, **filters)
+
+
+async def count_events(**filters: Any) -> int:
+    """Async crud.count_events"""
+    return await get_lane("interactive").run(crud.count_events, **filters)
+
+
+async def events_after(after_id: int, **filters: Any) -> list[dict]:
+    """Async crud.events_after"""
+    return await get_lane("interactive").run(crud.events_after, after_id, **filters)
+
+
+def _publish_committed() -> None:
+    """Stream follower poll: publish events other processes committed (runs on the hub's thread)"""
+    with get_pool().connection() as conn:
+        crud.publish_committed(conn)
+
+
+async def subscribe_events(event_filters: EventFilters) -> Subscription:
+    """Async crud.subscribe_events; also makes the hub follow events committed by other processes"""
+    subscription = await get_lane("interactive").run(
+        crud.subscribe_events, asyncio.get_running_loop(), event_filters
+    )
+    get_hub().follow(_publish_committed)
+    return subscription
+
+
+async def event_stats(**filters: Any) -> list[dict]:
+    """Async crud.event_stats"""
+    return await get_lane("heavy").run(crud.event_stats, **filters)
+
+
+def _import_binary(conn: sqlite3.Connection, stream: Any, fmt: str, **options: Any) -> dict:
+    """Decode a binary upload as UTF-8 text and import it"""
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    try:
+        return importer.import_stream(conn, text, fmt, **options)
+    finally:
+        text.detach()
+
+
+async def import_events(stream: Any, fmt: str, **options: Any) -> dict:
+    """Async importer.import_stream over a binary file object, on the heavy lane"""
+    return await get_lane("heavy").run(_import_binary, stream, fmt, **options)
+
+
+async def iter_events_export(
+    fmt: str = "csv", compression: str = "none", **filters: Any
+) -> AsyncIterator[bytes]:
+    """Stream matching events in an export format, fetching each chunk on the heavy lane.
+
+    The stream holds one lane admission slot and one pooled connection until it is
+    exhausted or closed, but only occupies a lane thread while a chunk is fetched.
+    The first chunk (the format header) is produced only after the query has started,
+    so callers can await it to surface overload and query errors before responding.
+    """
+    export.check_available(fmt, compression)
+    lane = get_lane("heavy")
+    with lane.admission():
+        pool = get_pool()
+        conn: sqlite3.Connection = await lane.call(_acquire, pool)
+        cursor: Optional[sqlite3.Cursor] = None
+        # The query runs and its rows are fetched while chunks are produced, so its SQL
+        # time is split out of the serialization time over the whole export
+        stats = CallStats()
+        try:
+            cursor = await lane.call(_charged, stats, partial(crud.iter_events, conn, **filters))
+            chunks = await lane.call(_charged, stats, export.iter_export, cursor, fmt, compression)
+            while True:
+                chunk = await lane.call(_charged, stats, next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            if cursor is not None:
+                cursor.close()
+            pool.release(conn)
+            metrics = get_metrics()
+            if metrics is not None:
+                metrics.record_call("iter_events", stats)
+                metrics.observe(
+                    "events_serialize_duration_seconds",
+                    stats.seconds - stats.sql_seconds,
+                    format=fmt,
+                )
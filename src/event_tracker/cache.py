@@ -0,0 +1,328 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from src.event_tracker.db import get_db_path
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with an optional per-entry time to live"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Return the cached value, or None on a miss or an expired entry"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Any) -> None:
+        """Drop one entry if present"""
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Size and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class DataVersionWatch:
+    """Notices commits made by any other connection, including other processes.
+
+    Keeps one private connection and polls PRAGMA data_version, which only changes
+    when another connection has committed. When it changes, the counters in
+    event_meta are re-read and `on_change(key, old, new)` is called for each one
+    that moved.
+    """
+
+    def __init__(
+        self, db_path: str, keys: tuple[str, ...], on_change: Callable[[str, int, int], None]
+    ) -> None:
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._keys = keys
+        self._on_change = on_change
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._values = self._read_values()
+
+    def _read_values(self) -> dict[str, int]:
+        """Current value of every watched counter"""
+        placeholders = ", ".join("?" for _ in self._keys)
+        rows = self._conn.execute(
+            f"SELECT key, value FROM event_meta WHERE key IN ({placeholders})", self._keys
+        )
+        return dict(rows.fetchall())
+
+    def check(self) -> None:
+        """Poll for external commits and report any counter that has moved"""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            old, self._values = self._values, self._read_values()
+            for key in self._keys:
+                if self._values.get(key) != old.get(key):
+                    self._on_change(key, old.get(key, 0), self._values.get(key, 0))
+
+    def value(self, key: str) -> int:
+        """Last value read for a watched counter"""
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def close(self) -> None:
+        """Close the private connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class EventCache:
+    """Read-through cache of single events by id.
+
+    Events never change after insert, so an entry only goes stale when its event is
+    deleted. Every delete bumps the delete_gen counter in event_meta. Deletes made
+    through crud.delete_event report the generation they produced and invalidate
+    their own entry; any other bump the DataVersionWatch notices on a lookup (a
+    delete from another worker process, say) cannot be traced to ids, so the whole
+    cache is cleared.
+    """
+
+    def __init__(
+        self, db_path: str, maxsize: int, ttl: Optional[float], fill_on_create: bool
+    ) -> None:
+        self.db_path = db_path
+        self.fill_on_create = fill_on_create
+        self._entries = LRUCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._local_gens: set[int] = set()
+        self._watch = DataVersionWatch(db_path, ("delete_gen",), self._delete_gen_moved)
+        self._seen_gen = self._watch.value("delete_gen")
+
+    @property
+    def epoch(self) -> int:
+        """Changes whenever entries are dropped; read it before a database read and pass it to put()"""
+        return self._epoch
+
+    def get(self, event_id: int) -> Optional[dict]:
+        """Return the cached event, or None on a miss"""
+        self._watch.check()
+        return self._entries.get(event_id)
+
+    def put(self, event: dict, epoch: Optional[int] = None) -> None:
+        """Cache an event read from the database.
+
+        If entries were dropped since `epoch` was read, the row may have been deleted
+        after it was fetched, so it is not stored.
+        """
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._entries.put(event["id"], event)
+
+    def invalidate(self, event_id: int, delete_gen: Optional[int] = None) -> None:
+        """Forget one deleted event; `delete_gen` is the generation its delete committed"""
+        with self._lock:
+            self._epoch += 1
+            if delete_gen is not None and delete_gen > self._seen_gen:
+                self._local_gens.add(delete_gen)
+            self._entries.invalidate(event_id)
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters"""
+        return self._entries.stats()
+
+    def close(self) -> None:
+        """Release the watch connection"""
+        self._watch.close()
+
+    def _delete_gen_moved(self, key: str, old: int, new: int) -> None:
+        """Clear everything unless each delete since the last check was one we invalidated"""
+        with self._lock:
+            self._seen_gen = new
+            generations = set(range(old + 1, new + 1))
+            if generations <= self._local_gens:
+                self._local_gens -= generations
+                return
+            self._local_gens = {gen for gen in self._local_gens if gen > new}
+            self._epoch += 1
+            self._entries.clear()
+
+
+def result_key(kind: str, **params: Any) -> tuple:
+    """Normalized cache key for a query: the kind plus its non-null parameters in name order"""
+    return (kind, *sorted((name, value) for name, value in params.items() if value is not None))
+
+
+class ResultCache:
+    """Cache of whole list/export results, valid for one write generation.
+
+    Every insert and delete bumps the write_gen counter in event_meta, so a result
+    computed at generation N is current exactly while write_gen is still N. The
+    generation is read through a DataVersionWatch, which only queries event_meta
+    after some connection has committed; when it moves, every entry is dropped.
+    """
+
+    def __init__(self, db_path: str, maxsize: int) -> None:
+        self.db_path = db_path
+        self._entries = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self._watch = DataVersionWatch(db_path, ("write_gen",), self._write_gen_moved)
+        self._generation = self._watch.value("write_gen")
+
+    def generation(self) -> int:
+        """Current write generation; read it before running the query whose result is put()"""
+        self._watch.check()
+        return self._generation
+
+    def etag(self, key: tuple, generation: int) -> str:
+        """Entity tag of the result for `key` at `generation`"""
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return f'"{generation}-{digest}"'
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """Return the cached result for the current generation, or None on a miss"""
+        return self._entries.get(key)
+
+    def put(self, key: tuple, value: Any, generation: int) -> None:
+        """Cache a result computed after `generation` was read, unless writes have landed since"""
+        with self._lock:
+            if generation == self._generation:
+                self._entries.put(key, value)
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and the current generation"""
+        return {**self._entries.stats(), "generation": self._generation}
+
+    def close(self) -> None:
+        """Release the watch connection"""
+        self._watch.close()
+
+    def _write_gen_moved(self, key: str, old: int, new: int) -> None:
+        """Every cached result may have changed"""
+        with self._lock:
+            self._generation = new
+            self._entries.clear()
+
+
+_event_cache: Optional[EventCache] = None
+_event_cache_lock = threading.Lock()
+
+
+def get_event_cache() -> Optional[EventCache]:
+    """Get the event cache for the current database path, or None if disabled.
+
+    EVENTS_CACHE_SIZE sets the number of events kept (0 disables the cache),
+    EVENTS_CACHE_TTL the seconds an entry lives (0 for no expiry), and
+    EVENTS_CACHE_FILL_ON_CREATE=1 caches events as they are created.
+    """
+    global _event_cache
+    size = int(os.environ.get("EVENTS_CACHE_SIZE", "10000"))
+    if size <= 0:
+        return None
+    db_path = get_db_path()
+    with _event_cache_lock:
+        if _event_cache is None or _event_cache.db_path != db_path:
+            if _event_cache is not None:
+                _event_cache.close()
+            ttl = float(os.environ.get("EVENTS_CACHE_TTL", "300"))
+            _event_cache = EventCache(
+                db_path,
+                maxsize=size,
+                ttl=ttl if ttl > 0 else None,
+                fill_on_create=os.environ.get("EVENTS_CACHE_FILL_ON_CREATE", "0").lower()
+                in ("1", "true", "yes"),
+            )
+        return _event_cache
+
+
+def close_event_cache() -> None:
+    """Drop the event cache, if one was created"""
+    global _event_cache
+    with _event_cache_lock:
+        if _event_cache is not None:
+            _event_cache.close()
+            _event_cache = None
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the list/export result cache for the current database path, or None if disabled.
+
+    EVENTS_RESULT_CACHE_SIZE sets the number of results kept; 0 disables the cache
+    and the ETag support built on it.
+    """
+    global _result_cache
+    size = int(os.environ.get("EVENTS_RESULT_CACHE_SIZE", "256"))
+    if size <= 0:
+        return None
+    db_path = get_db_path()
+    with _result_cache_lock:
+        if _result_cache is None or _result_cache.db_path != db_path:
+            if _result_cache is not None:
+                _result_cache.close()
+            _result_cache = ResultCache(db_path, maxsize=size)
+        return _result_cache
+
+
+def close_result_cache() -> None:
+    """Drop the result cache, if one was created"""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is not None:
+            _result_cache.close()
+            _result_cache = None
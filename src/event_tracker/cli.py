@@ -0,0 +1,177 @@
+import argparse
+import os
+import sys
+import time
+from typing import Optional
+
+from src.event_tracker import importer, partitions
+from src.event_tracker.db import get_conn, get_db_path, init_db, rebuild_rollups
+
+
+def _rebuild_rollups(args: argparse.Namespace) -> int:
+    """Recompute the hourly rollup table from the raw events"""
+    conn = get_conn()
+    try:
+        rows = rebuild_rollups(conn)
+    finally:
+        conn.close()
+    print(f"Rebuilt {rows} hourly rollup rows in {get_db_path()}")
+    return 0
+
+
+def _import(args: argparse.Namespace) -> int:
+    """Load a CSV or NDJSON file, reporting progress and resuming from the last checkpoint"""
+    try:
+        fmt = args.format or importer.detect_format(args.path)
+    except importer.ImportFormatError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    name = args.name or os.path.abspath(args.path)
+    started = time.monotonic()
+
+    def progress(records: int, inserted: int, rejected: int) -> None:
+        elapsed = time.monotonic() - started
+        print(
+            f"{records} records read, {inserted} inserted, {rejected} rejected ({elapsed:.1f}s)",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    conn = get_conn()
+    try:
+        if args.resume:
+            checkpoint = importer.get_checkpoint(conn, name)
+            if checkpoint is not None:
+                print(f"Resuming {name} after record {checkpoint['records']}", file=sys.stderr)
+        with importer.open_text(args.path) as stream:
+            result = importer.import_stream(
+                conn,
+                stream,
+                fmt,
+                name=name,
+                resume=args.resume,
+                batch_size=args.batch_size,
+                commit_every=args.commit_every,
+                progress=progress,
+            )
+    except importer.ImportFormatError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    except Exception as exc:
+        print(
+            f"Import failed: {exc}. Progress up to the last commit is kept; rerun with --resume to continue.",
+            file=sys.stderr,
+        )
+        return 1
+    finally:
+        conn.close()
+    for error in result["errors"]:
+        print(f"record {error.index}: {error.errors}", file=sys.stderr)
+    print(f"Imported {result['inserted']} events from {args.path} ({result['rejected']} rejected)")
+    return 0
+
+
+def _list_partitions(args: argparse.Namespace) -> int:
+    """Print every monthly partition with its event count"""
+    conn = get_conn()
+    try:
+        for month, table, _, _ in partitions.list_partitions(conn):
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"{month}  {table}  {count} events")
+    finally:
+        conn.close()
+    return 0
+
+
+def _drop_partitions(args: argparse.Namespace) -> int:
+    """Drop every partition older than the given month"""
+    conn = get_conn()
+    try:
+        dropped = partitions.drop_partitions_before(conn, args.before)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    finally:
+        conn.close()
+    print(f"Dropped {len(dropped)} partitions{': ' + ', '.join(dropped) if dropped else ''}")
+    return 0
+
+
+def _apply_retention(args: argparse.Namespace) -> int:
+    """Drop the partitions outside the retention window"""
+    conn = get_conn()
+    try:
+        dropped = partitions.apply_retention(conn, args.keep_months)
+    finally:
+        conn.close()
+    print(f"Dropped {len(dropped)} partitions{': ' + ', '.join(dropped) if dropped else ''}")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Entry point for `python -m src.event_tracker.cli`"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.event_tracker.cli", description="Event Tracker maintenance commands"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-rollups", help="Recompute the hourly rollups, e.g. after a backfill"
+    )
+    rebuild.set_defaults(handler=_rebuild_rollups)
+
+    load = commands.add_parser(
+        "import", help="Load events from a CSV or NDJSON file (optionally .gz)"
+    )
+    load.add_argument("path", help="File to import; CSV must have the export's header")
+    load.add_argument(
+        "--format",
+        choices=importer.IMPORT_FORMATS,
+        help="Input format (default: from the file extension)",
+    )
+    load.add_argument(
+        "--batch-size",
+        type=int,
+        default=importer.IMPORT_BATCH_SIZE,
+        help="Records validated and inserted per batch",
+    )
+    load.add_argument(
+        "--commit-every",
+        type=int,
+        default=importer.IMPORT_COMMIT_EVERY,
+        help="Records per transaction",
+    )
+    load.add_argument("--name", help="Checkpoint name (default: the absolute file path)")
+    load.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the records committed by an earlier run with the same name",
+    )
+    load.set_defaults(handler=_import)
+
+    listing = commands.add_parser("partitions", help="List the monthly partitions and their sizes")
+    listing.set_defaults(handler=_list_partitions)
+
+    drop = commands.add_parser("drop-partitions", help="Drop whole months of events in one step")
+    drop.add_argument(
+        "--before", required=True, help="Drop every month older than this one (YYYY-MM)"
+    )
+    drop.set_defaults(handler=_drop_partitions)
+
+    retention = commands.add_parser(
+        "apply-retention", help="Drop months outside the retention window, e.g. from cron"
+    )
+    retention.add_argument(
+        "--keep-months",
+        type=int,
+        help="Calendar months to keep, the current one included (default: EVENTS_RETENTION_MONTHS)",
+    )
+    retention.set_defaults(handler=_apply_retention)
+
+    args = parser.parse_args(argv)
+    init_db()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,157 +1,796 @@
+import base64
+import binascii
+import json
+import re
 import sqlite3
-from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Any
+from src.event_tracker import partitions, timestamps
+from src.event_tracker.cache import get_event_cache
+from src.event_tracker.filters import EventFilters
+from src.event_tracker.hotwindow import get_hot_window
+from src.event_tracker.hub import EventHub, Subscription, get_hub
+from src.event_tracker.locks import write_transaction
 from src.event_tracker.schemas import EventCreate
 
+EVENT_COLUMNS = ("id", "ts", "label", "description", "x", "y", "source")
+
+# SELECT list of EVENT_COLUMNS with ts turned back into ISO 8601 text by SQLite. The
+# expression has no alias, so ORDER BY ts still sorts by the stored integer (and its index).
+_EVENT_SELECT = ", ".join(timestamps.iso_sql(column) if column == "ts" else column for column in EVENT_COLUMNS)
+
+# Bounding-box queries go through the partitions' R*Tree indexes when the box holds at most this
+# many events; larger boxes fall back to scanning. 0 disables the spatial index.
+SPATIAL_INDEX_MAX_CANDIDATES = 20000
+
+# Newest-first searches matching more events than this walk the ts index and test each
+# event against the matches, instead of sorting all matches
+SEARCH_SORT_MAX_MATCHES = 20000
+
+# Newest-first pages whose label or source list matches more events than this walk the ts
+# index, instead of reading the matches through the (label, ts) or (source, ts) index and sorting them
+FILTER_SORT_MAX_ROWS = 20000
+
+# ORDER BY per list sort; `relevance` ranks full-text matches by bm25 and needs a search
+LIST_ORDERS = {
+    "newest": "ts DESC, id DESC",
+    "relevance": "rank, ts DESC, id DESC",
+}
+
+# Events read per query when streams catch up with events committed by other processes
+STREAM_CATCH_UP_BATCH = 1000
+
+# A "quoted phrase" with an optional trailing *, or a bare word
+_SEARCH_TERM = re.compile(r'"([^"]*)"(\*?)|(\S+)')
+
+def _event_params(event_create: EventCreate) -> tuple:
+    """Convert an EventCreate into the INSERT parameter tuple"""
+    return (
+        timestamps.to_micros(event_create.ts), event_create.label, event_create.description, event_create.x, event_create.y, event_create.source
+    )
+
+def _insert_rows(conn: sqlite3.Connection, rows: list[tuple]) -> list[int]:
+    """Insert (ts, label, description, x, y, source) tuples, ts a stored timestamp, into their month partitions.
+
+    Allocates a contiguous block of ids from the last_id counter, creates any missing
+    partitions and runs one executemany per month. Does not commit; the counter
+    update takes the write lock, so no other writer can interleave until the commit.
+    """
+    last_id = conn.execute(
+        "UPDATE event_meta SET value = value + ? WHERE key = 'last_id' RETURNING value", (len(rows),)
+    ).fetchone()[0]
+    first_id = last_id - len(rows) + 1
+    by_month: dict[str, list[tuple]] = {}
+    for event_id, row in zip(range(first_id, last_id + 1), rows):
+        by_month.setdefault(partitions.month_of(row[0]), []).append((event_id, *row))
+    partitions.ensure_partitions(conn, by_month)
+    for month, month_rows in by_month.items():
+        conn.executemany(
+            f"INSERT INTO {partitions.partition_table(month)} ({partitions.PARTITION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            month_rows,
+        )
+    return list(range(first_id, last_id + 1))
+
+def _commit_and_publish(conn: sqlite3.Connection, ids: list[int], rows: list[tuple]) -> None:
+    """Commit the inserted rows, then hand them to the hot window and stream subscribers in commit order"""
+    hub = get_hub()
+    hot = get_hot_window()
+    # The generation this insert produced, so the hot window knows it was ours
+    write_gen = conn.execute("SELECT value FROM event_meta WHERE key = 'write_gen'").fetchone()[0] if hot is not None else None
+    with hub.publish_lock:
+        conn.commit()
+        if hot is not None:
+            hot.apply_inserts(ids, rows, write_gen)
+        if not hub.active:
+            return
+        if ids[0] > hub.last_id + 1:
+            # Events before ours were committed without being published (by another worker
+            # process or an import); read them, and ours, back in id order
+            _publish_committed(conn, hub)
+        else:
+            hub.publish([
+                dict(zip(EVENT_COLUMNS, (event_id, timestamps.to_iso(ts), *rest))) for event_id, (ts, *rest) in zip(ids, rows)
+            ])
+
+def _publish_committed(conn: sqlite3.Connection, hub: EventHub) -> None:
+    """Publish every committed event above the hub's last published id; the caller holds publish_lock"""
+    while True:
+        events = events_after(conn, hub.last_id, limit=STREAM_CATCH_UP_BATCH)
+        if events:
+            hub.publish(events)
+        if len(events) < STREAM_CATCH_UP_BATCH:
+            return
+
+def publish_committed(conn: sqlite3.Connection) -> None:
+    """Publish the events committed since the hub's last published one by writers that did not publish them.
+
+    Ids are allocated inside the write transaction, so they increase in commit order
+    across processes; streams therefore still see every event once, in id order.
+    """
+    hub = get_hub()
+    last_id = conn.execute("SELECT value FROM event_meta WHERE key = 'last_id'").fetchone()[0]
+    if not hub.active or last_id <= hub.last_id:
+        return
+    with hub.publish_lock:
+        if hub.active:
+            _publish_committed(conn, hub)
+
+def subscribe_events(conn: sqlite3.Connection, loop: Any, event_filters: EventFilters) -> Subscription:
+    """Subscribe to the event hub; the first subscriber starts it after the newest committed event"""
+    hub = get_hub()
+    with hub.publish_lock:
+        if not hub.active:
+            hub.last_id = conn.execute("SELECT value FROM event_meta WHERE key = 'last_id'").fetchone()[0]
+        return hub.subscribe(loop, event_filters)
+
 def create_event(conn: sqlite3.Connection, event_create: EventCreate) -> int:
     """Create a new event in the database and return its ID"""
-    cursor = conn.cursor()
+    rows = [_event_params(event_create)]
+    with write_transaction(conn):
+        event_id = _insert_rows(conn, rows)[0]
+        _commit_and_publish(conn, [event_id], rows)
+    event = get_event(conn, event_id)
+    cache = get_event_cache()
+    if cache is not None and cache.fill_on_create and event is not None:
+        cache.put(event)
+    return event
 
-    ts_str = event_create.ts.isoformat()
+def create_events(conn: sqlite3.Connection, events: list[EventCreate]) -> list[int]:
+    """Insert many events in a single transaction and return their IDs in input order.
 
-    cursor.execute(
-        """
-        INSERT INTO events (ts, label, description, x, y, source)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            ts_str, event_create.label, event_create.description, event_create.x, event_create.y, event_create.source
-        )
-    )
-    conn.commit()
-    event_id = cursor.lastrowid
-    return get_event(conn, event_id)
+    The rows are not read back. IDs are contiguous because they are allocated as one
+    block from the last_id counter inside the transaction.
+    """
+    if not events:
+        return []
+
+    rows = [_event_params(e) for e in events]
+    with write_transaction(conn):
+        ids = _insert_rows(conn, rows)
+        _commit_and_publish(conn, ids, rows)
+    return ids
+
+def insert_event_rows(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    """Insert pre-validated (ts, label, description, x, y, source) tuples without committing.
+
+    `ts` may be a stored timestamp, an ISO 8601 string or a datetime (see timestamps.to_micros).
+    """
+    if rows:
+        _insert_rows(conn, [(timestamps.to_micros(ts), *rest) for ts, *rest in rows])
 
 def get_event(conn: sqlite3.Connection, event_id: int) -> Optional[dict]:
     """Fetch a single event by ID"""
     cursor = conn.cursor()
     cursor.execute(
-        "SELECT * FROM events WHERE id = ?",
+        f"SELECT {_EVENT_SELECT} FROM events WHERE id = ?",
         (event_id,))
     row = cursor.fetchone()
-    return dict(row) if row else None
+    return dict(zip(EVENT_COLUMNS, row)) if row else None
 
 def delete_event(conn: sqlite3.Connection, event_id: int) -> bool:
     """Delete an event by ID. Returns True if deleted, False if not found."""
     cursor = conn.cursor()
-    cursor.execute(
-        "DELETE FROM events WHERE id = ?",
-        (event_id,)
-    )
-    conn.commit()
-    return cursor.rowcount > 0
+    with write_transaction(conn):
+        row = cursor.execute("SELECT ts FROM events WHERE id = ?", (event_id,)).fetchone()
+        if row is None:
+            return False
+        cursor.execute(
+            f"DELETE FROM {partitions.partition_table(partitions.month_of(row[0]))} WHERE id = ?",
+            (event_id,)
+        )
+        deleted = cursor.rowcount > 0
+        # The generations this delete produced, so the event cache and hot window know it was ours
+        delete_gen = write_gen = None
+        if deleted:
+            delete_gen, write_gen = cursor.execute(
+                "SELECT MAX(CASE key WHEN 'delete_gen' THEN value END), MAX(CASE key WHEN 'write_gen' THEN value END) FROM event_meta"
+            ).fetchone()
+        conn.commit()
+    if deleted:
+        cache = get_event_cache()
+        if cache is not None:
+            cache.invalidate(event_id, delete_gen)
+        hot = get_hot_window()
+        if hot is not None:
+            hot.apply_delete(event_id, row[0], write_gen)
+    return deleted
     
-def list_events(
+def _spatial_candidates(
     conn: sqlite3.Connection,
-    start: Optional[str] = None,
-    end: Optional[str] = None,
-    label: Optional[str] = None,
-    min_x: Optional[float] = None,
-    max_x: Optional[float] = None,
-    min_y: Optional[float] = None,
-    max_y: Optional[float] = None,
-    limit: int = 50,
-    offset: int = 0
-) -> list[dict]:
-    """List events with optional filtering and pagination"""
-    cursor = conn.cursor()
-    where_parts = ["1=1"]
+    tables: list[str],
+    min_x: Optional[float],
+    max_x: Optional[float],
+    min_y: Optional[float],
+    max_y: Optional[float]
+) -> Optional[tuple[str, list[Any]]]:
+    """Return an R*Tree condition and its parameters for a bounding box, or None to scan instead.
+
+    The R*Trees of the given partitions only narrow the candidates; the exact x/y
+    predicates still apply. Boxes covering a large share of the events are cheaper to
+    scan, so the index is used only when a bounded probe finds at most
+    SPATIAL_INDEX_MAX_CANDIDATES entries in the box.
+    """
+    rtree_parts = []
+    rtree_params: list[Any] = []
+    for column, bound, value in (
+        ("max_x", ">=", min_x),
+        ("min_x", "<=", max_x),
+        ("max_y", ">=", min_y),
+        ("min_y", "<=", max_y),
+    ):
+        if value is not None:
+            rtree_parts.append(f"{column} {bound} ?")
+            rtree_params.append(value)
+
+    if not rtree_parts or SPATIAL_INDEX_MAX_CANDIDATES <= 0 or not tables:
+        return None
+
+    rtree_where = " AND ".join(rtree_parts)
+    candidates = " UNION ALL ".join(f"SELECT id FROM {table}_rtree WHERE {rtree_where}" for table in tables)
+    probe = conn.execute(
+        f"SELECT COUNT(*) FROM ({candidates} LIMIT ?)",
+        [*rtree_params * len(tables), SPATIAL_INDEX_MAX_CANDIDATES + 1],
+    ).fetchone()[0]
+    if probe > SPATIAL_INDEX_MAX_CANDIDATES:
+        return None
+    return rtree_where, rtree_params
+
+def search_expression(q: str) -> str:
+    """Turn a user search string into an FTS5 query that matches events containing every term.
+
+    Words and "quoted phrases" are matched as written (case and accents ignored); a
+    trailing * turns one into a prefix. FTS5 operators and column filters in the
+    input are treated as plain text. Raises ValueError if there is nothing to search.
+    """
+    terms = []
+    for phrase, phrase_star, word in _SEARCH_TERM.findall(q):
+        text, star = (phrase, phrase_star) if not word else (word.rstrip("*"), "*" if word.endswith("*") else "")
+        if text.strip():
+            terms.append('"' + text.replace('"', '""') + '"' + star)
+    if not terms:
+        raise ValueError("The search query has no terms")
+    return " ".join(terms)
+
+def _placeholders(values: list[Any]) -> str:
+    """Comma-separated ? marks for an IN list"""
+    return ", ".join(["?"] * len(values))
+
+def _padded(values: tuple) -> list:
+    """An IN list padded to a power-of-two length by repeating its last value.
+
+    Lists of 5 to 8 values then share one SQL text, which keeps the number of
+    distinct statements (and of SQLite prepared statements) small.
+    """
+    size = 1
+    while size < len(values):
+        size *= 2
+    return [*values, *[values[-1]] * (size - len(values))]
+
+def _filter_terms(filters: EventFilters, avoid: frozenset[str] = frozenset()) -> tuple[tuple[str, ...], list[Any]]:
+    """WHERE terms and their parameters for the row-level filters.
+
+    A column in `avoid` is written as +column, which keeps SQLite from using an
+    index on it without changing the result.
+    """
+    terms: list[str] = []
     params: list[Any] = []
 
-    if start:
-        where_parts.append("ts >= ?")
-        params.append(start)
+    if filters.start is not None:
+        terms.append("ts >= ?")
+        params.append(filters.start)
+
+    if filters.end is not None:
+        terms.append("ts <= ?")
+        params.append(filters.end)
+
+    for column in ("label", "source"):
+        values = getattr(filters, column)
+        if values:
+            padded = _padded(values)
+            terms.append(f"{'+' if column in avoid else ''}{column} IN ({_placeholders(padded)})")
+            params.extend(padded)
+
+    if filters.not_label:
+        padded = _padded(filters.not_label)
+        terms.append(f"label NOT IN ({_placeholders(padded)})")
+        params.extend(padded)
+
+    if filters.not_source:
+        padded = _padded(filters.not_source)
+        terms.append(f"(source IS NULL OR source NOT IN ({_placeholders(padded)}))")
+        params.extend(padded)
+
+    if filters.has_description is True:
+        terms.append("description <> ''")
+    elif filters.has_description is False:
+        terms.append("COALESCE(description, '') = ''")
+
+    for column, bound, value in (
+        ("x", ">=", filters.min_x),
+        ("x", "<=", filters.max_x),
+        ("y", ">=", filters.min_y),
+        ("y", "<=", filters.max_y),
+    ):
+        if value is not None:
+            terms.append(f"{column} {bound} ?")
+            params.append(value)
+
+    return tuple(terms), params
+
+def _avoided_indexes(conn: sqlite3.Connection, tables: list[str], filters: EventFilters, order: Optional[str]) -> frozenset[str]:
+    """Columns whose (column, ts) index the query should not use.
+
+    SQLite keeps no statistics here, so it always prefers an equality index. That is
+    right for one label or source, which the index returns already in ts order, but a
+    list of values has to be sorted: when it matches more than FILTER_SORT_MAX_ROWS
+    events, a newest-first page is cheaper walking the ts index. With both a label and
+    a source filter, only the narrower one's index is kept. Label sizes come from the
+    label counters, source sizes from a probe of the source index that stops once the
+    answer is clear.
+    """
+    columns = [column for column in ("label", "source") if getattr(filters, column)]
+    if not columns or (len(columns) == 1 and (order != "newest" or len(getattr(filters, columns[0])) == 1)):
+        return frozenset()
+
+    estimates = {}
+    if filters.label:
+        estimates["label"] = conn.execute(
+            f"SELECT COALESCE(SUM(n), 0) FROM event_label_counts WHERE label IN ({_placeholders(filters.label)})",
+            filters.label,
+        ).fetchone()[0]
+    if filters.source and tables:
+        # Counting past the label estimate (or the cap) would not change the choice
+        probe = " UNION ALL ".join(f"SELECT 1 FROM {table} WHERE source IN ({_placeholders(filters.source)})" for table in tables)
+        estimates["source"] = conn.execute(
+            f"SELECT COUNT(*) FROM ({probe} LIMIT ?)",
+            [*filters.source * len(tables), estimates.get("label", FILTER_SORT_MAX_ROWS) + 1],
+        ).fetchone()[0]
+    elif filters.source:
+        estimates["source"] = 0
+
+    narrowest = min(estimates, key=estimates.get)
+    avoided = set(estimates) - {narrowest}
+    if order == "newest" and len(getattr(filters, narrowest)) > 1 and estimates[narrowest] > FILTER_SORT_MAX_ROWS:
+        avoided.add(narrowest)
+    return frozenset(avoided)
+
+@lru_cache(maxsize=512)
+def _compile(tables: tuple[str, ...], everything: bool, rtree_where: Optional[str], search: Optional[str], terms: tuple[str, ...]) -> tuple[str, str]:
+    """FROM source and WHERE clause for one filter shape"""
+    return partitions.source_for(list(tables), everything, rtree_where, search), " AND ".join(("1=1", *terms))
+
+def _filter_shape(
+    conn: sqlite3.Connection, filters: EventFilters, order: Optional[str] = None
+) -> tuple[list[str], bool, Optional[str], Optional[str], list[Any], tuple[str, ...], list[Any]]:
+    """Decide how filters are applied: (tables, all of them, R*Tree condition, search mode,
+    parameters of each partition's branch, WHERE terms, WHERE parameters); see _build_filters"""
+    tables, everything = partitions.tables_for_range(conn, filters.start, filters.end)
+
+    # The search and R*Tree prefilters go inside each partition's branch of the source,
+    # whose parameters come first because the source precedes the WHERE clause
+    search = None
+    branch_params: list[Any] = []
+    if filters.q is not None:
+        expression = search_expression(filters.q)
+        if order == "relevance":
+            search = "rank"
+        elif (
+            order == "newest"
+            and partitions.count_matches(conn, tables, expression, SEARCH_SORT_MAX_MATCHES)
+            > SEARCH_SORT_MAX_MATCHES
+        ):
+            search = "scan"
+        else:
+            search = "match"
+        branch_params.append(expression)
+    rtree_where = None
+    spatial = _spatial_candidates(
+        conn, tables, filters.min_x, filters.max_x, filters.min_y, filters.max_y
+    )
+    if spatial is not None:
+        rtree_where = spatial[0]
+        branch_params.extend(spatial[1])
 
-    if end:
-        where_parts.append("ts <= ?")
-        params.append(end)
+    terms, params = _filter_terms(filters, _avoided_indexes(conn, tables, filters, order))
+    return tables, everything, rtree_where, search, branch_params, terms, params
 
-    if label:
-        where_parts.append("label = ?")
-        params.append(label)
 
-    if min_x is not None:
-        where_parts.append("x >= ?")
-        params.append(min_x)
+def _build_filters(
+    conn: sqlite3.Connection, filters: EventFilters, order: Optional[str] = None
+) -> tuple[str, str, list[Any]]:
+    """Compile filters into the FROM source, WHERE clause and parameters of the list, count, export and stats queries.
 
-    if max_x is not None:
-        where_parts.append("x <= ?")
-        params.append(max_x)
+    The source only covers the month partitions that can hold events between `start`
+    and `end`, so other months are never touched. With a search `q`, it only yields
+    events matching the full-text search; `order` is the LIST_ORDERS key a page will
+    be read in, which picks how the matches are applied (and adds a bm25 `rank`
+    column for "relevance") and which index the label and source lists use.
 
-    if min_y is not None:
-        where_parts.append("y >= ?")
-        params.append(min_y)
+    The SQL text only depends on the filter shape (which filters are set, padded list
+    lengths, partitions and index choices) and is cached per shape, so repeated
+    queries also hit SQLite's prepared statement cache.
+    """
+    tables, everything, rtree_where, search, branch_params, terms, params = _filter_shape(
+        conn, filters, order
+    )
+    source, where_clause = _compile(tuple(tables), everything, rtree_where, search, terms)
+    return source, where_clause, [*branch_params * len(tables), *params]
 
-    if max_y is not None:
-        where_parts.append("y <= ?")
-        params.append(max_y)
 
-    where_clause = " AND ".join(where_parts)
+def _build_partition_filters(
+    conn: sqlite3.Connection, filters: EventFilters, order: Optional[str] = None
+) -> list[tuple[str, str, list[Any]]]:
+    """Like _build_filters, but one (source, WHERE clause, parameters) per partition, newest partition first"""
+    tables, _, rtree_where, search, branch_params, terms, params = _filter_shape(
+        conn, filters, order
+    )
+    return [
+        (*_compile((table,), False, rtree_where, search, terms), [*branch_params, *params])
+        for table in reversed(tables)
+    ]
+
+
+def encode_cursor(event: dict) -> str:
+    """Encode the (ts, id) keyset of an event, with ts as returned (ISO 8601), as an opaque pagination cursor"""
+    raw = json.dumps([event["ts"], event["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """Decode a cursor produced by encode_cursor into a (stored ts, id) keyset. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, event_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(ts, str) or not isinstance(event_id, int):
+        raise ValueError("Invalid cursor")
+    try:
+        return timestamps.to_micros(ts), event_id
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def list_events(
+    conn: sqlite3.Connection,
+    limit: int = 50,
+    offset: int = 0,
+    after: Optional[tuple[int, int]] = None,
+    sort: str = "newest",
+    **filter_args: Any
+) -> list[dict]:
+    """List events with optional filtering, full-text search and pagination (see list_event_rows)"""
+    rows = list_event_rows(conn, limit=limit, offset=offset, after=after, sort=sort, **filter_args)
+    return [dict(zip(EVENT_COLUMNS, row)) for row in rows]
+
+def list_event_rows(
+    conn: sqlite3.Connection,
+    limit: int = 50,
+    offset: int = 0,
+    after: Optional[tuple[int, int]] = None,
+    sort: str = "newest",
+    **filter_args: Any
+) -> list[tuple]:
+    """List events as plain tuples in EVENT_COLUMNS order, with optional filtering, full-text search and pagination.
+
+    `filter_args` are the EventFilters fields. Rows are ordered newest first with id
+    as the tie-breaker. When `after` is a (stored ts, id) keyset taken from the last
+    row of the previous page (see decode_cursor), the page starts right after it and `offset` is ignored, so
+    deep pages cost the same as the first. `sort="relevance"` orders search results
+    best match first and pages by offset. Newest-first pages the hot window can
+    answer never reach SQLite.
+    """
+    filters = EventFilters(**filter_args)
+    if sort == "relevance" and (filters.q is None or after is not None):
+        raise ValueError("sort=relevance needs a search query and offset paging")
+    if after is not None:
+        offset = 0
+    hot = get_hot_window()
+    if hot is not None:
+        rows = hot.list_rows(conn, filters, limit, offset, after, sort)
+        if rows is not None:
+            return rows
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    if sort == "newest":
+        return _newest_rows(
+            cursor, _build_partition_filters(conn, filters, sort), limit, offset, after
+        )
+    source, where_clause, params = _build_filters(conn, filters, sort)
 
     params.append(limit)
     params.append(offset)
 
     query = f"""
-        SELECT * FROM events
+        SELECT {_EVENT_SELECT} FROM {source}
         WHERE {where_clause}
-        ORDER BY ts DESC
+        ORDER BY {LIST_ORDERS[sort]}
         LIMIT ? OFFSET ?
     """
 
     cursor.execute(query, params)
-    rows = cursor.fetchall()
-    return [dict(row) for row in rows]
+    return cursor.fetchall()
 
-def count_events(
-    conn: sqlite3.Connection,
-    start: Optional[str] = None,
-    end: Optional[str] = None,
-    label: Optional[str] = None,
-    min_x: Optional[float] = None,
-    max_x: Optional[float] = None,
-    min_y: Optional[float] = None,
-    max_y: Optional[float] = None
-) -> int:
-    """Count total events matching the filters"""
+
+def _newest_rows(
+    cursor: sqlite3.Cursor,
+    parts: list[tuple[str, str, list[Any]]],
+    limit: int,
+    offset: int,
+    after: Optional[tuple[int, int]],
+) -> list[tuple]:
+    """Read a newest-first page partition by partition, newest partition first.
+
+    Months do not overlap, so the pages of consecutive partitions join up in order.
+    Each partition is read on its own ts index (ORDER BY over the `events` union
+    would sort every row) and the walk stops once the page is full. An offset the
+    partition cannot fill is counted off it before moving to the next one.
+    """
+    rows: list[tuple] = []
+    for source, where_clause, params in parts:
+        if len(rows) >= limit:
+            break
+        if after is not None:
+            # The ts index stores (ts, rowid), so this seeks straight to the keyset
+            where_clause += " AND (ts, id) < (?, ?)"
+            params = [*params, *after]
+        page = cursor.execute(
+            f"""
+            SELECT {_EVENT_SELECT} FROM {source}
+            WHERE {where_clause}
+            ORDER BY {LIST_ORDERS["newest"]}
+            LIMIT ? OFFSET ?
+            """,
+            [*params, limit - len(rows), offset],
+        ).fetchall()
+        if page:
+            rows.extend(page)
+            offset = 0
+        elif offset:
+            offset -= cursor.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {source} WHERE {where_clause} LIMIT ?)",
+                [*params, offset],
+            ).fetchone()[0]
+    return rows
+
+
+def events_after(conn: sqlite3.Connection, after_id: int, limit: int = 1000, **filter_args: Any) -> list[dict]:
+    """Matching events with an id above `after_id`, oldest id first; used to resume event streams"""
+    source, where_clause, params = _build_filters(conn, EventFilters(**filter_args))
+    params.extend((after_id, limit))
+    query = f"""
+        SELECT {_EVENT_SELECT} FROM {source}
+        WHERE {where_clause} AND id > ?
+        ORDER BY id
+        LIMIT ?
+    """
+    return [dict(zip(EVENT_COLUMNS, row)) for row in conn.execute(query, params).fetchall()]
+
+def iter_events(conn: sqlite3.Connection, **filter_args: Any) -> sqlite3.Cursor:
+    """Return an executed cursor over all events matching the EventFilters fields, yielding plain tuples in EVENT_COLUMNS order"""
     cursor = conn.cursor()
+    cursor.row_factory = None
+    source, where_clause, params = _build_filters(conn, EventFilters(**filter_args))
+
+    query = f"""
+        SELECT {_EVENT_SELECT} FROM {source}
+        WHERE {where_clause}
+        ORDER BY ts DESC, id DESC
+    """
+
+    cursor.execute(query, params)
+    return cursor
+
+STATS_GROUP_COLUMNS = ("label", "source")
+
+# Serve hour/day stats from event_rollup_hourly where the filters allow it
+USE_ROLLUPS = True
+
+def _rollup_range(start: Optional[int], end: Optional[int]) -> Optional[tuple[Optional[int], Optional[int]]]:
+    """Find the hour buckets lying entirely inside the inclusive [start, end] range.
+
+    Returns (first, last) buckets, either of which is None when that side is
+    unbounded, or None when no whole hour fits.
+    """
+    hour = timestamps.HOUR
+    first = -(-start // hour) * hour if start is not None else None
+    last = (end + 1) // hour * hour - hour if end is not None else None
+    if first is not None and last is not None and first > last:
+        return None
+    return first, last
+
+def _stats_from_events(
+    conn: sqlite3.Connection,
+    interval: str,
+    group_columns: list[str],
+    source: str,
+    where_clause: str,
+    params: list[Any]
+) -> list[dict]:
+    """Aggregate raw events into buckets"""
+    query = f"""
+        SELECT {timestamps.floor_sql("ts", timestamps.INTERVAL_MICROS[interval])} AS period,
+            {"".join(f"{column}, " for column in group_columns)}COUNT(*) AS n,
+            COUNT(x) AS n_x, TOTAL(x) AS sum_x, MIN(x) AS min_x, MAX(x) AS max_x,
+            COUNT(y) AS n_y, TOTAL(y) AS sum_y, MIN(y) AS min_y, MAX(y) AS max_y
+        FROM {source}
+        WHERE {where_clause}
+        GROUP BY {", ".join(["period", *group_columns])}
+    """
+    return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+def _stats_from_rollups(
+    conn: sqlite3.Connection,
+    interval: str,
+    group_columns: list[str],
+    first: Optional[int],
+    last: Optional[int],
+    filters: EventFilters
+) -> list[dict]:
+    """Aggregate the hourly rollups between two buckets (inclusive) into buckets"""
     where_parts = ["1=1"]
     params: list[Any] = []
+    if first is not None:
+        where_parts.append("bucket >= ?")
+        params.append(first)
+    if last is not None:
+        where_parts.append("bucket <= ?")
+        params.append(last)
+    # Rollups store a missing source as '', which no filter value can equal
+    for column, values, negate in (
+        ("label", filters.label, False),
+        ("source", filters.source, False),
+        ("label", filters.not_label, True),
+        ("source", filters.not_source, True),
+    ):
+        if values:
+            where_parts.append(f"{column} {'NOT IN' if negate else 'IN'} ({_placeholders(values)})")
+            params.extend(values)
 
-    if start:
-        where_parts.append("ts >= ?")
-        params.append(start)
+    select_groups = {"label": "label, ", "source": "NULLIF(source, '') AS source, "}
+    query = f"""
+        SELECT {timestamps.floor_sql("bucket", timestamps.INTERVAL_MICROS[interval])} AS period,
+            {"".join(select_groups[column] for column in group_columns)}SUM(n) AS n,
+            SUM(n_x) AS n_x, SUM(sum_x) AS sum_x, MIN(min_x) AS min_x, MAX(max_x) AS max_x,
+            SUM(n_y) AS n_y, SUM(sum_y) AS sum_y, MIN(min_y) AS min_y, MAX(max_y) AS max_y
+        FROM event_rollup_hourly
+        WHERE {" AND ".join(where_parts)}
+        GROUP BY {", ".join(["period", *(f"{column}" for column in group_columns)])}
+    """
+    return [dict(row) for row in conn.execute(query, params).fetchall()]
 
-    if end:
-        where_parts.append("ts <= ?")
-        params.append(end)
+def _merge_stats(parts: list[dict], group_columns: list[str]) -> list[dict]:
+    """Combine partial aggregates for the same bucket (a stored timestamp) and group into the response rows"""
+    merged: dict[tuple, dict] = {}
+    for part in parts:
+        key = (part["period"], *(part[column] for column in group_columns))
+        row = merged.get(key)
+        if row is None:
+            merged[key] = dict(part)
+            continue
+        for field in ("n", "n_x", "sum_x", "n_y", "sum_y"):
+            row[field] += part[field]
+        for field, pick in (("min_x", min), ("max_x", max), ("min_y", min), ("max_y", max)):
+            values = [v for v in (row[field], part[field]) if v is not None]
+            row[field] = pick(values) if values else None
 
-    if label:
-        where_parts.append("label = ?")
-        params.append(label)
+    def sort_key(key: tuple) -> tuple:
+        # NULL groups sort first, like SQLite's ORDER BY; a NULL is only ever compared with
+        # another NULL, so its stand-in value never meets a bucket's int or a group's str
+        return tuple((value is not None, value if value is not None else 0) for value in key)
 
-    if min_x is not None:
-        where_parts.append("x >= ?")
-        params.append(min_x)
+    result = []
+    for key in sorted(merged, key=sort_key):
+        row = merged[key]
+        bucket = {"bucket": timestamps.to_iso(row["period"])}
+        bucket.update({column: row[column] for column in group_columns})
+        bucket.update({
+            "count": row["n"],
+            "min_x": row["min_x"],
+            "max_x": row["max_x"],
+            "avg_x": row["sum_x"] / row["n_x"] if row["n_x"] else None,
+            "min_y": row["min_y"],
+            "max_y": row["max_y"],
+            "avg_y": row["sum_y"] / row["n_y"] if row["n_y"] else None,
+        })
+        result.append(bucket)
+    return result
 
-    if max_x is not None:
-        where_parts.append("x <= ?")
-        params.append(max_x)
+def event_stats(
+    conn: sqlite3.Connection,
+    interval: str = "hour",
+    group_by: Optional[list[str]] = None,
+    **filter_args: Any
+) -> list[dict]:
+    """Count events per time bucket, optionally split by label and/or source.
 
-    if min_y is not None:
-        where_parts.append("y >= ?")
-        params.append(min_y)
+    Hour and day stats filtered only by time, label and source read whole hours
+    from the event_rollup_hourly table and aggregate only the partial hours at
+    either end of the range from raw events. Everything else is aggregated from the
+    raw events. Either way only the aggregated rows leave SQLite. Ranges that lie
+    inside the hot window are aggregated there instead. Buckets are returned oldest
+    first.
+    """
+    filters = EventFilters(**filter_args)
+    group_columns = [column for column in STATS_GROUP_COLUMNS if column in (group_by or [])]
 
-    if max_y is not None:
-        where_parts.append("y <= ?")
-        params.append(max_y)
+    hot = get_hot_window()
+    if hot is not None:
+        parts = hot.stats_parts(conn, filters, interval, group_columns)
+        if parts is not None:
+            return _merge_stats(parts, group_columns)
 
-    where_clause = " AND ".join(where_parts)
+    rollup_range = None
+    if USE_ROLLUPS and interval in ("hour", "day") and not filters.has_bbox and filters.q is None and filters.has_description is None:
+        rollup_range = _rollup_range(filters.start, filters.end)
 
-    query = f"""
-        SELECT COUNT(*) as count FROM events
-        WHERE {where_clause}
+    if rollup_range is None:
+        source, where_clause, params = _build_filters(conn, filters)
+        return _merge_stats(_stats_from_events(conn, interval, group_columns, source, where_clause, params), group_columns)
+
+    first, last = rollup_range
+    parts = _stats_from_rollups(conn, interval, group_columns, first, last, filters)
+
+    # Raw events in the partial hours before `first` and after `last`
+    if first is not None and filters.start < first:
+        source, where_clause, params = _build_filters(conn, filters.with_range(filters.start, first - 1))
+        parts += _stats_from_events(conn, interval, group_columns, source, where_clause, params)
+    if last is not None and filters.end >= last + timestamps.HOUR:
+        source, where_clause, params = _build_filters(conn, filters.with_range(last + timestamps.HOUR, filters.end))
+        parts += _stats_from_events(conn, interval, group_columns, source, where_clause, params)
+
+    return _merge_stats(parts, group_columns)
+
+def count_events(conn: sqlite3.Connection, cap: Optional[int] = None, **filter_args: Any) -> int:
+    """Count total events matching the EventFilters fields.
+
+    Counts filtered only by label and not_label are read from the trigger-maintained
+    event_label_counts table in constant time, and search-only counts from the
+    search indexes alone. Ranges inside the hot window are counted there. Otherwise
+    the matching rows are counted; with `cap` the count stops once it passes `cap`
+    and returns `cap`.
     """
+    filters = EventFilters(**filter_args)
+    cursor = conn.cursor()
+    if filters.q is not None and filters == EventFilters(q=filters.q):
+        tables = [table for _, table, _, _ in partitions.list_partitions(conn)]
+        count = partitions.count_matches(conn, tables, search_expression(filters.q), cap)
+        return min(count, cap) if cap is not None else count
+
+    if filters.label_only:
+        query = "SELECT COALESCE(SUM(n), 0) FROM event_label_counts WHERE 1=1"
+        params: list[Any] = []
+        if filters.label:
+            query += f" AND label IN ({_placeholders(filters.label)})"
+            params.extend(filters.label)
+        if filters.not_label:
+            query += f" AND label NOT IN ({_placeholders(filters.not_label)})"
+            params.extend(filters.not_label)
+        row = cursor.execute(query, params).fetchone()
+        return row[0] if row else 0
+
+    hot = get_hot_window()
+    if hot is not None:
+        count = hot.count(conn, filters, cap)
+        if count is not None:
+            return count
+
+    source, where_clause, params = _build_filters(conn, filters)
+
+    if cap is not None:
+        params.append(cap + 1)
+        query = f"""
+            SELECT COUNT(*) as count FROM (
+                SELECT 1 FROM {source}
+                WHERE {where_clause}
+                LIMIT ?
+            )
+        """
+    else:
+        query = f"""
+            SELECT COUNT(*) as count FROM {source}
+            WHERE {where_clause}
+        """
 
     cursor.execute(query, params)
     row = cursor.fetchone()
-    return row["count"] if row else 0
\ No newline at end of file
+    count = row["count"] if row else 0
+    return min(count, cap) if cap is not None else count
@@ -1,21 +1,54 @@
 import csv
 import io
-from typing import Any
+import sqlite3
+from typing import Any, Iterator
+
+from src.event_tracker.crud import EVENT_COLUMNS
+
+FIELDNAMES = list(EVENT_COLUMNS)
+
+# Rows pulled from the cursor per fetchmany() call; also the number of rows per yielded chunk
+EXPORT_CHUNK_SIZE = 1000
 
 def events_to_csv(events: list[dict]) -> str:
     """Convert a list of event dictionaries to a CSV string"""
     if not events:
         output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=["id", "ts", "label", "description", "x", "y", "source"])
+        writer = csv.DictWriter(output, fieldnames=FIELDNAMES)
         writer.writeheader()
         return output.getvalue()
-    
+
     output = io.StringIO()
-    fieldnames = ["id", "ts", "label", "description", "x", "y", "source"]
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
+    writer = csv.DictWriter(output, fieldnames=FIELDNAMES)
 
     writer.writeheader()
     for event in events:
         writer.writerow(event)
-    
-    return output.getvalue()
\ No newline at end of file
+
+    return output.getvalue()
+
+def iter_csv(cursor: sqlite3.Cursor, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Stream an executed cursor as CSV text, one chunk of rows at a time.
+
+    The cursor must yield rows in FIELDNAMES order. Only one chunk is held in memory
+    at once, so memory use stays flat regardless of how many rows match.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    writer.writerow(FIELDNAMES)
+    yield _drain(output)
+
+    while True:
+        rows: list[Any] = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        writer.writerows(rows)
+        yield _drain(output)
+
+def _drain(output: io.StringIO) -> str:
+    """Return everything written to the buffer so far and reset it"""
+    chunk = output.getvalue()
+    output.seek(0)
+    output.truncate(0)
+    return chunk
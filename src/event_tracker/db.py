@@ -1,6 +1,58 @@
 import os
 import sqlite3
+import threading
 from pathlib import Path
+from typing import Any, Optional
+
+from src.event_tracker.locks import begin_immediate, startup_lock, write_transaction
+from src.event_tracker.metrics import InstrumentedConnection, get_metrics, instrument
+from src.event_tracker.pool import ConnectionPool
+from src.event_tracker.timestamps import HOUR, floor_sql, to_micros
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# Named PRAGMA presets, selected with EVENTS_DB_PROFILE. Every connection runs in WAL mode
+# so readers never block on the writer; the presets differ in how much durability they
+# trade for write throughput and how much memory they give SQLite.
+PROFILES: dict[str, dict[str, Any]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+# Allowed values for the PRAGMAs that take keywords; the rest are integers
+_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+# Prepared statements kept per connection; filter SQL is built per filter shape, so a busy
+# connection sees a few hundred distinct statements rather than the default 128
+PREPARED_STATEMENT_CACHE = 512
 
 def get_db_path() -> str:
     """Get database file path from env var or default to project root"""
@@ -8,18 +60,106 @@ def get_db_path() -> str:
         return os.environ["EVENTS_DB_PATH"]
     return str(Path(__file__).parent.parent.parent / "events.db")
 
+def get_db_settings() -> dict[str, Any]:
+    """Resolve the PRAGMA settings for new connections.
+
+    Starts from the EVENTS_DB_PROFILE preset and applies any per-setting override such
+    as EVENTS_DB_SYNCHRONOUS or EVENTS_DB_MMAP_SIZE.
+    """
+    profile = os.environ.get("EVENTS_DB_PROFILE", DEFAULT_PROFILE).lower()
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown EVENTS_DB_PROFILE {profile!r}, expected one of {sorted(PROFILES)}")
+
+    settings: dict[str, Any] = {"profile": profile, **PROFILES[profile]}
+    for name in PROFILES[profile]:
+        override = os.environ.get(f"EVENTS_DB_{name.upper()}")
+        if override is None:
+            continue
+        if name in _PRAGMA_CHOICES:
+            value = override.upper()
+            if value not in _PRAGMA_CHOICES[name]:
+                raise ValueError(f"Invalid EVENTS_DB_{name.upper()} {override!r}, expected one of {sorted(_PRAGMA_CHOICES[name])}")
+            settings[name] = value
+        else:
+            settings[name] = int(override)
+    return settings
+
+def apply_settings(conn: sqlite3.Connection, settings: dict[str, Any]) -> None:
+    """Apply resolved PRAGMA settings to a connection"""
+    # busy_timeout first, so switching journal_mode waits out other connections
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+
+def read_settings(conn: sqlite3.Connection) -> dict[str, Any]:
+    """Read back the PRAGMA values actually in effect on a connection"""
+    synchronous = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+    temp_store = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+    return {
+        "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0].upper(),
+        "synchronous": synchronous[conn.execute("PRAGMA synchronous").fetchone()[0]],
+        "cache_size": conn.execute("PRAGMA cache_size").fetchone()[0],
+        "mmap_size": conn.execute("PRAGMA mmap_size").fetchone()[0],
+        "temp_store": temp_store[conn.execute("PRAGMA temp_store").fetchone()[0]],
+        "busy_timeout": conn.execute("PRAGMA busy_timeout").fetchone()[0],
+    }
+
 def get_conn() -> sqlite3.Connection:
-    """Get a new database connection"""
+    """Get a new database connection configured with the current performance profile.
+
+    With metrics enabled, the connection reports SQL time, fetched rows and slow
+    statements to them.
+    """
     db_path = get_db_path()
-    conn = sqlite3.connect(db_path)
+    # Connections may be handed between threadpool workers (e.g. while a streaming
+    # response is iterated), but are never used by two threads at the same time
+    metrics = get_metrics()
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        cached_statements=PREPARED_STATEMENT_CACHE,
+        factory=InstrumentedConnection if metrics is not None else sqlite3.Connection,
+    )
+    if metrics is not None:
+        instrument(conn, metrics)
     conn.row_factory = sqlite3.Row
+    apply_settings(conn, get_db_settings())
     return conn
 
-def init_db() -> None:
-    """Initialize database schema if not already created"""
-    conn = get_conn()
-    cursor = conn.cursor()
+def get_pool() -> ConnectionPool:
+    """Get the shared connection pool for the current database path.
 
+    Size and acquire timeout come from EVENTS_DB_POOL_SIZE and EVENTS_DB_POOL_TIMEOUT.
+    If EVENTS_DB_PATH has changed since the pool was created, the old pool is closed
+    and a new one is opened against the new path.
+    """
+    global _pool
+    db_path = get_db_path()
+    with _pool_lock:
+        if _pool is None or _pool.db_path != db_path:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(
+                db_path,
+                get_conn,
+                size=int(os.environ.get("EVENTS_DB_POOL_SIZE", "8")),
+                timeout=float(os.environ.get("EVENTS_DB_POOL_TIMEOUT", "10")),
+            )
+        return _pool
+
+def close_pool() -> None:
+    """Close the shared connection pool, if one was opened"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def _create_events_table(cursor: sqlite3.Cursor) -> None:
+    """Migration 1: the events table and its ts/label indexes"""
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS events (
@@ -40,5 +180,499 @@ def init_db() -> None:
         "CREATE INDEX IF NOT EXISTS idx_events_label ON events (label)"
     )
 
-    conn.commit()
-    conn.close()
\ No newline at end of file
+def _add_label_counts(cursor: sqlite3.Cursor) -> None:
+    """Migration 2: per-label row counts kept current by triggers, for O(1) totals"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_label_counts (
+            label TEXT PRIMARY KEY,
+            n INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_label_count_insert AFTER INSERT ON events
+        BEGIN
+            INSERT INTO event_label_counts (label, n) VALUES (NEW.label, 1)
+            ON CONFLICT (label) DO UPDATE SET n = n + 1;
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_label_count_delete AFTER DELETE ON events
+        BEGIN
+            UPDATE event_label_counts SET n = n - 1 WHERE label = OLD.label;
+        END
+        """
+    )
+    cursor.execute("DELETE FROM event_label_counts")
+    cursor.execute(
+        "INSERT INTO event_label_counts (label, n) SELECT label, COUNT(*) FROM events GROUP BY label"
+    )
+
+# Stand-in extent for a missing coordinate in the R*Tree (it stores 32-bit floats)
+_RTREE_UNBOUNDED = 1e38
+
+def _add_spatial_index(cursor: sqlite3.Cursor) -> None:
+    """Migration 3: R*Tree over (x, y) kept in sync with events by triggers.
+
+    Events with only one coordinate are indexed with the other axis spanning the
+    whole plane, so the R*Tree stays a superset of any single-axis filter.
+    """
+    cursor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree (id, min_x, max_x, min_y, max_y)"
+    )
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS events_rtree_insert AFTER INSERT ON events
+        WHEN NEW.x IS NOT NULL OR NEW.y IS NOT NULL
+        BEGIN
+            INSERT INTO events_rtree (id, min_x, max_x, min_y, max_y) VALUES (
+                NEW.id,
+                COALESCE(NEW.x, -{_RTREE_UNBOUNDED}), COALESCE(NEW.x, {_RTREE_UNBOUNDED}),
+                COALESCE(NEW.y, -{_RTREE_UNBOUNDED}), COALESCE(NEW.y, {_RTREE_UNBOUNDED})
+            );
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_rtree_delete AFTER DELETE ON events
+        WHEN OLD.x IS NOT NULL OR OLD.y IS NOT NULL
+        BEGIN
+            DELETE FROM events_rtree WHERE id = OLD.id;
+        END
+        """
+    )
+    cursor.execute("DELETE FROM events_rtree")
+    cursor.execute(
+        f"""
+        INSERT INTO events_rtree (id, min_x, max_x, min_y, max_y)
+        SELECT id,
+            COALESCE(x, -{_RTREE_UNBOUNDED}), COALESCE(x, {_RTREE_UNBOUNDED}),
+            COALESCE(y, -{_RTREE_UNBOUNDED}), COALESCE(y, {_RTREE_UNBOUNDED})
+        FROM events
+        WHERE x IS NOT NULL OR y IS NOT NULL
+        """
+    )
+
+# Recomputes every hourly rollup row from the raw events; buckets are the integer timestamp of the hour's start
+_ROLLUP_BACKFILL_SQL = f"""
+    INSERT INTO event_rollup_hourly (bucket, label, source, n, n_x, sum_x, min_x, max_x, n_y, sum_y, min_y, max_y)
+    SELECT {floor_sql("ts", HOUR)}, label, COALESCE(source, ''), COUNT(*),
+        COUNT(x), TOTAL(x), MIN(x), MAX(x),
+        COUNT(y), TOTAL(y), MIN(y), MAX(y)
+    FROM events
+    GROUP BY 1, label, COALESCE(source, '')
+"""
+
+def _add_hourly_rollups(cursor: sqlite3.Cursor) -> None:
+    """Migration 4: per hour x label x source aggregates maintained by triggers.
+
+    Counts and sums are adjusted in place. A delete that removes the current
+    minimum or maximum recomputes the extremes from that hour's raw events.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_rollup_hourly (
+            bucket TEXT NOT NULL,
+            label TEXT NOT NULL,
+            source TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            n_x INTEGER NOT NULL,
+            sum_x REAL NOT NULL,
+            min_x REAL,
+            max_x REAL,
+            n_y INTEGER NOT NULL,
+            sum_y REAL NOT NULL,
+            min_y REAL,
+            max_y REAL,
+            PRIMARY KEY (bucket, label, source)
+        ) WITHOUT ROWID
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rollup_label ON event_rollup_hourly (label, bucket)"
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_rollup_insert AFTER INSERT ON events
+        BEGIN
+            INSERT INTO event_rollup_hourly (bucket, label, source, n, n_x, sum_x, min_x, max_x, n_y, sum_y, min_y, max_y)
+            VALUES (
+                substr(NEW.ts, 1, 13), NEW.label, COALESCE(NEW.source, ''), 1,
+                NEW.x IS NOT NULL, COALESCE(NEW.x, 0), NEW.x, NEW.x,
+                NEW.y IS NOT NULL, COALESCE(NEW.y, 0), NEW.y, NEW.y
+            )
+            ON CONFLICT (bucket, label, source) DO UPDATE SET
+                n = n + 1,
+                n_x = n_x + excluded.n_x,
+                sum_x = sum_x + excluded.sum_x,
+                min_x = COALESCE(MIN(min_x, excluded.min_x), min_x, excluded.min_x),
+                max_x = COALESCE(MAX(max_x, excluded.max_x), max_x, excluded.max_x),
+                n_y = n_y + excluded.n_y,
+                sum_y = sum_y + excluded.sum_y,
+                min_y = COALESCE(MIN(min_y, excluded.min_y), min_y, excluded.min_y),
+                max_y = COALESCE(MAX(max_y, excluded.max_y), max_y, excluded.max_y);
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_rollup_delete AFTER DELETE ON events
+        BEGIN
+            UPDATE event_rollup_hourly SET
+                n = n - 1,
+                n_x = n_x - (OLD.x IS NOT NULL),
+                sum_x = sum_x - COALESCE(OLD.x, 0),
+                n_y = n_y - (OLD.y IS NOT NULL),
+                sum_y = sum_y - COALESCE(OLD.y, 0)
+            WHERE bucket = substr(OLD.ts, 1, 13) AND label = OLD.label AND source = COALESCE(OLD.source, '');
+
+            DELETE FROM event_rollup_hourly
+            WHERE bucket = substr(OLD.ts, 1, 13) AND label = OLD.label AND source = COALESCE(OLD.source, '')
+                AND n = 0;
+
+            UPDATE event_rollup_hourly SET
+                min_x = (SELECT MIN(x) FROM events WHERE ts > bucket AND ts < bucket || ';' AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source),
+                max_x = (SELECT MAX(x) FROM events WHERE ts > bucket AND ts < bucket || ';' AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source),
+                min_y = (SELECT MIN(y) FROM events WHERE ts > bucket AND ts < bucket || ';' AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source),
+                max_y = (SELECT MAX(y) FROM events WHERE ts > bucket AND ts < bucket || ';' AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source)
+            WHERE bucket = substr(OLD.ts, 1, 13) AND label = OLD.label AND source = COALESCE(OLD.source, '')
+                AND (OLD.x IN (min_x, max_x) OR OLD.y IN (min_y, max_y));
+        END
+        """
+    )
+    cursor.execute("DELETE FROM event_rollup_hourly")
+    # Buckets were then the 'YYYY-MM-DDTHH' prefix of the ts text
+    cursor.execute(
+        """
+        INSERT INTO event_rollup_hourly (bucket, label, source, n, n_x, sum_x, min_x, max_x, n_y, sum_y, min_y, max_y)
+        SELECT substr(ts, 1, 13), label, COALESCE(source, ''), COUNT(*),
+            COUNT(x), TOTAL(x), MIN(x), MAX(x),
+            COUNT(y), TOTAL(y), MIN(y), MAX(y)
+        FROM events
+        GROUP BY substr(ts, 1, 13), label, COALESCE(source, '')
+        """
+    )
+
+def rebuild_rollups(conn: sqlite3.Connection) -> int:
+    """Recompute the hourly rollups from scratch and return the number of rollup rows"""
+    cursor = conn.cursor()
+    with write_transaction(conn):
+        cursor.execute("DELETE FROM event_rollup_hourly")
+        cursor.execute(_ROLLUP_BACKFILL_SQL)
+        conn.commit()
+    return cursor.execute("SELECT COUNT(*) FROM event_rollup_hourly").fetchone()[0]
+
+def _add_change_counters(cursor: sqlite3.Cursor) -> None:
+    """Create event_meta with a delete_gen counter bumped by every delete, for cache validation"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    cursor.execute("INSERT OR IGNORE INTO event_meta (key, value) VALUES ('delete_gen', 0)")
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS events_delete_gen AFTER DELETE ON events
+        BEGIN
+            UPDATE event_meta SET value = value + 1 WHERE key = 'delete_gen';
+        END
+        """
+    )
+
+def _add_write_generation(cursor: sqlite3.Cursor) -> None:
+    """Add a write_gen counter to event_meta bumped by every insert and delete, for result caching"""
+    cursor.execute("INSERT OR IGNORE INTO event_meta (key, value) VALUES ('write_gen', 0)")
+    for name, operation in (("events_write_gen_insert", "INSERT"), ("events_write_gen_delete", "DELETE")):
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {name} AFTER {operation} ON events
+            BEGIN
+                UPDATE event_meta SET value = value + 1 WHERE key = 'write_gen';
+            END
+            """
+        )
+
+def _add_import_checkpoints(cursor: sqlite3.Cursor) -> None:
+    """Create event_imports, recording how far each named import has committed"""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_imports (
+            name TEXT PRIMARY KEY,
+            records INTEGER NOT NULL,
+            inserted INTEGER NOT NULL,
+            rejected INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+
+# Rows converted per transaction by _store_integer_timestamps; other connections can write in between
+TIMESTAMP_MIGRATION_BATCH = 10000
+
+def _stored_ts(event_id: int, ts: Any) -> int:
+    """Integer timestamp of a ts stored as ISO 8601 text, for the migrations converting them"""
+    try:
+        return to_micros(ts)
+    except (TypeError, ValueError) as exc:
+        raise RuntimeError(f"Event {event_id} has a timestamp that is not ISO 8601: {ts!r}") from exc
+
+def _partition_by_month(cursor: sqlite3.Cursor) -> None:
+    """Move events into monthly partition tables behind an `events` view.
+
+    Ids now come from the last_id counter in event_meta. Rows are copied with their
+    ids before the partition triggers exist, since the counters, rollups and change
+    generations already account for them; each partition gets its own R*Tree. The
+    partitions are created as they are today, so the timestamps are converted to
+    integers on the way (see _store_integer_timestamps).
+    """
+    # Imported here because partitions builds on this module
+    from src.event_tracker import partitions
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_partitions (
+            month TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL UNIQUE,
+            lower TEXT NOT NULL,
+            upper TEXT NOT NULL
+        )
+        """
+    )
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+    cursor.execute(
+        "INSERT OR IGNORE INTO event_meta (key, value) VALUES ('last_id', MAX(?, (SELECT COALESCE(MAX(id), 0) FROM events)))",
+        (sequence[0] if sequence else 0,),
+    )
+
+    conn = cursor.connection
+    tables: dict[str, str] = {}
+    rows = conn.cursor()
+    rows.row_factory = None
+    rows.execute(f"SELECT {partitions.PARTITION_COLUMNS} FROM events ORDER BY id")
+    while True:
+        chunk = rows.fetchmany(TIMESTAMP_MIGRATION_BATCH)
+        if not chunk:
+            break
+        by_month: dict[str, list[tuple]] = {}
+        for event_id, ts, *rest in chunk:
+            ts = _stored_ts(event_id, ts)
+            by_month.setdefault(partitions.month_of(ts), []).append((event_id, ts, *rest))
+        for month, month_rows in by_month.items():
+            if month not in tables:
+                tables[month] = partitions.create_partition(conn, month, with_triggers=False)
+            conn.executemany(f"INSERT INTO {tables[month]} ({partitions.PARTITION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", month_rows)
+    for table in tables.values():
+        cursor.execute(
+            f"""
+            INSERT INTO {table}_rtree (id, min_x, max_x, min_y, max_y)
+            SELECT id, min_x, max_x, min_y, max_y FROM events_rtree
+            WHERE id IN (SELECT id FROM {table})
+            """
+        )
+        partitions.add_triggers(conn, table)
+
+    cursor.execute("DROP TABLE events")
+    cursor.execute("DROP TABLE events_rtree")
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'events'")
+    partitions.rebuild_view(conn)
+
+def _add_full_text_search(cursor: sqlite3.Cursor) -> None:
+    """Index label and description of every partition in an FTS5 table kept in sync by triggers"""
+    # Imported here because partitions builds on this module
+    from src.event_tracker import partitions
+
+    conn = cursor.connection
+    for _, table, _, _ in partitions.list_partitions(conn):
+        partitions.add_search_index(conn, table)
+
+def _add_filter_indexes(cursor: sqlite3.Cursor) -> None:
+    """Index every partition by (label, ts) and (source, ts) so filtered pages come out in ts order"""
+    # Imported here because partitions builds on this module
+    from src.event_tracker import partitions
+
+    conn = cursor.connection
+    for _, table, _, _ in partitions.list_partitions(conn):
+        partitions.add_filter_indexes(conn, table)
+
+def _column_type(conn: sqlite3.Connection, table: str, column: str) -> Optional[str]:
+    """Declared type of a column, or None if the table or column does not exist"""
+    row = conn.execute("SELECT type FROM pragma_table_info(?) WHERE name = ?", (table, column)).fetchone()
+    return row[0].upper() if row else None
+
+def _copy_timestamp_batch(conn: sqlite3.Connection, table: str, lower: int, upper: int) -> bool:
+    """Copy the next rows of a text-timestamp partition into {table}_new; returns whether a full batch was copied.
+
+    Rows whose normalized timestamp falls outside the partition's month go to
+    event_ts_moves instead.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    copied = cursor.execute(
+        f"SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM {table}_new UNION ALL SELECT MAX(id) FROM event_ts_moves WHERE origin = ?)",
+        (table,),
+    ).fetchone()[0]
+    rows = cursor.execute(
+        f"SELECT id, ts, label, description, x, y, source FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+        (copied or 0, TIMESTAMP_MIGRATION_BATCH),
+    ).fetchall()
+    staged, moved = [], []
+    for event_id, ts, *rest in rows:
+        ts = _stored_ts(event_id, ts)
+        if lower <= ts < upper:
+            staged.append((event_id, ts, *rest))
+        else:
+            moved.append((event_id, ts, *rest, table))
+    cursor.executemany(f"INSERT INTO {table}_new (id, ts, label, description, x, y, source) VALUES (?, ?, ?, ?, ?, ?, ?)", staged)
+    cursor.executemany("INSERT INTO event_ts_moves (id, ts, label, description, x, y, source, origin) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", moved)
+    return len(rows) == TIMESTAMP_MIGRATION_BATCH
+
+def _swap_partition(conn: sqlite3.Connection, table: str) -> None:
+    """Replace a fully copied text-timestamp partition by its {table}_new copy"""
+    # Imported here because partitions builds on this module
+    from src.event_tracker import partitions
+
+    # Rows deleted since they were copied
+    conn.execute(f"DELETE FROM {table}_new WHERE id NOT IN (SELECT id FROM {table})")
+    conn.execute(f"DELETE FROM event_ts_moves WHERE origin = ? AND id NOT IN (SELECT id FROM {table})", (table,))
+    # Events moving to another month leave this partition's R*Tree, search index and label
+    # counts; inserting them into their new partition adds them back
+    for event_id, label, description in conn.execute("SELECT id, label, description FROM event_ts_moves WHERE origin = ?", (table,)).fetchall():
+        conn.execute(f"DELETE FROM {table}_rtree WHERE id = ?", (event_id,))
+        conn.execute(f"INSERT INTO {table}_fts ({table}_fts, rowid, label, description) VALUES ('delete', ?, ?, ?)", (event_id, label, description))
+        conn.execute("UPDATE event_label_counts SET n = n - 1 WHERE label = ?", (label,))
+    # The view names the old table, which would stop the rename once it is gone
+    conn.execute("DROP VIEW IF EXISTS events")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    for statement in partitions.index_ddl(table):
+        conn.execute(statement)
+    partitions.add_triggers(conn, table)
+    partitions.rebuild_view(conn)
+
+def _store_integer_timestamps(cursor: sqlite3.Cursor) -> None:
+    """Store ts as INTEGER microseconds since 1970 UTC instead of ISO 8601 text, converting online.
+
+    Each partition still holding text is copied into {table}_new in batches of
+    TIMESTAMP_MIGRATION_BATCH rows, committing in between, so other connections keep
+    reading and writing while a large database converts. Progress is the copied ids,
+    so an interrupted migration (or one continued by another process) resumes where
+    it stopped. The transaction copying the last rows also drops those deleted
+    meanwhile and swaps the tables. Timestamps with a UTC offset may land in another
+    month once normalized; they wait in event_ts_moves until every partition is
+    converted. Last, the hourly rollups are rebuilt with integer buckets.
+    """
+    # Imported here because partitions builds on this module
+    from src.event_tracker import partitions
+
+    conn = cursor.connection
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_ts_moves (
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            description TEXT,
+            x REAL,
+            y REAL,
+            source TEXT,
+            origin TEXT NOT NULL
+        )
+        """
+    )
+    for _, table, lower, upper in partitions.list_partitions(conn):
+        while _column_type(conn, table, "ts") == "TEXT":
+            conn.execute(partitions.events_table_ddl(f"{table}_new", lower, upper))
+            if not _copy_timestamp_batch(conn, table, lower, upper):
+                _swap_partition(conn, table)
+                break
+            conn.commit()
+            begin_immediate(conn)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != version:
+                # Another process finished the migration meanwhile
+                return
+
+    moves = conn.cursor()
+    moves.row_factory = None
+    by_month: dict[str, list[tuple]] = {}
+    for row in moves.execute(f"SELECT {partitions.PARTITION_COLUMNS} FROM event_ts_moves ORDER BY id").fetchall():
+        by_month.setdefault(partitions.month_of(row[1]), []).append(row)
+    partitions.ensure_partitions(conn, by_month)
+    for month, rows in by_month.items():
+        conn.executemany(f"INSERT INTO {partitions.partition_table(month)} ({partitions.PARTITION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute("DROP TABLE event_ts_moves")
+
+    conn.execute("DROP TABLE event_rollup_hourly")
+    conn.execute(
+        """
+        CREATE TABLE event_rollup_hourly (
+            bucket INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            source TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            n_x INTEGER NOT NULL,
+            sum_x REAL NOT NULL,
+            min_x REAL,
+            max_x REAL,
+            n_y INTEGER NOT NULL,
+            sum_y REAL NOT NULL,
+            min_y REAL,
+            max_y REAL,
+            PRIMARY KEY (bucket, label, source)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX idx_rollup_label ON event_rollup_hourly (label, bucket)")
+    conn.execute(_ROLLUP_BACKFILL_SQL)
+
+# Schema migrations in order; PRAGMA user_version records how many have been applied
+MIGRATIONS = [
+    _create_events_table,
+    _add_label_counts,
+    _add_spatial_index,
+    _add_hourly_rollups,
+    _add_change_counters,
+    _add_write_generation,
+    _add_import_checkpoints,
+    _partition_by_month,
+    _add_full_text_search,
+    _add_filter_indexes,
+    _store_integer_timestamps,
+]
+
+def init_db() -> int:
+    """Initialize the database schema, applying any pending migrations, and return how many this call applied.
+
+    Worker processes starting together take turns through a startup lock file, so the
+    first one migrates and the others find nothing left to do. Each migration waits
+    for SQLite's write lock as long as other writers hold it.
+    """
+    applied = 0
+    with startup_lock(get_db_path()):
+        conn = get_conn()
+        cursor = conn.cursor()
+        try:
+            while cursor.execute("PRAGMA user_version").fetchone()[0] < len(MIGRATIONS):
+                begin_immediate(conn)
+                try:
+                    # Re-read under the write lock: a process without the startup lock may have migrated meanwhile
+                    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                    if version < len(MIGRATIONS):
+                        MIGRATIONS[version](cursor)
+                        cursor.execute(f"PRAGMA user_version = {version + 1}")
+                        applied += 1
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        finally:
+            conn.close()
+    return applied
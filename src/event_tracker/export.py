@@ -0,0 +1,196 @@
+import sqlite3
+import zlib
+from typing import Any, Iterator, Optional
+
+from src.event_tracker import fastjson
+from src.event_tracker.csv_export import EXPORT_CHUNK_SIZE, FIELDNAMES, iter_csv
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Export format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# Rows per Parquet row group; cursor chunks are buffered until a group is full
+PARQUET_ROW_GROUP_SIZE = 64000
+
+
+class ExportUnavailable(Exception):
+    """Raised when a format or compression needs an optional package that is not installed"""
+
+
+def check_available(fmt: str, compression: str) -> None:
+    """Raise ExportUnavailable unless `fmt` and `compression` can be produced here"""
+    if fmt in ("arrow", "parquet") and pa is None:
+        raise ExportUnavailable(
+            f"Export format '{fmt}' requires pyarrow (pip install 'fastapi-event-tracker[export]')"
+        )
+    if compression == "zstd" and zstandard is None:
+        raise ExportUnavailable(
+            "zstd compression requires zstandard (pip install 'fastapi-event-tracker[export]')"
+        )
+
+
+def content_encoding(fmt: str, compression: str) -> Optional[str]:
+    """HTTP Content-Encoding of the stream; Parquet compresses its pages itself instead"""
+    if compression == "none" or fmt == "parquet":
+        return None
+    return compression
+
+
+def iter_export(
+    cursor: sqlite3.Cursor,
+    fmt: str = "csv",
+    compression: str = "none",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Stream an executed cursor (rows in FIELDNAMES order) in an export format.
+
+    Every format is built from fetchmany() chunks of row tuples; Arrow and Parquet
+    transpose each chunk into typed columns and write it as one record batch or row
+    group. The first chunk is yielded as soon as the format's header is written.
+    """
+    check_available(fmt, compression)
+    if fmt == "csv":
+        chunks: Iterator[bytes] = (chunk.encode() for chunk in iter_csv(cursor, chunk_size))
+    elif fmt == "ndjson":
+        chunks = _iter_ndjson(cursor, chunk_size)
+    elif fmt == "arrow":
+        chunks = _iter_arrow(cursor, chunk_size)
+    elif fmt == "parquet":
+        return _iter_parquet(cursor, chunk_size, compression)
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    return _compress(chunks, compression)
+
+
+def _iter_ndjson(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator[bytes]:
+    """One JSON object per line, encoded by fastjson"""
+    yield b""
+    while True:
+        rows: list[Any] = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield b"".join(fastjson.dumps(dict(zip(FIELDNAMES, row))) + b"\n" for row in rows)
+
+
+def _arrow_schema() -> "pa.Schema":
+    """Column types of an exported event; ts is the ISO 8601 text the API returns"""
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("ts", pa.string()),
+            ("label", pa.string()),
+            ("description", pa.string()),
+            ("x", pa.float64()),
+            ("y", pa.float64()),
+            ("source", pa.string()),
+        ]
+    )
+
+
+def _record_batches(
+    cursor: sqlite3.Cursor, chunk_size: int, schema: "pa.Schema"
+) -> Iterator["pa.RecordBatch"]:
+    """Transpose each fetchmany() chunk into one record batch"""
+    while True:
+        rows: list[Any] = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        columns = zip(*rows)
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+
+class _ChunkSink:
+    """Write-only file object collecting bytes until drained; tell() counts everything written"""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._written = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._written += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._written
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        """Return the bytes written since the last drain"""
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _iter_arrow(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator[bytes]:
+    """Arrow IPC stream: the schema message, then one record batch per chunk"""
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pa_ipc.new_stream(pa.PythonFile(sink, mode="w"), schema) as writer:
+        yield sink.drain()
+        for batch in _record_batches(cursor, chunk_size, schema):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _iter_parquet(cursor: sqlite3.Cursor, chunk_size: int, compression: str) -> Iterator[bytes]:
+    """Parquet file of PARQUET_ROW_GROUP_SIZE-row groups, pages compressed with `compression`"""
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    pending: list[Any] = []
+    pending_rows = 0
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression=compression) as writer:
+        yield sink.drain()
+        for batch in _record_batches(cursor, chunk_size, schema):
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+                pending, pending_rows = [], 0
+            yield sink.drain()
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+    yield sink.drain()
+
+
+def _compress(chunks: Iterator[bytes], compression: str) -> Iterator[bytes]:
+    """Compress a byte stream incrementally as gzip or zstd"""
+    if compression == "none":
+        yield from chunks
+        return
+    if compression == "gzip":
+        compressor: Any = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    else:
+        compressor = zstandard.ZstdCompressor().compressobj()
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.flush()
@@ -0,0 +1,39 @@
+import json
+from typing import Any, Iterable
+
+from fastapi.responses import Response
+
+from src.event_tracker.crud import EVENT_COLUMNS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Same settings as JSONResponse.render; orjson only differs in exponent notation (1e-7 for 1e-07)
+_encode = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+).encode
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON of plain dicts, lists, strings, numbers and None; uses orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _encode(value).encode()
+
+
+def event_dicts(rows: Iterable[tuple]) -> list[dict]:
+    """Row tuples in EVENT_COLUMNS order as event dicts"""
+    return [dict(zip(EVENT_COLUMNS, row)) for row in rows]
+
+
+def encode_page(rows: Iterable[tuple], **fields: Any) -> bytes:
+    """JSON of a list page: `fields` followed by the rows as `items`, without building models"""
+    return dumps({**fields, "items": event_dicts(rows)})
+
+
+class EncodedJSONResponse(Response):
+    """application/json response whose body was already encoded by dumps()"""
+
+    media_type = "application/json"
@@ -0,0 +1,150 @@
+from datetime import datetime
+from typing import Any, Iterable, Optional, Union
+
+from src.event_tracker.timestamps import to_micros
+
+# Filter names in the order they are stored, compared and turned into SQL
+FILTER_FIELDS = (
+    "start",
+    "end",
+    "label",
+    "source",
+    "not_label",
+    "not_source",
+    "has_description",
+    "min_x",
+    "max_x",
+    "min_y",
+    "max_y",
+    "q",
+)
+
+
+def _values(value: Union[str, Iterable[str], None]) -> tuple[str, ...]:
+    """One value or a list of values as a sorted tuple without duplicates or blanks"""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = [value]
+    return tuple(sorted({item for item in value if item}))
+
+
+def _bound(value: Union[str, datetime, int, None]) -> Optional[int]:
+    """A start or end bound as a stored (integer) timestamp; an empty string means no bound"""
+    if value is None or value == "":
+        return None
+    return to_micros(value)
+
+
+class EventFilters:
+    """Normalized event filters shared by the list, count, export, stats and stream queries.
+
+    `start` and `end` take ISO 8601 strings, datetimes or stored timestamps and are
+    kept as stored timestamps (see timestamps.to_micros); ValueError if one does not
+    parse. `label` and `source` take one value or a list and match any of them;
+    `not_label` and `not_source` exclude values (events without a source are never
+    excluded).
+    `has_description` keeps only events with (True) or without (False) a non-empty
+    description. Empty strings and empty lists mean "no filter", so equal filter
+    sets compare equal however they were spelled.
+    """
+
+    __slots__ = FILTER_FIELDS
+
+    def __init__(
+        self,
+        start: Union[str, datetime, int, None] = None,
+        end: Union[str, datetime, int, None] = None,
+        label: Union[str, Iterable[str], None] = None,
+        source: Union[str, Iterable[str], None] = None,
+        not_label: Union[str, Iterable[str], None] = None,
+        not_source: Union[str, Iterable[str], None] = None,
+        has_description: Optional[bool] = None,
+        min_x: Optional[float] = None,
+        max_x: Optional[float] = None,
+        min_y: Optional[float] = None,
+        max_y: Optional[float] = None,
+        q: Optional[str] = None,
+    ) -> None:
+        self.start = _bound(start)
+        self.end = _bound(end)
+        self.label = _values(label)
+        self.source = _values(source)
+        self.not_label = _values(not_label)
+        self.not_source = _values(not_source)
+        self.has_description = has_description
+        self.min_x = min_x
+        self.max_x = max_x
+        self.min_y = min_y
+        self.max_y = max_y
+        self.q = q
+
+    def as_dict(self) -> dict[str, Any]:
+        """The filters as keyword arguments, e.g. for the crud functions or a cache key"""
+        return {name: getattr(self, name) for name in FILTER_FIELDS}
+
+    def with_range(self, start: Optional[int], end: Optional[int]) -> "EventFilters":
+        """The same filters over another time range"""
+        return EventFilters(**{**self.as_dict(), "start": start, "end": end})
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, EventFilters) and self.as_dict() == other.as_dict()
+
+    def __hash__(self) -> int:
+        return hash(tuple(self.as_dict().values()))
+
+    def __repr__(self) -> str:
+        given = ", ".join(
+            f"{name}={value!r}" for name, value in self.as_dict().items() if value not in (None, ())
+        )
+        return f"EventFilters({given})"
+
+    @property
+    def has_bbox(self) -> bool:
+        """Whether any bounding-box side is set"""
+        return any(value is not None for value in (self.min_x, self.max_x, self.min_y, self.max_y))
+
+    @property
+    def label_only(self) -> bool:
+        """Whether only label and not_label are set, so the label counters can answer counts"""
+        return (
+            self.start is None
+            and self.end is None
+            and self.has_description is None
+            and not any((self.source, self.not_source, self.q, self.has_bbox))
+        )
+
+    def matches(self, event: dict) -> bool:
+        """Whether an event dict passes every filter but `q`, which needs the search index.
+
+        Like the SQL filters, an event without a coordinate fails any bound on it.
+        """
+        if self.start is not None or self.end is not None:
+            ts = to_micros(event["ts"])
+            if (self.start is not None and ts < self.start) or (
+                self.end is not None and ts > self.end
+            ):
+                return False
+        if self.label and event["label"] not in self.label:
+            return False
+        if self.not_label and event["label"] in self.not_label:
+            return False
+        if self.source and event["source"] not in self.source:
+            return False
+        if self.not_source and event["source"] in self.not_source:
+            return False
+        if self.has_description is not None and bool(event["description"]) != self.has_description:
+            return False
+        for value, low, high in (
+            (event["x"], self.min_x, self.max_x),
+            (event["y"], self.min_y, self.max_y),
+        ):
+            if low is None and high is None:
+                continue
+            if (
+                value is None
+                or (low is not None and value < low)
+                or (high is not None and value > high)
+            ):
+                return False
+        return True
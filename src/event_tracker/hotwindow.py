@@ -0,0 +1,526 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from src.event_tracker import partitions
+from src.event_tracker.cache import DataVersionWatch
+from src.event_tracker.db import get_db_path
+from src.event_tracker.filters import EventFilters
+from src.event_tracker.timestamps import INTERVAL_MICROS, to_iso
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# The window is trimmed back to its size only after growing this fraction past it,
+# so inserts do not shift the arrays every time
+TRIM_SLACK = 0.25
+
+# A stale window is rebuilt from SQLite at most this often; reads in between go to SQLite
+RELOAD_INTERVAL_SECONDS = 1.0
+
+# Rows filtered in the first slice of a newest-first page; each further slice is twice as large
+SCAN_SLICE_ROWS = 4096
+
+# Rows fetched per fetchmany() while loading the window
+LOAD_CHUNK_SIZE = 10000
+
+
+def iso_texts(keys: "np.ndarray") -> list[str]:
+    """timestamps.to_iso of many stored timestamps at once"""
+    texts = np.datetime_as_string(keys.astype("datetime64[us]"), unit="us").tolist()
+    return [text[:19] if text.endswith(".000000") else text for text in texts]
+
+
+class _Codes:
+    """Interned strings: each distinct value gets a small integer code, None is -1"""
+
+    def __init__(self) -> None:
+        self.codes: dict[str, int] = {}
+        self.names: list[str] = []
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.names)
+            self.names.append(value)
+        return code
+
+    def lookup(self, values: tuple[str, ...]) -> "np.ndarray":
+        """Codes of the values seen so far; values never seen match nothing"""
+        return np.array(
+            [self.codes[value] for value in values if value in self.codes], dtype=np.int32
+        )
+
+    def name(self, code: int) -> Optional[str]:
+        return self.names[code] if code >= 0 else None
+
+
+# Column name -> NumPy dtype of the window arrays
+_COLUMNS = {
+    "key": "int64",
+    "id": "int64",
+    "label": "int32",
+    "source": "int32",
+    "x": "float64",
+    "y": "float64",
+    "has_description": "bool",
+}
+
+
+class HotWindow:
+    """The most recent events held in memory as sorted columnar NumPy arrays.
+
+    Rows are kept in (ts, id) order with ts as the stored int64 microseconds, label
+    and source as interned int32 codes, x/y as float64 (NaN for missing) and a has_description
+    flag; descriptions stay in a parallel list. Every event whose ts is at least
+    `floor` is held (all events while `floor` is None), so a query can be answered
+    here when its start lies at or above the floor, or, for newest-first pages,
+    when the window alone yields a full page.
+
+    The arrays reflect one write_gen of event_meta. Inserts and deletes made through
+    crud report the generation they committed and are applied in place; any other
+    write (another process, the importer, retention) leaves the window stale until
+    it is reloaded from SQLite, which happens at most every RELOAD_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, db_path: str, max_events: int, max_hours: Optional[float]) -> None:
+        self.db_path = db_path
+        self.max_events = max_events
+        self.max_age = int(max_hours * 3_600_000_000) if max_hours else None
+        self._slack = max(1, int(max_events * TRIM_SLACK))
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watch = DataVersionWatch(db_path, ("write_gen",), lambda key, old, new: None)
+        self._generation: Optional[int] = None
+        self._loaded_at = float("-inf")
+        self._labels = _Codes()
+        self._sources = _Codes()
+        self._set_rows([], None)
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    # Loading
+
+    def _set_rows(self, rows: list[tuple], floor: Optional[int]) -> None:
+        """Replace the arrays with (key, id, label, description, x, y, source) rows in ascending order"""
+        capacity = max(len(rows), 16)
+        self._arrays = {name: np.empty(capacity, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._descriptions: list[Optional[str]] = []
+        self._size = 0
+        self._floor = floor
+        if rows:
+            key, event_id, label, description, x, y, source = zip(*rows)
+            size = len(rows)
+            self._arrays["key"][:size] = key
+            self._arrays["id"][:size] = event_id
+            self._arrays["label"][:size] = [self._labels.code(value) for value in label]
+            self._arrays["source"][:size] = [self._sources.code(value) for value in source]
+            self._arrays["x"][:size] = [np.nan if value is None else value for value in x]
+            self._arrays["y"][:size] = [np.nan if value is None else value for value in y]
+            self._arrays["has_description"][:size] = [bool(value) for value in description]
+            self._descriptions = list(description)
+            self._size = size
+
+    def reload(self, conn) -> None:
+        """Rebuild the window from the newest partitions, unless another thread is already at it"""
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            conn.execute("BEGIN")
+            try:
+                generation = conn.execute(
+                    "SELECT value FROM event_meta WHERE key = 'write_gen'"
+                ).fetchone()[0]
+                rows, floor = self._load_rows(conn)
+            finally:
+                conn.commit()
+            with self._lock:
+                self._set_rows(rows, floor)
+                self._generation = generation
+                self._loaded_at = time.monotonic()
+                self.reloads += 1
+        finally:
+            self._reload_lock.release()
+
+    def _load_rows(self, conn) -> tuple[list[tuple], Optional[int]]:
+        """Newest rows first from each partition until the window is full; returns them oldest first with the floor"""
+        rows: list[tuple] = []
+        floor: Optional[int] = None
+        threshold: Optional[int] = None
+        for _, table, _, _ in reversed(partitions.list_partitions(conn)):
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
+                f"SELECT id, ts, label, description, x, y, source FROM {table} ORDER BY ts DESC, id DESC"
+            )
+            while floor is None:
+                chunk = cursor.fetchmany(LOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                for event_id, key, label, description, x, y, source in chunk:
+                    if threshold is None and self.max_age is not None:
+                        threshold = key - self.max_age
+                    if threshold is not None and key < threshold:
+                        floor = threshold
+                        break
+                    if len(rows) == self.max_events:
+                        # The oldest ts may continue past the limit, so drop it as a whole
+                        floor = rows[-1][0] + 1
+                        while rows and rows[-1][0] < floor:
+                            rows.pop()
+                        break
+                    rows.append((key, event_id, label, description, x, y, source))
+            cursor.close()
+            if floor is not None:
+                break
+        rows.reverse()
+        return rows, floor
+
+    def _fresh(self, conn) -> bool:
+        """Whether the arrays reflect the latest commit, reloading them when stale and due"""
+        self._watch.check()
+        if self._generation == self._watch.value("write_gen"):
+            return True
+        if time.monotonic() - self._loaded_at >= RELOAD_INTERVAL_SECONDS:
+            self.reload(conn)
+            return self._generation == self._watch.value("write_gen")
+        return False
+
+    # Writes made through crud
+
+    def apply_inserts(self, ids: list[int], rows: list[tuple], generation: int) -> None:
+        """Add (ts, label, description, x, y, source) rows committed at write_gen `generation`"""
+        with self._lock:
+            # Every inserted row bumps write_gen once; anything else means a write was missed
+            if self._generation is None or self._generation != generation - len(rows):
+                return
+            for event_id, (key, label, description, x, y, source) in zip(ids, rows):
+                if self._floor is None or key >= self._floor:
+                    self._insert(key, event_id, label, description, x, y, source)
+            self._generation = generation
+            self._trim()
+
+    def apply_delete(self, event_id: int, ts: int, generation: int) -> None:
+        """Drop an event whose delete committed at write_gen `generation`"""
+        with self._lock:
+            if self._generation is None or self._generation != generation - 1:
+                return
+            keys, ids = self._arrays["key"][: self._size], self._arrays["id"][: self._size]
+            lo, hi = np.searchsorted(keys, ts, "left"), np.searchsorted(keys, ts, "right")
+            position = lo + int(np.searchsorted(ids[lo:hi], event_id, "left"))
+            if position < hi and ids[position] == event_id:
+                for array in self._arrays.values():
+                    array[position : self._size - 1] = array[position + 1 : self._size]
+                del self._descriptions[position]
+                self._size -= 1
+            self._generation = generation
+
+    def _insert(
+        self,
+        key: int,
+        event_id: int,
+        label: str,
+        description: Optional[str],
+        x: Optional[float],
+        y: Optional[float],
+        source: Optional[str],
+    ) -> None:
+        """Insert one row at its (ts, id) position; new ids are the largest, so it goes after equal keys"""
+        if self._size == len(self._arrays["key"]):
+            for name, array in self._arrays.items():
+                grown = np.empty(len(array) * 2, dtype=array.dtype)
+                grown[: self._size] = array[: self._size]
+                self._arrays[name] = grown
+        keys = self._arrays["key"]
+        position = self._size
+        if self._size and keys[self._size - 1] > key:
+            position = int(np.searchsorted(keys[: self._size], key, "right"))
+        values = {
+            "key": key,
+            "id": event_id,
+            "label": self._labels.code(label),
+            "source": self._sources.code(source),
+            "x": np.nan if x is None else x,
+            "y": np.nan if y is None else y,
+            "has_description": bool(description),
+        }
+        for name, array in self._arrays.items():
+            if position < self._size:
+                array[position + 1 : self._size + 1] = array[position : self._size]
+            array[position] = values[name]
+        self._descriptions.insert(position, description)
+        self._size += 1
+
+    def _trim(self) -> None:
+        """Drop the oldest rows once the window is TRIM_SLACK past its size or age, keeping whole timestamps"""
+        keys = self._arrays["key"][: self._size]
+        cut = self._size - self.max_events if self._size > self.max_events + self._slack else 0
+        if self.max_age is not None and self._size:
+            aged = int(np.searchsorted(keys, keys[-1] - self.max_age, "left"))
+            if aged >= self._slack:
+                cut = max(cut, aged)
+        if cut <= 0:
+            return
+        cut = int(np.searchsorted(keys, keys[cut - 1], "right"))
+        floor = int(keys[cut - 1]) + 1
+        remaining = self._size - cut
+        for array in self._arrays.values():
+            array[:remaining] = array[cut : self._size]
+        del self._descriptions[:cut]
+        self._size = remaining
+        self._floor = floor
+
+    # Queries
+
+    def _range(self, filters: EventFilters) -> Optional[tuple[int, int, bool]]:
+        """(lo, hi) positions of the filters' time range and whether the window covers all of it"""
+        if filters.q is not None:
+            return None
+        keys = self._arrays["key"][: self._size]
+        lo, hi, start = 0, self._size, filters.start
+        if start is not None:
+            lo = int(np.searchsorted(keys, start, "left"))
+        if filters.end is not None:
+            hi = int(np.searchsorted(keys, filters.end, "right"))
+        covered = self._floor is None or (start is not None and start >= self._floor)
+        return lo, hi, covered
+
+    def _matches(self, lo: int, hi: int, filters: EventFilters) -> "np.ndarray":
+        """Positions in [lo, hi) of the rows passing the row filters, ascending"""
+        columns = {name: array[lo:hi] for name, array in self._arrays.items()}
+        mask = np.ones(max(hi - lo, 0), dtype=bool)
+        if filters.label:
+            mask &= np.isin(columns["label"], self._labels.lookup(filters.label))
+        if filters.source:
+            mask &= np.isin(columns["source"], self._sources.lookup(filters.source))
+        if filters.not_label:
+            mask &= ~np.isin(columns["label"], self._labels.lookup(filters.not_label))
+        if filters.not_source:
+            mask &= (columns["source"] < 0) | ~np.isin(
+                columns["source"], self._sources.lookup(filters.not_source)
+            )
+        if filters.has_description is not None:
+            mask &= columns["has_description"] == filters.has_description
+        # NaN (missing) coordinates fail every comparison, as NULL does in SQL
+        for column, value, keep in (
+            ("x", filters.min_x, np.greater_equal),
+            ("x", filters.max_x, np.less_equal),
+            ("y", filters.min_y, np.greater_equal),
+            ("y", filters.max_y, np.less_equal),
+        ):
+            if value is not None:
+                mask &= keep(columns[column], value)
+        return np.flatnonzero(mask) + lo
+
+    def _answered(self, answer: Any) -> Any:
+        if answer is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return answer
+
+    def list_rows(
+        self,
+        conn,
+        filters: EventFilters,
+        limit: int,
+        offset: int,
+        after: Optional[tuple[int, int]],
+        sort: str,
+    ) -> Optional[list[tuple]]:
+        """A newest-first page as EVENT_COLUMNS tuples, or None when SQLite has to answer"""
+        if sort != "newest" or not self._fresh(conn):
+            return self._answered(None)
+        with self._lock:
+            bounds = self._range(filters)
+            if bounds is None:
+                return self._answered(None)
+            lo, hi, covered = bounds
+            if filters.has_bbox and not covered:
+                # A box matches few of the newest events; the R*Tree finds them faster than scanning down
+                return self._answered(None)
+            if after is not None:
+                after_key = after[0]
+                keys, ids = self._arrays["key"][: self._size], self._arrays["id"][: self._size]
+                first, last = (
+                    np.searchsorted(keys, after_key, "left"),
+                    np.searchsorted(keys, after_key, "right"),
+                )
+                hi = min(hi, int(first + np.searchsorted(ids[first:last], after[1], "left")))
+            # Filter newest first in growing slices, so a page of common events only looks at the top of the window
+            wanted = offset + limit
+            found: list["np.ndarray"] = []
+            count = 0
+            step = max(2 * wanted, SCAN_SLICE_ROWS)
+            while hi > lo and count < wanted:
+                bottom = max(lo, hi - step)
+                matches = self._matches(bottom, hi, filters)[::-1]
+                found.append(matches)
+                count += len(matches)
+                hi, step = bottom, step * 2
+            # Rows below the floor are older than every row here, so a full page is always right
+            if count < wanted and not covered:
+                return self._answered(None)
+            newest = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+            return self._answered(self._rows(newest[offset:wanted]))
+
+    def _rows(self, positions: "np.ndarray") -> list[tuple]:
+        """EVENT_COLUMNS tuples of the rows at `positions`"""
+        columns = {name: self._arrays[name][positions].tolist() for name in ("id", "x", "y")}
+        labels, sources = self._labels.names, self._sources.names
+        return [
+            (
+                event_id,
+                ts,
+                labels[label],
+                self._descriptions[position],
+                None if x != x else x,
+                None if y != y else y,
+                sources[source] if source >= 0 else None,
+            )
+            for position, ts, event_id, label, source, x, y in zip(
+                positions.tolist(),
+                iso_texts(self._arrays["key"][positions]),
+                columns["id"],
+                self._arrays["label"][positions].tolist(),
+                self._arrays["source"][positions].tolist(),
+                columns["x"],
+                columns["y"],
+            )
+        ]
+
+    def count(self, conn, filters: EventFilters, cap: Optional[int]) -> Optional[int]:
+        """Number of matching events, or None when SQLite has to answer"""
+        if not self._fresh(conn):
+            return self._answered(None)
+        with self._lock:
+            bounds = self._range(filters)
+            if bounds is None or not bounds[2]:
+                return self._answered(None)
+            count = len(self._matches(bounds[0], bounds[1], filters))
+            return self._answered(min(count, cap) if cap is not None else count)
+
+    def stats_parts(
+        self, conn, filters: EventFilters, interval: str, group_columns: list[str]
+    ) -> Optional[list[dict]]:
+        """Per-bucket aggregates in the shape crud._merge_stats takes, or None when SQLite has to answer"""
+        if not self._fresh(conn):
+            return self._answered(None)
+        with self._lock:
+            bounds = self._range(filters)
+            if bounds is None or not bounds[2]:
+                return self._answered(None)
+            matches = self._matches(bounds[0], bounds[1], filters)
+            if not len(matches):
+                return self._answered([])
+            groups = [self._arrays["key"][matches] // INTERVAL_MICROS[interval]]
+            groups += [self._arrays[column][matches].astype(np.int64) for column in group_columns]
+            keys, inverse = np.unique(np.stack(groups, axis=1), axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            size = len(keys)
+            aggregates: dict[str, list] = {"n": np.bincount(inverse, minlength=size).tolist()}
+            for column in ("x", "y"):
+                values = self._arrays[column][matches]
+                present = ~np.isnan(values)
+                low, high = np.full(size, np.inf), np.full(size, -np.inf)
+                np.fmin.at(low, inverse, values)
+                np.fmax.at(high, inverse, values)
+                counts = (
+                    np.bincount(inverse, weights=present, minlength=size).astype(np.int64).tolist()
+                )
+                aggregates[f"n_{column}"] = counts
+                aggregates[f"sum_{column}"] = np.bincount(
+                    inverse, weights=np.where(present, values, 0.0), minlength=size
+                ).tolist()
+                aggregates[f"min_{column}"] = [
+                    value if n else None for value, n in zip(low.tolist(), counts)
+                ]
+                aggregates[f"max_{column}"] = [
+                    value if n else None for value, n in zip(high.tolist(), counts)
+                ]
+            names = {"label": self._labels.name, "source": self._sources.name}
+            parts = []
+            for index, group in enumerate(keys.tolist()):
+                part = {"period": group[0] * INTERVAL_MICROS[interval]}
+                part.update(
+                    {column: names[column](code) for column, code in zip(group_columns, group[1:])}
+                )
+                part.update({field: values[index] for field, values in aggregates.items()})
+                parts.append(part)
+            return self._answered(parts)
+
+    def stats(self) -> dict:
+        """Size, coverage and hit/miss/reload counters"""
+        with self._lock:
+            return {
+                "size": self._size,
+                "max_events": self.max_events,
+                "floor": to_iso(self._floor) if self._floor is not None else None,
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+            }
+
+    def close(self) -> None:
+        """Release the watch connection"""
+        self._watch.close()
+
+
+_hot_window: Optional[HotWindow] = None
+_hot_window_lock = threading.Lock()
+# Whether the missing-numpy warning was logged; it is logged once per process
+_warned_no_numpy = False
+
+
+def get_hot_window() -> Optional[HotWindow]:
+    """Get the hot window for the current database path, or None if disabled.
+
+    EVENTS_HOT_WINDOW_EVENTS sets the number of recent events held (0, the default,
+    disables the window) and EVENTS_HOT_WINDOW_HOURS how far back from the newest
+    event it reaches (0 for no age limit). The window needs numpy.
+    """
+    global _hot_window, _warned_no_numpy
+    size = int(os.environ.get("EVENTS_HOT_WINDOW_EVENTS", "0"))
+    if size <= 0:
+        return None
+    if np is None:
+        with _hot_window_lock:
+            if not _warned_no_numpy:
+                _warned_no_numpy = True
+                logger.warning(
+                    "EVENTS_HOT_WINDOW_EVENTS is set but numpy is not installed; the hot window is disabled"
+                )
+        return None
+    db_path = get_db_path()
+    with _hot_window_lock:
+        if _hot_window is None or _hot_window.db_path != db_path or _hot_window.max_events != size:
+            if _hot_window is not None:
+                _hot_window.close()
+            hours = float(os.environ.get("EVENTS_HOT_WINDOW_HOURS", "0"))
+            _hot_window = HotWindow(db_path, size, hours if hours > 0 else None)
+        return _hot_window
+
+
+def hot_window_stats() -> Optional[dict]:
+    """Counters of the hot window, or None if it was never created"""
+    with _hot_window_lock:
+        return _hot_window.stats() if _hot_window is not None else None
+
+
+def close_hot_window() -> None:
+    """Drop the hot window, if one was created"""
+    global _hot_window
+    with _hot_window_lock:
+        if _hot_window is not None:
+            _hot_window.close()
+            _hot_window = None
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+from src.event_tracker.filters import EventFilters
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_POLICIES = ("disconnect", "drop_oldest")
+
+
+class TooManySubscribers(Exception):
+    """Raised when the hub already serves its maximum number of subscribers"""
+
+
+class Subscription:
+    """One subscriber: its filter and a bounded queue of events waiting to be sent.
+
+    Events are offered from any thread and consumed by one coroutine on `loop`. When
+    the queue is full, the "disconnect" policy ends the subscription (the client
+    resumes from the last id it got, reading the gap from the database) and
+    "drop_oldest" discards the oldest queued event and counts it in `dropped`.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        event_filters: EventFilters,
+        maxsize: int,
+        policy: str,
+    ) -> None:
+        self.filters = event_filters
+        self.maxsize = maxsize
+        self.policy = policy
+        self.overflowed = False
+        self.closed = False
+        self.dropped = 0
+        self._loop = loop
+        self._queue: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def offer(self, events: list[dict]) -> int:
+        """Queue the matching events and wake the consumer; return how many were queued"""
+        queued = 0
+        with self._lock:
+            if self.closed:
+                return 0
+            for event in events:
+                if not self.filters.matches(event):
+                    continue
+                if len(self._queue) >= self.maxsize:
+                    if self.policy == "disconnect":
+                        self.overflowed = self.closed = True
+                        self._queue.clear()
+                        break
+                    self._queue.popleft()
+                    self.dropped += 1
+                self._queue.append(event)
+                queued += 1
+        if queued or self.closed:
+            self._wake()
+        return queued
+
+    def close(self) -> None:
+        """End the subscription; the consumer gets None once it has drained the queue"""
+        with self._lock:
+            self.closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        """Set the ready flag on the consumer's loop, which may belong to another thread"""
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The loop is gone, so nobody is waiting
+            pass
+
+    async def next_batch(self, timeout: float) -> Optional[list[dict]]:
+        """Every queued event, [] if none arrived within `timeout` seconds, or None once closed"""
+        with self._lock:
+            if not self._queue and not self.closed:
+                self._ready.clear()
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        with self._lock:
+            batch = list(self._queue)
+            self._queue.clear()
+            self._ready.clear()
+            if not batch and self.closed:
+                return None
+        return batch
+
+
+class EventHub:
+    """In-process fan-out of newly committed events to stream subscribers.
+
+    Writers hold `publish_lock` across their commit and publish() call, so every
+    subscriber sees events in commit order and thus in increasing id order. `last_id`
+    is the newest id published; events other processes commit are found above it by
+    the poll function passed to follow().
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        policy: str = "disconnect",
+        max_subscribers: int = 1000,
+        poll_interval: float = 0.2,
+    ) -> None:
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(
+                f"Invalid slow consumer policy {policy!r}, expected one of {list(SLOW_CONSUMER_POLICIES)}"
+            )
+        if queue_size < 1:
+            raise ValueError("Subscriber queues need room for at least one event")
+        self.queue_size = queue_size
+        self.policy = policy
+        self.max_subscribers = max_subscribers
+        self.poll_interval = poll_interval
+        self.last_id = 0
+        self.publish_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._subscribers: list[Subscription] = []
+        self._published = 0
+        self._delivered = 0
+        self._disconnected = 0
+        self._dropped = 0
+        self._follower: Optional[threading.Thread] = None
+        self._stop_following = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone is subscribed, so writers can skip building events for nobody"""
+        return bool(self._subscribers)
+
+    def subscribe(
+        self, loop: asyncio.AbstractEventLoop, event_filters: EventFilters
+    ) -> Subscription:
+        """Register a subscriber consuming on `loop`, or raise TooManySubscribers"""
+        subscription = Subscription(loop, event_filters, self.queue_size, self.policy)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers("Too many event stream subscribers")
+            self._subscribers = [*self._subscribers, subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber and fold its counters into the hub's"""
+        subscription.close()
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers = [
+                    other for other in self._subscribers if other is not subscription
+                ]
+                self._dropped += subscription.dropped
+                self._disconnected += subscription.overflowed
+
+    def publish(self, events: list[dict]) -> None:
+        """Offer committed events to every subscriber; never blocks on a slow one"""
+        subscribers = self._subscribers
+        delivered = sum(subscription.offer(events) for subscription in subscribers)
+        with self._lock:
+            self._published += len(events)
+            self._delivered += delivered
+            if events:
+                self.last_id = max(self.last_id, events[-1]["id"])
+
+    def follow(self, poll: Callable[[], None]) -> None:
+        """Call `poll` every poll_interval seconds while anyone is subscribed, from one background thread.
+
+        `poll` publishes what other processes committed, so streams of every worker
+        see every event. Starting an already running follower does nothing.
+        """
+        with self._lock:
+            if self._follower is not None and self._follower.is_alive():
+                return
+            stop = self._stop_following = threading.Event()
+            self._follower = threading.Thread(
+                target=self._follow, args=(poll, stop), name="stream-follower", daemon=True
+            )
+            self._follower.start()
+
+    def _follow(self, poll: Callable[[], None], stop: threading.Event) -> None:
+        while not stop.wait(self.poll_interval):
+            if not self.active:
+                continue
+            try:
+                poll()
+            except Exception as exc:
+                logger.warning("Polling for events committed by other processes failed: %s", exc)
+
+    def close(self) -> None:
+        """End every subscription and stop following other processes, e.g. on shutdown"""
+        with self._lock:
+            subscribers = self._subscribers
+            follower, self._follower = self._follower, None
+        self._stop_following.set()
+        for subscription in subscribers:
+            subscription.close()
+        if follower is not None and follower is not threading.current_thread():
+            follower.join()
+
+    def stats(self) -> dict:
+        """Subscriber count and delivery counters"""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "delivered": self._delivered,
+                "disconnected": self._disconnected + sum(s.overflowed for s in self._subscribers),
+                "dropped": self._dropped + sum(s.dropped for s in self._subscribers),
+            }
+
+
+_hub: Optional[EventHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_hub() -> EventHub:
+    """Get (creating on first use) the process-wide event hub.
+
+    EVENTS_STREAM_QUEUE sets the events queued per subscriber, EVENTS_STREAM_SLOW_POLICY
+    what happens when that queue is full, EVENTS_STREAM_MAX_CLIENTS the number of
+    concurrent subscribers and EVENTS_STREAM_POLL_MS how often the database is checked
+    for events committed by other processes.
+    """
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = EventHub(
+                queue_size=int(os.environ.get("EVENTS_STREAM_QUEUE", "1000")),
+                policy=os.environ.get("EVENTS_STREAM_SLOW_POLICY", "disconnect").lower(),
+                max_subscribers=int(os.environ.get("EVENTS_STREAM_MAX_CLIENTS", "1000")),
+                poll_interval=float(os.environ.get("EVENTS_STREAM_POLL_MS", "200")) / 1000,
+            )
+        return _hub
+
+
+def hub_stats() -> Optional[dict]:
+    """Counters of the hub, or None if it was never created"""
+    with _hub_lock:
+        return _hub.stats() if _hub is not None else None
+
+
+def close_hub() -> None:
+    """End every subscription and drop the hub, if one was created"""
+    global _hub
+    with _hub_lock:
+        hub, _hub = _hub, None
+    if hub is not None:
+        hub.close()
@@ -0,0 +1,254 @@
+import csv
+import gzip
+import json
+import sqlite3
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.event_tracker import crud
+from src.event_tracker.locks import write_transaction
+from src.event_tracker.schemas import BulkItemError, EventRow
+from src.event_tracker.timestamps import to_micros
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Records validated together and written with one executemany() call
+IMPORT_BATCH_SIZE = 5000
+
+# Records per transaction; each commit also records the import checkpoint
+IMPORT_COMMIT_EVERY = 100000
+
+# Rejected records reported in detail; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+_ROWS = TypeAdapter(list[EventRow])
+
+_OPTIONAL_COLUMNS = ("description", "x", "y", "source")
+
+
+class ImportFormatError(ValueError):
+    """Raised when the input cannot be read as the requested format at all"""
+
+
+class _InvalidJSON:
+    """Stands in for an NDJSON line that is not valid JSON"""
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def detect_format(path: str) -> str:
+    """Guess the import format from a file name (.csv, .ndjson, .jsonl, optionally .gz)"""
+    name = path.lower().removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise ImportFormatError(f"Cannot tell the format of {path!r}; pass it explicitly")
+
+
+def open_text(path: str) -> TextIO:
+    """Open an import file as text, decompressing .gz files on the fly"""
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Any]:
+    """Parse CSV (as written by the CSV export) or NDJSON lines into raw records"""
+    if fmt == "csv":
+        return _iter_csv_records(lines)
+    if fmt == "ndjson":
+        return _iter_ndjson_records(lines)
+    raise ImportFormatError(
+        f"Unknown import format {fmt!r}, expected one of {list(IMPORT_FORMATS)}"
+    )
+
+
+def _iter_csv_records(lines: Iterable[str]) -> Iterator[dict]:
+    """Map CSV rows to dicts by header; empty optional cells become null and `id` is ignored"""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    missing = {"ts", "label"} - set(header)
+    if missing:
+        raise ImportFormatError(f"CSV header is missing {sorted(missing)}")
+    columns = [
+        (position, name) for position, name in enumerate(header) if name in EventRow.__annotations__
+    ]
+    for row in reader:
+        if not row:
+            continue
+        record = {}
+        for position, name in columns:
+            value = row[position] if position < len(row) else ""
+            if value == "" and name in _OPTIONAL_COLUMNS:
+                continue
+            record[name] = value
+        yield record
+
+
+def _iter_ndjson_records(lines: Iterable[str]) -> Iterator[Any]:
+    """Decode one JSON value per non-blank line"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield _InvalidJSON(str(exc))
+
+
+def validate_batch(records: list[Any], first_index: int) -> tuple[list[tuple], list[BulkItemError]]:
+    """Validate a batch in one pydantic call; return insert tuples and per-record errors.
+
+    Records are validated as plain dicts against EventRow, so no model object is
+    created per record. When some records fail, the valid rest is validated again
+    without them. Error indexes count records from the start of the input.
+    """
+    errors: list[BulkItemError] = []
+    candidates: list[tuple[int, Any]] = []
+    for offset, record in enumerate(records):
+        if isinstance(record, _InvalidJSON):
+            errors.append(
+                BulkItemError(
+                    index=first_index + offset,
+                    errors=[
+                        {
+                            "type": "json_invalid",
+                            "loc": [],
+                            "msg": f"Invalid JSON: {record.message}",
+                        }
+                    ],
+                )
+            )
+        else:
+            candidates.append((first_index + offset, record))
+
+    try:
+        rows = _ROWS.validate_python([record for _, record in candidates])
+    except ValidationError as exc:
+        failed: dict[int, list[dict]] = {}
+        for error in exc.errors(include_url=False, include_context=False, include_input=False):
+            failed.setdefault(error["loc"][0], []).append({**error, "loc": list(error["loc"][1:])})
+        errors.extend(
+            BulkItemError(index=candidates[position][0], errors=item_errors)
+            for position, item_errors in failed.items()
+        )
+        errors.sort(key=lambda error: error.index)
+        candidates = [
+            candidate for position, candidate in enumerate(candidates) if position not in failed
+        ]
+        rows = _ROWS.validate_python([record for _, record in candidates])
+
+    params = [
+        (
+            to_micros(row["ts"]),
+            row["label"],
+            row.get("description"),
+            row.get("x"),
+            row.get("y"),
+            row.get("source"),
+        )
+        for row in rows
+    ]
+    return params, errors
+
+
+def _batches(records: Iterator[Any], size: int) -> Iterator[list[Any]]:
+    """Split an iterator into lists of at most `size` items"""
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def get_checkpoint(conn: sqlite3.Connection, name: str) -> Optional[dict]:
+    """Progress last committed by the import called `name`, or None"""
+    row = conn.execute(
+        "SELECT records, inserted, rejected, updated_at FROM event_imports WHERE name = ?", (name,)
+    ).fetchone()
+    return dict(zip(("records", "inserted", "rejected", "updated_at"), row)) if row else None
+
+
+def _save_checkpoint(
+    conn: sqlite3.Connection, name: str, records: int, inserted: int, rejected: int
+) -> None:
+    """Record progress inside the transaction that wrote those records"""
+    conn.execute(
+        """
+        INSERT INTO event_imports (name, records, inserted, rejected, updated_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            records = excluded.records, inserted = excluded.inserted,
+            rejected = excluded.rejected, updated_at = excluded.updated_at
+        """,
+        (name, records, inserted, rejected, datetime.now(timezone.utc).isoformat()),
+    )
+
+
+def import_records(
+    conn: sqlite3.Connection,
+    records: Iterable[Any],
+    name: Optional[str] = None,
+    resume: bool = False,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    commit_every: int = IMPORT_COMMIT_EVERY,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+) -> dict:
+    """Validate and insert a stream of raw records in batches and chunked transactions.
+
+    Each transaction holds about `commit_every` records written with executemany() in
+    `batch_size` batches. With a `name`, the number of records consumed is saved in
+    event_imports in the same transaction, so `resume=True` skips exactly the records
+    already committed by an earlier, interrupted run of the same input. A failure
+    rolls back only the current transaction. `progress(records, inserted, rejected)`
+    is called after every commit.
+    """
+    if batch_size < 1 or commit_every < 1:
+        raise ValueError("batch_size and commit_every must be at least 1")
+    consumed = inserted = rejected = 0
+    if name is not None and resume:
+        checkpoint = get_checkpoint(conn, name)
+        if checkpoint is not None:
+            consumed, inserted, rejected = (
+                checkpoint["records"],
+                checkpoint["inserted"],
+                checkpoint["rejected"],
+            )
+    records = islice(iter(records), consumed, None)
+    errors: list[BulkItemError] = []
+
+    batches = _batches(records, batch_size)
+    finished = False
+    while not finished:
+        # One transaction per `commit_every` records; other writers get their turn in between
+        uncommitted = 0
+        with write_transaction(conn):
+            for batch in batches:
+                params, batch_errors = validate_batch(batch, consumed)
+                crud.insert_event_rows(conn, params)
+                consumed += len(batch)
+                inserted += len(params)
+                rejected += len(batch_errors)
+                errors.extend(batch_errors[: MAX_REPORTED_ERRORS - len(errors)])
+                uncommitted += len(batch)
+                if uncommitted >= commit_every:
+                    break
+            else:
+                finished = True
+            if name is not None:
+                _save_checkpoint(conn, name, consumed, inserted, rejected)
+            conn.commit()
+        if progress is not None:
+            progress(consumed, inserted, rejected)
+    return {"records": consumed, "inserted": inserted, "rejected": rejected, "errors": errors}
+
+
+def import_stream(conn: sqlite3.Connection, stream: TextIO, fmt: str, **options: Any) -> dict:
+    """Import every record of an open text stream; options are passed to import_records"""
+    return import_records(conn, iter_records(stream, fmt), **options)
@@ -0,0 +1,203 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from src.event_tracker import crud
+from src.event_tracker.db import get_pool
+from src.event_tracker.locks import WriteTimeout, is_busy
+from src.event_tracker.schemas import EventCreate
+
+logger = logging.getLogger(__name__)
+
+ACK_MODES = ("accepted", "committed")
+
+# Attempts per group commit before the batch is failed; only failures to get the write lock
+# are retried, since anything later may come after the commit
+FLUSH_ATTEMPTS = 3
+
+
+class BufferFull(Exception):
+    """Raised when the write-behind queue is at its maximum depth"""
+
+
+class BufferClosed(Exception):
+    """Raised when submitting to a buffer that is shutting down"""
+
+
+_STOP = object()
+
+
+class WriteBehindBuffer:
+    """In-process queue of validated events written by one background thread in group commits.
+
+    The writer takes the first waiting event, keeps collecting until `max_batch` events
+    are gathered or `window` seconds have passed, and writes the whole batch with
+    crud.create_events in a single transaction. Each submitted event gets a Future that
+    resolves to its id once the batch holding it has committed.
+    """
+
+    def __init__(
+        self, max_batch: int = 1000, window: float = 0.005, max_depth: int = 10000
+    ) -> None:
+        self.max_batch = max_batch
+        self.window = window
+        self._queue: queue.Queue = queue.Queue(maxsize=max_depth)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._batches = 0
+        self._events = 0
+        self._failed = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: EventCreate) -> "Future[int]":
+        """Queue an event and return a Future for its id"""
+        future: Future[int] = Future()
+        with self._lock:
+            if self._closed:
+                raise BufferClosed("Write-behind buffer is shutting down")
+            try:
+                self._queue.put_nowait((event, future, time.monotonic()))
+            except queue.Full:
+                raise BufferFull("Write-behind buffer is full")
+        return future
+
+    def close(self) -> None:
+        """Stop accepting events, write everything already queued, and stop the writer"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> dict:
+        """Queue depth and group-commit metrics"""
+        with self._lock:
+            return {
+                "depth": self._queue.qsize(),
+                "batches": self._batches,
+                "events": self._events,
+                "failed_events": self._failed,
+                "avg_batch_size": self._events / self._batches if self._batches else 0.0,
+                "last_flush_ms": self._last_flush_ms,
+                "max_flush_ms": self._max_flush_ms,
+                "avg_flush_ms": self._total_flush_ms / self._batches if self._batches else 0.0,
+                "max_queue_wait_ms": self._max_wait_ms,
+            }
+
+    def _run(self) -> None:
+        """Writer thread: gather batches and flush them until the stop marker arrives"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        """Write one batch in a single transaction and resolve its futures"""
+        events = [event for event, _, _ in batch]
+        started = time.monotonic()
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                with get_pool().connection() as conn:
+                    ids = crud.create_events(conn, events)
+                break
+            except Exception as exc:
+                retryable = isinstance(exc, WriteTimeout) or is_busy(exc)
+                if not retryable or attempt == FLUSH_ATTEMPTS:
+                    logger.error("Write-behind flush of %d events failed: %s", len(batch), exc)
+                    with self._lock:
+                        self._failed += len(batch)
+                    for _, future, _ in batch:
+                        future.set_exception(exc)
+                    return
+                time.sleep(0.01 * attempt)
+
+        finished = time.monotonic()
+        flush_ms = (finished - started) * 1000
+        with self._lock:
+            self._batches += 1
+            self._events += len(batch)
+            self._last_flush_ms = flush_ms
+            self._max_flush_ms = max(self._max_flush_ms, flush_ms)
+            self._total_flush_ms += flush_ms
+            self._max_wait_ms = max(self._max_wait_ms, (started - batch[0][2]) * 1000)
+        for (_, future, _), event_id in zip(batch, ids):
+            future.set_result(event_id)
+
+
+_buffer: Optional[WriteBehindBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def write_behind_enabled() -> bool:
+    """Whether POST /events goes through the write-behind buffer (EVENTS_WRITE_BEHIND=1)"""
+    return os.environ.get("EVENTS_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+
+
+def default_ack() -> str:
+    """Acknowledgement mode used when a request does not ask for one (EVENTS_WRITE_BEHIND_ACK)"""
+    ack = os.environ.get("EVENTS_WRITE_BEHIND_ACK", "committed").lower()
+    if ack not in ACK_MODES:
+        raise ValueError(
+            f"Invalid EVENTS_WRITE_BEHIND_ACK {ack!r}, expected one of {list(ACK_MODES)}"
+        )
+    return ack
+
+
+def get_buffer() -> WriteBehindBuffer:
+    """Get (starting on first use) the shared write-behind buffer.
+
+    Batch size, time window and queue depth come from EVENTS_WRITE_BEHIND_BATCH,
+    EVENTS_WRITE_BEHIND_WINDOW_MS and EVENTS_WRITE_BEHIND_MAX_DEPTH.
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer(
+                max_batch=int(os.environ.get("EVENTS_WRITE_BEHIND_BATCH", "1000")),
+                window=float(os.environ.get("EVENTS_WRITE_BEHIND_WINDOW_MS", "5")) / 1000,
+                max_depth=int(os.environ.get("EVENTS_WRITE_BEHIND_MAX_DEPTH", "10000")),
+            )
+        return _buffer
+
+
+def buffer_stats() -> Optional[dict]:
+    """Metrics of the shared buffer, or None if it was never started"""
+    with _buffer_lock:
+        return _buffer.stats() if _buffer is not None else None
+
+
+def close_buffer() -> None:
+    """Drain and stop the shared buffer, if one was started"""
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.close()
@@ -0,0 +1,233 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Longest pause between two attempts at a lock held by another process
+_MAX_BACKOFF = 0.005
+
+# Longest pause between two BEGIN IMMEDIATE attempts that found the database busy
+_MAX_BUSY_BACKOFF = 0.1
+
+
+class WriteTimeout(Exception):
+    """Raised when a write could not get its turn as the database's single writer in time"""
+
+
+def is_busy(exc: BaseException) -> bool:
+    """Whether an sqlite3 error means another connection holds the lock we asked for"""
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(exc) or "busy" in str(exc)
+
+
+def database_path(conn: sqlite3.Connection) -> str:
+    """File of the connection's main database, or '' for an in-memory or temporary one"""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def _open_lock_file(path: str) -> Optional[int]:
+    """Descriptor of a lock file, or None where file locks are unavailable"""
+    if fcntl is None or not path:
+        return None
+    return os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+
+class WriterLock:
+    """Lets one writer at a time into a database, across threads and worker processes.
+
+    A thread lock orders the writers of this process; the holder then takes an
+    exclusive flock() on `<database>-writer.lock`, which orders the processes. The lock
+    is handed over as soon as it is released, instead of waiting out SQLite's busy
+    handler, whose sleeps grow to 100 ms. Without flock() (Windows) only the threads
+    are ordered and SQLite's locking does the rest.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 10.0) -> None:
+        self.db_path = db_path
+        self.timeout = timeout
+        self._thread_lock = threading.Lock()
+        self._fd = _open_lock_file(f"{db_path}-writer.lock" if db_path else "")
+        self._stats_lock = threading.Lock()
+        self._acquired = 0
+        self._timeouts = 0
+        self._busy_retries = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def cross_process(self) -> bool:
+        """Whether other processes are ordered too, not just this process's threads"""
+        return self._fd is not None
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to `timeout` seconds (default self.timeout) for the lock; False if it did not come"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        if not self._thread_lock.acquire(timeout=max(timeout, 0.0)):
+            return self._timed_out()
+        if self._fd is not None:
+            # Only one thread per process polls the file lock, so short pauses are cheap
+            pause = 0.0002
+            while True:
+                try:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() - started >= timeout:
+                        self._thread_lock.release()
+                        return self._timed_out()
+                    time.sleep(pause)
+                    pause = min(pause * 2, _MAX_BACKOFF)
+        waited = time.monotonic() - started
+        with self._stats_lock:
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return True
+
+    def release(self) -> None:
+        """Hand the lock to the next writer"""
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def close(self) -> None:
+        """Close the lock file; the lock must not be held"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def stats(self) -> dict:
+        """Acquisitions, time spent waiting for the lock, timeouts and busy retries"""
+        with self._stats_lock:
+            return {
+                "cross_process": self.cross_process,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "busy_retries": self._busy_retries,
+                "avg_wait_ms": self._total_wait / self._acquired * 1000 if self._acquired else 0.0,
+                "max_wait_ms": self._max_wait * 1000,
+            }
+
+    def _timed_out(self) -> bool:
+        with self._stats_lock:
+            self._timeouts += 1
+        return False
+
+    def _busy_retry(self) -> None:
+        with self._stats_lock:
+            self._busy_retries += 1
+
+
+_writer_locks: dict[str, WriterLock] = {}
+_writer_locks_lock = threading.Lock()
+
+
+def get_writer_lock(db_path: str) -> WriterLock:
+    """Get (creating on first use) the writer lock of a database file.
+
+    EVENTS_DB_WRITE_TIMEOUT sets how many seconds a write waits for its turn before
+    it fails with WriteTimeout.
+    """
+    with _writer_locks_lock:
+        lock = _writer_locks.get(db_path)
+        if lock is None:
+            lock = WriterLock(
+                db_path, timeout=float(os.environ.get("EVENTS_DB_WRITE_TIMEOUT", "10"))
+            )
+            _writer_locks[db_path] = lock
+        return lock
+
+
+def writer_lock_stats(db_path: str) -> Optional[dict]:
+    """Counters of a database's writer lock, or None if nothing has written through it yet"""
+    with _writer_locks_lock:
+        lock = _writer_locks.get(db_path)
+        return lock.stats() if lock is not None else None
+
+
+def close_writer_locks() -> None:
+    """Close every writer lock file, e.g. on shutdown"""
+    with _writer_locks_lock:
+        locks = list(_writer_locks.values())
+        _writer_locks.clear()
+    for lock in locks:
+        lock.close()
+
+
+def begin_immediate(
+    conn: sqlite3.Connection, deadline: Optional[float] = None, lock: Optional[WriterLock] = None
+) -> None:
+    """BEGIN IMMEDIATE, retrying while another connection holds the write lock.
+
+    Each attempt already waits PRAGMA busy_timeout; after that it is retried with
+    jittered backoff until `deadline` (a time.monotonic() value, None to wait for good),
+    then WriteTimeout is raised. Writers that skip the writer lock (the sqlite3 shell,
+    processes of an older release) can still hold the database; this outlasts them.
+    """
+    pause = 0.001
+    while True:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as exc:
+            if not is_busy(exc):
+                raise
+            if deadline is not None and time.monotonic() >= deadline:
+                raise WriteTimeout("Database is locked by another writer") from exc
+        if lock is not None:
+            lock._busy_retry()
+        time.sleep(random.uniform(0, pause))
+        pause = min(pause * 2, _MAX_BUSY_BACKOFF)
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run the body as the database's single writer, inside a BEGIN IMMEDIATE transaction.
+
+    The body commits; anything it leaves uncommitted, or an exception, is rolled back.
+    Raises WriteTimeout if the writer lock or SQLite's lock is not free within the
+    writer lock's timeout. Not reentrant: the body must not open another one.
+    """
+    lock = get_writer_lock(database_path(conn))
+    deadline = time.monotonic() + lock.timeout
+    if not lock.acquire():
+        raise WriteTimeout(f"No turn to write within {lock.timeout:g}s")
+    try:
+        begin_immediate(conn, deadline, lock)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+    finally:
+        lock.release()
+
+
+@contextmanager
+def startup_lock(db_path: str) -> Iterator[None]:
+    """Hold an exclusive flock() on `<database>-startup.lock`, so one process at a time initializes the database.
+
+    Waits as long as it takes: the processes after the first find the migrations done.
+    """
+    fd = _open_lock_file(f"{db_path}-startup.lock" if db_path else "")
+    if fd is None:
+        yield
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
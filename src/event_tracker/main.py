@@ -1,125 +1,501 @@
+import asyncio
+import json
+import tempfile
+import time
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import AsyncIterator, Literal, Optional
 
-from fastapi import FastAPI, Depends, HTTPException
-from fastapi import Response
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
 
-from src.event_tracker.db import init_db, get_conn
-from src.event_tracker import csv_export
-from src.event_tracker.schemas import EventCreate, EventOut
+from src.event_tracker import aio, export, fastjson, importer, ingest, partitions, timestamps
+from src.event_tracker.cache import close_event_cache, close_result_cache, get_event_cache, get_result_cache, result_key
+from src.event_tracker.aio import DBOverloaded
+from src.event_tracker.export import ExportUnavailable
+from src.event_tracker.filters import EventFilters
+from src.event_tracker.hotwindow import close_hot_window, get_hot_window, hot_window_stats
+from src.event_tracker.hub import TooManySubscribers, close_hub, get_hub, hub_stats
+from src.event_tracker.ingest import BufferClosed, BufferFull
+from src.event_tracker.db import close_pool, get_conn, get_db_path, get_db_settings, get_pool, init_db, read_settings
+from src.event_tracker.locks import WriteTimeout, close_writer_locks, writer_lock_stats
+from src.event_tracker.metrics import MetricsMiddleware, get_metrics
+from src.event_tracker.pool import PoolTimeout
+from src.event_tracker.schemas import BulkIngestResponse, BulkItemError, EventCreate, EventListResponse, EventOut, ImportResponse, StatsResponse
 from src.event_tracker import crud
 
-import sqlite3
-
 app = FastAPI(title="Event Tracker", description="REST API for tracking timestamped events with filtering and export", version="0.1.0")
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
 def startup_event():
-    """Initialize the database on startup"""
+    """Initialize the database on startup and drop partitions past EVENTS_RETENTION_MONTHS"""
     init_db()
-
-def get_db() -> Generator[sqlite3.Connection, None, None]:
-    """Dependency to get a database connection"""
     conn = get_conn()
     try:
-        yield conn
+        partitions.apply_retention(conn)
     finally:
         conn.close()
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Drain the write-behind buffer, end event streams, stop the database lanes and close pooled connections"""
+    ingest.close_buffer()
+    close_hub()
+    aio.shutdown_lanes()
+    close_event_cache()
+    close_result_cache()
+    close_hot_window()
+    close_pool()
+    close_writer_locks()
+
+@app.exception_handler(PoolTimeout)
+@app.exception_handler(DBOverloaded)
+@app.exception_handler(BufferFull)
+@app.exception_handler(BufferClosed)
+@app.exception_handler(TooManySubscribers)
+@app.exception_handler(WriteTimeout)
+def overload_handler(request: Request, exc: Exception):
+    """Report pool exhaustion, a full database lane, write buffer or stream hub, or a write that got no turn, as a retryable 503"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(ExportUnavailable)
+def export_unavailable_handler(request: Request, exc: ExportUnavailable):
+    """Report an export format this installation cannot produce"""
+    return JSONResponse(status_code=501, content={"detail": str(exc)})
+
 @app.get("/health")
-def health_check():
-    """Health check endpoint"""
-    return {"status": "ok"}
+async def health_check():
+    """Health check endpoint, including the SQLite settings in effect, writer lock, lane load and cache counters"""
+    settings = await aio.get_lane("interactive").run(read_settings)
+    cache = get_event_cache()
+    results = get_result_cache()
+    return {
+        "status": "ok",
+        "db": {"profile": get_db_settings()["profile"], **settings},
+        "writer": writer_lock_stats(get_db_path()),
+        "lanes": aio.lane_stats(),
+        "write_behind": ingest.buffer_stats(),
+        "event_cache": cache.stats() if cache is not None else None,
+        "result_cache": results.stats() if results is not None else None,
+        "hot_window": hot_window_stats(),
+        "stream": hub_stats(),
+    }
 
-@app.post("/events", response_model=EventOut, status_code=201)
-def create_event(event: EventCreate, conn: sqlite3.Connection = Depends(get_db)):
-    """Create a new event"""
-    event_dict = crud.create_event(conn, event)
-    return event_dict
+def _scrape_time_metrics() -> list[tuple[str, str, str, dict, float]]:
+    """Pool, writer lock, lane, cache, write-behind and stream figures as (name, type, help, labels, value)"""
+    samples = [
+        ("events_db_pool_connections", "gauge", "Pooled database connections by state", {"state": state}, value)
+        for state, value in get_pool().stats().items() if state in ("open", "idle", "in_use")
+    ]
+    for name, lane in aio.lane_stats().items():
+        samples.append(("events_lane_pending", "gauge", "Database calls queued or running per lane", {"lane": name}, lane["pending"]))
+        samples.append(("events_lane_rejected_total", "counter", "Database calls rejected as overloaded per lane", {"lane": name}, lane["rejected"]))
+    for cache_name, cache in (("event", get_event_cache()), ("result", get_result_cache()), ("hot_window", get_hot_window())):
+        if cache is not None:
+            stats = cache.stats()
+            for outcome in ("hits", "misses"):
+                samples.append(("events_cache_lookups_total", "counter", "Cache lookups by cache and outcome", {"cache": cache_name, "outcome": outcome}, stats[outcome]))
+    writer = writer_lock_stats(get_db_path())
+    if writer is not None:
+        samples.append(("events_db_writer_wait_seconds_max", "gauge", "Longest wait for the writer lock", {}, writer["max_wait_ms"] / 1000))
+        samples.append(("events_db_writer_timeouts_total", "counter", "Writes that got no turn within EVENTS_DB_WRITE_TIMEOUT", {}, writer["timeouts"]))
+        samples.append(("events_db_busy_retries_total", "counter", "BEGIN IMMEDIATE attempts retried because another connection held the database", {}, writer["busy_retries"]))
+    buffer = ingest.buffer_stats()
+    if buffer is not None:
+        samples.append(("events_write_behind_queued", "gauge", "Events waiting in the write-behind buffer", {}, buffer["depth"]))
+    stream = hub_stats()
+    if stream is not None:
+        samples.append(("events_stream_subscribers", "gauge", "Open event stream subscriptions", {}, stream["subscribers"]))
+    return samples
 
-@app.get("/events/export")
-def export_events_csv(
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Request, crud, SQL and export metrics in the Prometheus text format"""
+    metrics = get_metrics()
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (EVENTS_METRICS=0)")
+    return PlainTextResponse(metrics.render(_scrape_time_metrics()), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.post("/events", response_model=EventOut, status_code=201, responses={202: {"description": "Queued for writing (write-behind with durability=accepted)"}})
+async def create_event(event: EventCreate, durability: Optional[Literal["accepted", "committed"]] = None):
+    """Create a new event.
+
+    With EVENTS_WRITE_BEHIND=1 the event is queued and written in a group commit.
+    `durability=committed` waits for that commit and returns the event with its id;
+    `durability=accepted` answers 202 as soon as the event is queued. The default
+    comes from EVENTS_WRITE_BEHIND_ACK.
+    """
+    if not ingest.write_behind_enabled():
+        event_dict = await aio.create_event(event)
+        return event_dict
+
+    future = ingest.get_buffer().submit(event)
+    if (durability or ingest.default_ack()) == "accepted":
+        return JSONResponse(status_code=202, content={"status": "accepted"})
+    event_id = await asyncio.wrap_future(future)
+    # The stored form of ts: UTC without an offset, as every read returns it
+    return {"id": event_id, **event.model_dump(), "ts": timestamps.to_iso(timestamps.to_micros(event.ts))}
+
+# Upper bound on the number of items accepted by one POST /events/bulk request
+MAX_BULK_ITEMS = 50000
+
+# Counting stops here when GET /events is called with estimate_total=true
+COUNT_ESTIMATE_CAP = 10000
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Import uploads are buffered in memory up to this size, then spill to a temporary file
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Exports up to this many bytes are kept in the result cache
+EXPORT_CACHE_MAX_BYTES = 1024 * 1024
+
+# Seconds between keep-alive comments on an idle event stream
+STREAM_KEEPALIVE_SECONDS = 15
+
+# Reconnect delay suggested to EventSource clients
+STREAM_RETRY_MS = 1000
+
+# Events read per query while a resumed stream catches up from the database
+STREAM_RESUME_BATCH = 1000
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header names `etag` (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+def _event_filters(
     start: Optional[str] = None,
     end: Optional[str] = None,
-    label: Optional[str] = None,
+    label: list[str] = Query(default=[]),
+    source: list[str] = Query(default=[]),
+    not_label: list[str] = Query(default=[]),
+    not_source: list[str] = Query(default=[]),
+    has_description: Optional[bool] = None,
     min_x: Optional[float] = None,
     max_x: Optional[float] = None,
     min_y: Optional[float] = None,
     max_y: Optional[float] = None,
-    conn: sqlite3.Connection = Depends(get_db)
+    q: Optional[str] = Query(None, max_length=200)
+) -> EventFilters:
+    """The filters shared by list, export, stats and stream; repeat label/source/not_label/not_source to pass several values"""
+    if q is not None:
+        try:
+            crud.search_expression(q)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        return EventFilters(
+            start=start, end=end, label=label, source=source, not_label=not_label, not_source=not_source,
+            has_description=has_description, min_x=min_x, max_x=max_x, min_y=min_y, max_y=max_y, q=q,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be ISO 8601 timestamps")
+
+def _validation_errors(exc: ValidationError) -> list[dict]:
+    """Flatten a pydantic ValidationError into JSON-safe dicts"""
+    return exc.errors(include_url=False, include_context=False, include_input=False)
+
+def _parse_bulk_body(body: bytes, content_type: str) -> tuple[list[EventCreate], list[BulkItemError]]:
+    """Validate a JSON array or NDJSON body into events plus per-item errors"""
+    events: list[EventCreate] = []
+    errors: list[BulkItemError] = []
+
+    if content_type.split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        if len(lines) > MAX_BULK_ITEMS:
+            raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request")
+        for index, line in enumerate(lines):
+            try:
+                events.append(EventCreate.model_validate_json(line))
+            except ValidationError as exc:
+                errors.append(BulkItemError(index=index, errors=_validation_errors(exc)))
+        return events, errors
+
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request")
+    for index, item in enumerate(items):
+        try:
+            events.append(EventCreate.model_validate(item))
+        except ValidationError as exc:
+            errors.append(BulkItemError(index=index, errors=_validation_errors(exc)))
+    return events, errors
+
+@app.post("/events/bulk", response_model=BulkIngestResponse, status_code=201)
+async def create_events_bulk(request: Request, atomic: bool = False):
+    """Create many events from a JSON array or NDJSON body in one transaction.
+
+    Invalid items are skipped and reported in `errors`; with atomic=true any invalid
+    item rejects the whole request instead.
+    """
+    body = await request.body()
+    events, errors = _parse_bulk_body(body, request.headers.get("content-type", ""))
+    if errors and atomic:
+        raise HTTPException(status_code=422, detail=[error.model_dump() for error in errors])
+
+    ids = await aio.create_events(events)
+    return BulkIngestResponse(inserted=len(ids), ids=ids, errors=errors)
+
+@app.post("/events/import", response_model=ImportResponse, status_code=201)
+async def import_events(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    commit_every: int = Query(importer.IMPORT_COMMIT_EVERY, ge=1)
 ):
-    """Export events as CSV with optional filtering"""
-    items = crud.list_events(
-        conn,
-        start=start,
-        end=end,
-        label=label,
-        min_x=min_x,
-        max_x=max_x,
-        min_y=min_y,
-        max_y=max_y,
-        limit=999999,
-        offset=0
-    )
-    csv_content = csv_export.events_to_csv(items)
-    return Response(content=csv_content, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=events.csv"})
+    """Import a CSV (in the export's column layout) or NDJSON body of any size.
+
+    The format comes from `format` or the Content-Type. Records are validated and
+    written in batches, committing every `commit_every` records; invalid records are
+    skipped, counted in `rejected`, and the first of them reported in `errors`.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or ("csv" if media_type == "text/csv" else "ndjson" if media_type in NDJSON_CONTENT_TYPES else None)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or NDJSON, or pass format=csv|ndjson")
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        try:
+            return await aio.import_events(upload, fmt, commit_every=commit_every)
+        except (importer.ImportFormatError, UnicodeDecodeError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+@app.get("/events/export")
+async def export_events(
+    request: Request,
+    event_filters: EventFilters = Depends(_event_filters),
+    format: Literal["csv", "ndjson", "arrow", "parquet"] = "csv",
+    compression: Literal["none", "gzip", "zstd"] = "none"
+):
+    """Export events with optional filtering, streamed in chunks.
+
+    `q` limits the export to events matching a full-text search (see GET /events).
+    `format` picks CSV, NDJSON, an Arrow IPC stream or Parquet (the last two need
+    pyarrow). `compression` gzip/zstd-encodes the stream (Content-Encoding); for
+    Parquet it compresses the column pages instead.
+
+    Responses carry an ETag; a matching If-None-Match gets 304, and small exports
+    are replayed from the result cache until the next write.
+    """
+    export.check_available(format, compression)
+    filters = event_filters.as_dict()
+    media_type, extension = export.EXPORT_FORMATS[format]
+    headers = {"Content-Disposition": f"attachment; filename=events.{extension}"}
+    encoding = export.content_encoding(format, compression)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    results = get_result_cache()
+    if results is not None:
+        key = result_key("export", format=format, compression=compression, **filters)
+        generation = await aio.result_generation(results, "heavy")
+        headers["ETag"] = results.etag(key, generation)
+        if _etag_matches(request, headers["ETag"]):
+            return Response(status_code=304, headers={"ETag": headers["ETag"]})
+        body = results.get(key)
+        if body is not None:
+            return Response(body, media_type=media_type, headers=headers)
+
+    chunks = aio.iter_events_export(format, compression, **filters)
+    # Pull the header before responding so overload and query errors still get a status code
+    header = await chunks.__anext__()
+
+    async def stream() -> AsyncIterator[bytes]:
+        kept: Optional[list[bytes]] = [header]
+        size = len(header)
+        try:
+            yield header
+            async for chunk in chunks:
+                if kept is not None:
+                    size += len(chunk)
+                    if size <= EXPORT_CACHE_MAX_BYTES:
+                        kept.append(chunk)
+                    else:
+                        kept = None
+                yield chunk
+        finally:
+            await chunks.aclose()
+        if results is not None and kept is not None:
+            results.put(key, b"".join(kept), generation)
+
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
+
+@app.get("/events/stats", response_model=StatsResponse)
+async def event_stats(
+    interval: Literal["minute", "hour", "day"] = "hour",
+    group_by: list[Literal["label", "source"]] = Query(default=[]),
+    filters: EventFilters = Depends(_event_filters)
+):
+    """Count events per minute, hour or day, optionally grouped by label and/or source; takes the GET /events filters"""
+    buckets = await aio.event_stats(interval=interval, group_by=group_by, **filters.as_dict())
+    return {"interval": interval, "group_by": group_by, "buckets": buckets}
+
+def _sse_event(event: dict) -> str:
+    """One event as a Server-Sent Events message whose id is the event id"""
+    return f"id: {event['id']}\ndata: {fastjson.dumps(event).decode()}\n\n"
+
+@app.get("/events/stream", responses={200: {"content": {"text/event-stream": {}}}})
+async def stream_events(
+    request: Request,
+    event_filters: EventFilters = Depends(_event_filters),
+    after_id: Optional[int] = None
+):
+    """Push new events matching the GET /events filters (except `q`) as Server-Sent Events.
+
+    Each message carries one event as JSON with the event id as its SSE id. To
+    resume, pass the last id seen as `after_id` (EventSource sends it as the
+    Last-Event-ID header on reconnect): the missed events are read from the database
+    before live ones. A client that falls too far behind gets an `overflow` event and
+    is disconnected (EVENTS_STREAM_SLOW_POLICY=disconnect), after which it resumes.
+    Events written by other worker processes or imports arrive within EVENTS_STREAM_POLL_MS.
+    """
+    if event_filters.q is not None:
+        raise HTTPException(status_code=400, detail="Event streams cannot filter by q")
+    header = request.headers.get("last-event-id")
+    if header:
+        try:
+            after_id = int(header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    filters = event_filters.as_dict()
+    hub = get_hub()
+    # Subscribe before reading the backlog so nothing committed in between is missed
+    subscription = await aio.subscribe_events(event_filters)
+
+    async def stream() -> AsyncIterator[str]:
+        caught_up = after_id
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            while caught_up is not None:
+                backlog = await aio.events_after(caught_up, limit=STREAM_RESUME_BATCH, **filters)
+                for event in backlog:
+                    yield _sse_event(event)
+                if backlog:
+                    caught_up = backlog[-1]["id"]
+                if len(backlog) < STREAM_RESUME_BATCH:
+                    break
+            while True:
+                batch = await subscription.next_batch(STREAM_KEEPALIVE_SECONDS)
+                if batch is None:
+                    if subscription.overflowed:
+                        yield f"event: overflow\ndata: {json.dumps({'detail': 'Too far behind; reconnect to resume'})}\n\n"
+                    break
+                if not batch:
+                    yield ": keep-alive\n\n"
+                for event in batch:
+                    # Events committed while the backlog was read arrive from both sides
+                    if caught_up is None or event["id"] > caught_up:
+                        yield _sse_event(event)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.get("/events/{event_id}", response_model=EventOut)
-def get_event(event_id: int, conn: sqlite3.Connection = Depends(get_db)):
+async def get_event(event_id: int):
     """Get an event by ID"""
-    event = crud.get_event(conn, event_id)
+    event = await aio.get_event(event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
 @app.delete("/events/{event_id}", status_code=204)
-def delete_event(event_id: int, conn: sqlite3.Connection = Depends(get_db)):
+async def delete_event(event_id: int):
     """Delete an event by ID"""
-    deleted = crud.delete_event(conn, event_id)
+    deleted = await aio.delete_event(event_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Event not found")
     return None
 
-@app.get("/events", response_model=dict)
-def list_events(
-    start: Optional[str] = None,
-    end: Optional[str] = None,
-    label: Optional[str] = None,
-    min_x: Optional[float] = None,
-    max_x: Optional[float] = None,
-    min_y: Optional[float] = None,
-    max_y: Optional[float] = None,
-    limit: int = 50,
-    offset: int = 0,
-    conn: sqlite3.Connection = Depends(get_db)
+@app.get("/events", response_model=EventListResponse)
+async def list_events(
+    request: Request,
+    event_filters: EventFilters = Depends(_event_filters),
+    sort: Literal["newest", "relevance"] = "newest",
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    estimate_total: bool = False
 ):
-    """List events with optional filtering and pagination"""
-    total = crud.count_events(
-        conn,
-        start=start,
-        end=end,
-        label=label,
-        min_x=min_x,
-        max_x=max_x,
-        min_y=min_y,
-        max_y=max_y,
-    )
-    items = crud.list_events(
-        conn,
-        start=start,
-        end=end,
-        label=label,
-        min_x=min_x,
-        max_x=max_x,
-        min_y=min_y,
-        max_y=max_y,
-        limit=limit,
-        offset=offset
+    """List events with optional filtering, full-text search and pagination.
+
+    `label` and `source` may be repeated to match any of several values;
+    `not_label` and `not_source` exclude values (events without a source are kept).
+    `has_description` keeps events with (true) or without (false) a description.
+
+    `q` searches label and description: every word must match (case and accents
+    are ignored), `word*` matches a prefix and "quoted words" a phrase. It combines
+    with all other filters. `sort=relevance` orders the matches best first by bm25
+    instead of newest first; it pages with `offset` only.
+
+    Pass the `next_cursor` of a page back as `cursor` to fetch the following page;
+    this keyset mode replaces `offset`, which keeps working for older clients.
+
+    `include_total=false` skips counting (`total` is null). `estimate_total=true`
+    stops counting at COUNT_ESTIMATE_CAP matches; `total_exact` says whether the
+    total was capped.
+
+    Responses carry an ETag that changes with every insert or delete; a matching
+    If-None-Match gets 304, and repeated queries are answered from the result cache.
+
+    The page is encoded straight from the row tuples (see fastjson), skipping
+    response-model validation; the body still has the EventListResponse shape.
+    """
+    filters = event_filters.as_dict()
+    if sort == "relevance" and (event_filters.q is None or cursor is not None):
+        raise HTTPException(status_code=400, detail="sort=relevance needs q and cannot be combined with cursor")
+    results = get_result_cache()
+    if results is not None:
+        key = result_key(
+            "list", **filters, sort=sort, limit=limit, offset=offset, cursor=cursor, include_total=include_total, estimate_total=estimate_total,
+        )
+        generation = await aio.result_generation(results)
+        etag = results.etag(key, generation)
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        body = results.get(key)
+        if body is not None:
+            return fastjson.EncodedJSONResponse(body, headers={"ETag": etag})
+
+    after = None
+    if cursor is not None:
+        try:
+            after = crud.decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        offset = 0
+
+    total = None
+    total_exact = True
+    if include_total:
+        cap = COUNT_ESTIMATE_CAP if estimate_total else None
+        total = await aio.count_events(cap=cap, **filters)
+        total_exact = cap is None or total < cap
+    # One extra row tells us whether there is a next page
+    rows = await aio.list_event_rows(limit=limit + 1, offset=offset, after=after, sort=sort, **filters)
+    next_cursor = None
+    if sort == "newest" and limit > 0 and len(rows) > limit:
+        next_cursor = crud.encode_cursor(dict(zip(crud.EVENT_COLUMNS, rows[limit - 1])))
+    started = time.perf_counter()
+    body = fastjson.encode_page(
+        rows[:limit], total=total, total_exact=total_exact, limit=limit, offset=offset, next_cursor=next_cursor,
     )
-    return{
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-        "items": items
-    }
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.observe("events_serialize_duration_seconds", time.perf_counter() - started, format="json")
+    if results is None:
+        return fastjson.EncodedJSONResponse(body)
+    results.put(key, body, generation)
+    return fastjson.EncodedJSONResponse(body, headers={"ETag": etag})
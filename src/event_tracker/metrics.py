@@ -0,0 +1,425 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Upper bounds of the rows-per-call histogram buckets
+ROW_BUCKETS = (0, 1, 10, 50, 100, 1000, 10000, 100000, 1000000)
+
+# SQLite calls the progress handler every this many virtual machine instructions
+VM_STEP_INTERVAL = 1000
+
+# Metric name -> (type, help, histogram buckets)
+FAMILIES: dict[str, tuple[str, str, Optional[tuple]]] = {
+    "events_http_requests_total": ("counter", "HTTP requests by route, method and status", None),
+    "events_http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency until the last body byte",
+        LATENCY_BUCKETS,
+    ),
+    "events_db_acquire_duration_seconds": (
+        "histogram",
+        "Time waiting for a pooled database connection",
+        LATENCY_BUCKETS,
+    ),
+    "events_crud_duration_seconds": ("histogram", "Duration of crud calls", LATENCY_BUCKETS),
+    "events_crud_sql_duration_seconds": (
+        "histogram",
+        "Time crud calls spent executing SQL and fetching rows",
+        LATENCY_BUCKETS,
+    ),
+    "events_crud_rows_returned": (
+        "histogram",
+        "Rows fetched from SQLite per crud call",
+        ROW_BUCKETS,
+    ),
+    "events_crud_vm_steps_total": (
+        "counter",
+        f"SQLite VM instructions run by crud calls, in units of {VM_STEP_INTERVAL}; a proxy for rows scanned",
+        None,
+    ),
+    "events_serialize_duration_seconds": (
+        "histogram",
+        "Serialization time of exports and list pages per request, excluding SQL",
+        LATENCY_BUCKETS,
+    ),
+    "events_slow_queries_total": (
+        "counter",
+        "Statements that ran longer than EVENTS_SLOW_QUERY_MS",
+        None,
+    ),
+}
+
+
+class CallStats:
+    """Wall time, SQL time, fetched rows and VM steps accumulated by one tracked call"""
+
+    __slots__ = ("seconds", "sql_seconds", "rows", "vm_steps")
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.vm_steps = 0
+
+
+_local = threading.local()
+
+
+def _current() -> Optional[CallStats]:
+    return getattr(_local, "current", None)
+
+
+def _count_vm_steps() -> int:
+    """Progress handler: charge VM_STEP_INTERVAL instructions to the running call"""
+    stats = _current()
+    if stats is not None:
+        stats.vm_steps += 1
+    # Returning non-zero would abort the statement
+    return 0
+
+
+class Metrics:
+    """Thread-safe counters and histograms, rendered in the Prometheus text format.
+
+    Series are keyed by metric name and a sorted tuple of label pairs. Histograms
+    keep per-bucket counts (made cumulative when rendered), their sum and count.
+    """
+
+    def __init__(self, slow_query_seconds: Optional[float] = None) -> None:
+        self.slow_query_seconds = slow_query_seconds
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = {}
+        self._histograms: dict[tuple, list] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """Add to a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record one histogram observation"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._observe(key, value)
+
+    def _observe(self, key: tuple, value: float) -> None:
+        """Add `value` to the histogram series `key` (lock held)"""
+        buckets = FAMILIES[key[0]][2]
+        series = self._histograms.get(key)
+        if series is None:
+            series = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+        index = 0
+        while index < len(buckets) and value > buckets[index]:
+            index += 1
+        series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def charge(self, stats: CallStats) -> Iterator[CallStats]:
+        """Add the time spent inside the block, and the SQL it runs on this thread, to `stats`"""
+        previous = _current()
+        _local.current = stats
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - started
+            _local.current = previous
+
+    @contextmanager
+    def track_call(self, function: str) -> Iterator[CallStats]:
+        """Time a crud call and the SQL it runs, and record them under `function`"""
+        stats = CallStats()
+        try:
+            with self.charge(stats):
+                yield stats
+        finally:
+            self.record_call(function, stats)
+
+    def record_call(self, function: str, stats: CallStats) -> None:
+        """Record the duration and SQL work of one crud call"""
+        labels = (("function", function),)
+        with self._lock:
+            self._observe(("events_crud_duration_seconds", labels), stats.seconds)
+            self._observe(("events_crud_sql_duration_seconds", labels), stats.sql_seconds)
+            self._observe(("events_crud_rows_returned", labels), stats.rows)
+            if stats.vm_steps:
+                key = ("events_crud_vm_steps_total", labels)
+                self._counters[key] = self._counters.get(key, 0) + stats.vm_steps
+
+    def slow_query(
+        self, conn: sqlite3.Connection, sql: str, params: Any, seconds: float, rows: int
+    ) -> None:
+        """Count a statement over the threshold and log it with its query plan"""
+        self.inc("events_slow_queries_total")
+        try:
+            plan_rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            plan = "\n".join(
+                f"  {'  ' * _plan_depth(row[1], plan_rows)}{row[3]}" for row in plan_rows
+            )
+        except sqlite3.Error as exc:
+            plan = f"  (no plan: {exc})"
+        logger.warning(
+            "Slow query: %.1f ms, %d rows fetched\n%s\n%s",
+            seconds * 1000,
+            rows,
+            " ".join(sql.split()),
+            plan,
+        )
+
+    def render(self, extra: Iterable[tuple[str, str, str, dict, float]] = ()) -> str:
+        """All series in the Prometheus text exposition format.
+
+        `extra` adds (name, type, help, labels, value) samples read from elsewhere at
+        scrape time, such as pool occupancy; samples of one name are grouped together.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (list(series[0]), series[1], series[2])
+                for key, series in self._histograms.items()
+            }
+
+        lines: list[str] = []
+        for name, (kind, help_text, buckets) in FAMILIES.items():
+            if kind == "counter":
+                series = [
+                    (labels, value)
+                    for (family, labels), value in sorted(counters.items(), key=_sort_key)
+                    if family == name
+                ]
+            else:
+                series = [
+                    (labels, value)
+                    for (family, labels), value in sorted(histograms.items(), key=_sort_key)
+                    if family == name
+                ]
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series:
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip((*buckets, "+Inf"), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels((*labels, ('le', bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        families: dict[str, list] = {}
+        for name, kind, help_text, labels, value in extra:
+            families.setdefault(name, [kind, help_text, []])[2].append((labels, value))
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _plan_depth(parent: int, rows: list) -> int:
+    """Nesting level of an EXPLAIN QUERY PLAN row, given its parent id"""
+    parents = {row[0]: row[1] for row in rows}
+    level = 0
+    while parent:
+        level += 1
+        parent = parents.get(parent, 0)
+    return level
+
+
+def _sort_key(item: tuple) -> tuple:
+    (name, labels), _ = item
+    return name, tuple((key, str(value)) for key, value in labels)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor charging execute and fetch time, fetched rows and slow statements to the running call"""
+
+    _sql = ""
+    _params: Any = ()
+    _elapsed = 0.0
+    _rows = 0
+    _reported = False
+
+    def _account(self, started: float, rows: int) -> None:
+        elapsed = time.perf_counter() - started
+        self._elapsed += elapsed
+        self._rows += rows
+        stats = _current()
+        if stats is not None:
+            stats.sql_seconds += elapsed
+            stats.rows += rows
+        metrics: Optional[Metrics] = getattr(self.connection, "metrics", None)
+        threshold = metrics.slow_query_seconds if metrics is not None else None
+        if threshold is not None and not self._reported and self._elapsed > threshold:
+            self._reported = True
+            metrics.slow_query(self.connection, self._sql, self._params, self._elapsed, self._rows)
+
+    def execute(self, sql: str, parameters: Any = (), /) -> "InstrumentedCursor":
+        self._sql, self._params, self._elapsed, self._rows, self._reported = (
+            sql,
+            parameters,
+            0.0,
+            0,
+            False,
+        )
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._account(started, 0)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable, /) -> "InstrumentedCursor":
+        # Plans of bulk statements are not explained, since they have no single parameter set
+        self._sql, self._params, self._elapsed, self._rows, self._reported = sql, None, 0.0, 0, True
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._account(started, 0)
+        return self
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._account(started, row is not None)
+        return row
+
+    def fetchmany(self, size: int = 1) -> list:
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._account(started, len(rows))
+        return rows
+
+    def fetchall(self) -> list:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._account(started, len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors report to `metrics` and whose VM steps are counted per call"""
+
+    metrics: Optional[Metrics] = None
+
+    def cursor(self, factory: Any = InstrumentedCursor) -> sqlite3.Cursor:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable, /) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def instrument(conn: sqlite3.Connection, metrics: Metrics) -> None:
+    """Attach `metrics` to a connection opened with factory=InstrumentedConnection"""
+    conn.metrics = metrics
+    conn.set_progress_handler(_count_vm_steps, VM_STEP_INTERVAL)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route template"""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        metrics = get_metrics()
+        if scope["type"] != "http" or metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; templates keep label values bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe(
+                "events_http_request_duration_seconds",
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route,
+            )
+            metrics.inc(
+                "events_http_requests_total", method=scope["method"], route=route, status=status
+            )
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Optional[Metrics]:
+    """Get the process-wide metrics, or None if disabled.
+
+    EVENTS_METRICS=0 disables collection (and GET /metrics). EVENTS_SLOW_QUERY_MS
+    logs every statement running longer than that many milliseconds, with its
+    EXPLAIN QUERY PLAN, to the src.event_tracker.metrics logger; unset or 0 disables it.
+    """
+    global _metrics
+    if os.environ.get("EVENTS_METRICS", "1") == "0":
+        return None
+    with _metrics_lock:
+        if _metrics is None:
+            slow_ms = float(os.environ.get("EVENTS_SLOW_QUERY_MS", "0"))
+            _metrics = Metrics(slow_query_seconds=slow_ms / 1000 if slow_ms > 0 else None)
+        return _metrics
+
+
+def close_metrics() -> None:
+    """Drop the collected metrics, so the next get_metrics() starts from zero"""
+    global _metrics
+    with _metrics_lock:
+        _metrics = None
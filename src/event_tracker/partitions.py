@@ -0,0 +1,431 @@
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from src.event_tracker import timestamps
+from src.event_tracker.db import _RTREE_UNBOUNDED
+from src.event_tracker.locks import write_transaction
+
+PARTITION_COLUMNS = "id, ts, label, description, x, y, source"
+
+_MONTH = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+# bm25() column weights for the search ranking: label matches count double
+_BM25_WEIGHTS = "2.0, 1.0"
+
+
+def month_of(ts: int) -> str:
+    """Partition month ('YYYY-MM') of a stored timestamp"""
+    return timestamps.month_of(ts)
+
+
+def next_month(month: str) -> str:
+    """The month after `month`"""
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def partition_table(month: str) -> str:
+    """Name of the table holding the events of `month`"""
+    if not _MONTH.match(month):
+        raise ValueError(f"Invalid partition month {month!r}")
+    return f"events_p{month[:4]}{month[5:]}"
+
+
+def _filter_index_ddl(table: str) -> list[str]:
+    """Indexes serving label and source filters in ts order"""
+    return [
+        f"CREATE INDEX IF NOT EXISTS {table}_label_ts ON {table} (label, ts)",
+        f"CREATE INDEX IF NOT EXISTS {table}_source_ts ON {table} (source, ts)",
+    ]
+
+
+def events_table_ddl(table: str, lower: int, upper: int) -> str:
+    """The table of a partition whose timestamps lie in [lower, upper), without its indexes"""
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL CHECK (ts >= {lower} AND ts < {upper}),
+            label TEXT NOT NULL,
+            description TEXT,
+            x REAL,
+            y REAL,
+            source TEXT
+        )
+        """
+
+
+def index_ddl(table: str) -> list[str]:
+    """Indexes of a partition table: ts order and the label and source filters"""
+    return [f"CREATE INDEX IF NOT EXISTS {table}_ts ON {table} (ts)", *_filter_index_ddl(table)]
+
+
+def _table_ddl(table: str, lower: int, upper: int) -> list[str]:
+    """Statements creating one partition's table, indexes and R*Tree"""
+    return [
+        events_table_ddl(table, lower, upper),
+        *index_ddl(table),
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_rtree USING rtree (id, min_x, max_x, min_y, max_y)",
+        _search_ddl(table),
+    ]
+
+
+def _search_ddl(table: str) -> str:
+    """FTS5 index over label and description that reads the text back from the partition table"""
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5("
+        f"label, description, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+
+
+def _trigger_ddl(table: str) -> list[str]:
+    """Triggers keeping the label counters, R*Tree, search index, hourly rollups and change counters in sync"""
+    new_bucket, old_bucket = (
+        timestamps.floor_sql("NEW.ts", timestamps.HOUR),
+        timestamps.floor_sql("OLD.ts", timestamps.HOUR),
+    )
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO event_label_counts (label, n) VALUES (NEW.label, 1)
+            ON CONFLICT (label) DO UPDATE SET n = n + 1;
+
+            INSERT INTO {table}_rtree (id, min_x, max_x, min_y, max_y)
+            SELECT NEW.id,
+                COALESCE(NEW.x, -{_RTREE_UNBOUNDED}), COALESCE(NEW.x, {_RTREE_UNBOUNDED}),
+                COALESCE(NEW.y, -{_RTREE_UNBOUNDED}), COALESCE(NEW.y, {_RTREE_UNBOUNDED})
+            WHERE NEW.x IS NOT NULL OR NEW.y IS NOT NULL;
+
+            INSERT INTO {table}_fts (rowid, label, description) VALUES (NEW.id, NEW.label, NEW.description);
+
+            INSERT INTO event_rollup_hourly (bucket, label, source, n, n_x, sum_x, min_x, max_x, n_y, sum_y, min_y, max_y)
+            VALUES (
+                {new_bucket}, NEW.label, COALESCE(NEW.source, ''), 1,
+                NEW.x IS NOT NULL, COALESCE(NEW.x, 0), NEW.x, NEW.x,
+                NEW.y IS NOT NULL, COALESCE(NEW.y, 0), NEW.y, NEW.y
+            )
+            ON CONFLICT (bucket, label, source) DO UPDATE SET
+                n = n + 1,
+                n_x = n_x + excluded.n_x,
+                sum_x = sum_x + excluded.sum_x,
+                min_x = COALESCE(MIN(min_x, excluded.min_x), min_x, excluded.min_x),
+                max_x = COALESCE(MAX(max_x, excluded.max_x), max_x, excluded.max_x),
+                n_y = n_y + excluded.n_y,
+                sum_y = sum_y + excluded.sum_y,
+                min_y = COALESCE(MIN(min_y, excluded.min_y), min_y, excluded.min_y),
+                max_y = COALESCE(MAX(max_y, excluded.max_y), max_y, excluded.max_y);
+
+            UPDATE event_meta SET value = value + 1 WHERE key = 'write_gen';
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON {table}
+        BEGIN
+            UPDATE event_label_counts SET n = n - 1 WHERE label = OLD.label;
+
+            DELETE FROM {table}_rtree WHERE id = OLD.id;
+
+            INSERT INTO {table}_fts ({table}_fts, rowid, label, description) VALUES ('delete', OLD.id, OLD.label, OLD.description);
+
+            UPDATE event_rollup_hourly SET
+                n = n - 1,
+                n_x = n_x - (OLD.x IS NOT NULL),
+                sum_x = sum_x - COALESCE(OLD.x, 0),
+                n_y = n_y - (OLD.y IS NOT NULL),
+                sum_y = sum_y - COALESCE(OLD.y, 0)
+            WHERE bucket = {old_bucket} AND label = OLD.label AND source = COALESCE(OLD.source, '');
+
+            DELETE FROM event_rollup_hourly
+            WHERE bucket = {old_bucket} AND label = OLD.label AND source = COALESCE(OLD.source, '')
+                AND n = 0;
+
+            UPDATE event_rollup_hourly SET
+                min_x = (SELECT MIN(x) FROM {table} WHERE ts >= bucket AND ts < bucket + {timestamps.HOUR} AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source),
+                max_x = (SELECT MAX(x) FROM {table} WHERE ts >= bucket AND ts < bucket + {timestamps.HOUR} AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source),
+                min_y = (SELECT MIN(y) FROM {table} WHERE ts >= bucket AND ts < bucket + {timestamps.HOUR} AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source),
+                max_y = (SELECT MAX(y) FROM {table} WHERE ts >= bucket AND ts < bucket + {timestamps.HOUR} AND label = OLD.label AND COALESCE(source, '') = event_rollup_hourly.source)
+            WHERE bucket = {old_bucket} AND label = OLD.label AND source = COALESCE(OLD.source, '')
+                AND (OLD.x IN (min_x, max_x) OR OLD.y IN (min_y, max_y));
+
+            UPDATE event_meta SET value = value + 1 WHERE key IN ('delete_gen', 'write_gen');
+        END
+        """,
+    ]
+
+
+def _empty_select(ranked: bool = False) -> str:
+    """A SELECT with the event columns (and `rank`) and no rows, standing in for zero partitions"""
+    return (
+        "SELECT CAST(NULL AS INTEGER) AS id, CAST(NULL AS INTEGER) AS ts, CAST(NULL AS TEXT) AS label, "
+        "CAST(NULL AS TEXT) AS description, CAST(NULL AS REAL) AS x, CAST(NULL AS REAL) AS y, "
+        f"CAST(NULL AS TEXT) AS source{', CAST(NULL AS REAL) AS rank' if ranked else ''} WHERE 0"
+    )
+
+
+def _branch(table: str, rtree_where: Optional[str], search: Optional[str]) -> str:
+    """SELECT over one partition, optionally narrowed by its R*Tree and its search index"""
+    conditions = []
+    if search in ("match", "scan"):
+        # With a unary + SQLite cannot look the matches up by id, so it walks the ts index instead
+        conditions.append(
+            f"{'+' if search == 'scan' else ''}id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)"
+        )
+    if rtree_where:
+        conditions.append(f"id IN (SELECT id FROM {table}_rtree WHERE {rtree_where})")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    if search != "rank":
+        return f"SELECT {PARTITION_COLUMNS} FROM {table}{where}"
+    columns = ", ".join(f"{table}.{column} AS {column}" for column in PARTITION_COLUMNS.split(", "))
+    where = "".join(f" AND {table}.{condition}" for condition in conditions)
+    return (
+        f"SELECT {columns}, bm25({table}_fts, {_BM25_WEIGHTS}) AS rank "
+        f"FROM {table}_fts JOIN {table} ON {table}.id = {table}_fts.rowid "
+        f"WHERE {table}_fts MATCH ?{where}"
+    )
+
+
+def _union(
+    tables: list[str], rtree_where: Optional[str] = None, search: Optional[str] = None
+) -> str:
+    """UNION ALL of the given partition tables, each optionally narrowed by its own R*Tree and search index"""
+    if not tables:
+        return _empty_select(search == "rank")
+    return " UNION ALL ".join(_branch(table, rtree_where, search) for table in tables)
+
+
+def count_matches(
+    conn: sqlite3.Connection, tables: list[str], expression: str, cap: Optional[int] = None
+) -> int:
+    """Number of events in the given partitions matching an FTS5 query, stopping past `cap`"""
+    if not tables:
+        return 0
+    matches = " UNION ALL ".join(
+        f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?" for table in tables
+    )
+    limit = " LIMIT ?" if cap is not None else ""
+    params = [expression] * len(tables) + ([cap + 1] if cap is not None else [])
+    return conn.execute(f"SELECT COUNT(*) FROM ({matches}{limit})", params).fetchone()[0]
+
+
+def list_partitions(conn: sqlite3.Connection) -> list[tuple[str, str, int, int]]:
+    """(month, table, lower, upper) of every partition, oldest first; it holds the timestamps lower <= ts < upper"""
+    return [
+        (month, table, timestamps.month_start(lower), timestamps.month_start(upper))
+        for month, table, lower, upper in conn.execute(
+            "SELECT month, table_name, lower, upper FROM event_partitions ORDER BY month"
+        )
+    ]
+
+
+def rebuild_view(conn: sqlite3.Connection) -> None:
+    """Recreate the `events` view over all partitions and its write-routing triggers.
+
+    The view keeps plain `SELECT ... FROM events` working. Inserts and deletes on the
+    view are routed to the right partition; crud writes to the partitions directly.
+    Must run inside the transaction that changed event_partitions.
+    """
+    partitions = list_partitions(conn)
+    conn.execute("DROP VIEW IF EXISTS events")
+    conn.execute(f"CREATE VIEW events AS {_union([table for _, table, _, _ in partitions])}")
+
+    routes = "".join(
+        f"""
+            INSERT INTO {table} ({PARTITION_COLUMNS})
+            SELECT value, NEW.ts, NEW.label, NEW.description, NEW.x, NEW.y, NEW.source
+            FROM event_meta WHERE key = 'last_id' AND NEW.ts >= {lower} AND NEW.ts < {upper};
+        """
+        for _, table, lower, upper in partitions
+    )
+    covered = " OR ".join(
+        f"(NEW.ts >= {lower} AND NEW.ts < {upper})" for _, _, lower, upper in partitions
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER events_route_insert INSTEAD OF INSERT ON events
+        BEGIN
+            SELECT RAISE(ABORT, 'No partition for this event timestamp')
+            WHERE NOT ({covered or "0"});
+            UPDATE event_meta SET value = value + 1 WHERE key = 'last_id';
+            {routes}
+        END
+        """
+    )
+    deletes = "".join(
+        f"DELETE FROM {table} WHERE OLD.ts >= {lower} AND OLD.ts < {upper} AND id = OLD.id;\n"
+        for _, table, lower, upper in partitions
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER events_route_delete INSTEAD OF DELETE ON events
+        BEGIN
+            {deletes or "SELECT NULL;"}
+        END
+        """
+    )
+
+
+def create_partition(conn: sqlite3.Connection, month: str, with_triggers: bool = True) -> str:
+    """Create the partition table for `month` (without updating the view) and return its name"""
+    table = partition_table(month)
+    for statement in _table_ddl(
+        table, timestamps.month_start(month), timestamps.month_start(next_month(month))
+    ):
+        conn.execute(statement)
+    if with_triggers:
+        add_triggers(conn, table)
+    conn.execute(
+        "INSERT OR IGNORE INTO event_partitions (month, table_name, lower, upper) VALUES (?, ?, ?, ?)",
+        (month, table, month, next_month(month)),
+    )
+    return table
+
+
+def add_triggers(conn: sqlite3.Connection, table: str) -> None:
+    """Create the maintenance triggers of a partition table"""
+    for statement in _trigger_ddl(table):
+        conn.execute(statement)
+
+
+def add_search_index(conn: sqlite3.Connection, table: str) -> None:
+    """Build the search index of an existing partition and replace its triggers with ones maintaining it"""
+    conn.execute(_search_ddl(table))
+    conn.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+    conn.execute(f"DROP TRIGGER IF EXISTS {table}_insert")
+    conn.execute(f"DROP TRIGGER IF EXISTS {table}_delete")
+    add_triggers(conn, table)
+
+
+def add_filter_indexes(conn: sqlite3.Connection, table: str) -> None:
+    """Replace a partition's label index with the (label, ts) and (source, ts) indexes"""
+    for statement in _filter_index_ddl(table):
+        conn.execute(statement)
+    conn.execute(f"DROP INDEX IF EXISTS {table}_label")
+
+
+def ensure_partitions(conn: sqlite3.Connection, months: Iterable[str]) -> None:
+    """Create any missing partitions for `months` inside the caller's write transaction"""
+    wanted = set(months)
+    existing = (
+        {
+            row[0]
+            for row in conn.execute(
+                f"SELECT month FROM event_partitions WHERE month IN ({', '.join('?' for _ in wanted)})",
+                list(wanted),
+            )
+        }
+        if wanted
+        else set()
+    )
+    missing = wanted - existing
+    if not missing:
+        return
+    for month in sorted(missing):
+        create_partition(conn, month)
+    rebuild_view(conn)
+
+
+def tables_for_range(
+    conn: sqlite3.Connection, start: Optional[int], end: Optional[int]
+) -> tuple[list[str], bool]:
+    """Partition tables that can hold events with start <= ts <= end, and whether that is all of them"""
+    partitions = list_partitions(conn)
+    tables = [
+        table
+        for _, table, lower, upper in partitions
+        if (start is None or upper > start) and (end is None or lower <= end)
+    ]
+    return tables, len(tables) == len(partitions)
+
+
+def source_for(
+    tables: list[str],
+    everything: bool,
+    rtree_where: Optional[str] = None,
+    search: Optional[str] = None,
+) -> str:
+    """FROM-clause source over the given partitions, aliased as `events`.
+
+    With `rtree_where`, every partition is narrowed by its own R*Tree inside its
+    branch of the union, where SQLite can look the candidates up by id. `search`
+    narrows every branch to the rows matching an FTS5 query: "match" looks the
+    matches up by id, "scan" tests rows against them (cheaper when many rows match
+    and the rows are read in ts order with a LIMIT), and "rank" also adds their bm25
+    `rank` (lower is better; each partition ranks against its own statistics).
+    The caller passes, once per table and ahead of its WHERE parameters, the search
+    expression and then the R*Tree parameters.
+    """
+    if rtree_where or search:
+        return f"({_union(tables, rtree_where, search)}) AS events"
+    if everything:
+        return "events"
+    if len(tables) == 1:
+        return f"{tables[0]} AS events"
+    return f"({_union(tables)}) AS events"
+
+
+def drop_partitions_before(conn: sqlite3.Connection, month: str) -> list[str]:
+    """Drop every partition older than `month` and return the months dropped.
+
+    Each partition goes with DROP TABLE, so the cost does not depend on how many
+    events it holds and no per-row triggers run. The label counters are reduced by the
+    partition's hourly rollups, its rollup rows are deleted, and delete_gen and
+    write_gen are bumped so caches in every process drop what they hold.
+    """
+    partition_table(month)
+    with write_transaction(conn):
+        doomed = [
+            (m, table, lower, upper)
+            for m, table, lower, upper in list_partitions(conn)
+            if m < month
+        ]
+        for _, table, lower, upper in doomed:
+            conn.execute(
+                """
+                UPDATE event_label_counts SET n = n - (
+                    SELECT SUM(n) FROM event_rollup_hourly
+                    WHERE bucket >= ? AND bucket < ? AND event_rollup_hourly.label = event_label_counts.label
+                )
+                WHERE label IN (SELECT DISTINCT label FROM event_rollup_hourly WHERE bucket >= ? AND bucket < ?)
+                """,
+                (lower, upper, lower, upper),
+            )
+            conn.execute(
+                "DELETE FROM event_rollup_hourly WHERE bucket >= ? AND bucket < ?", (lower, upper)
+            )
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"DROP TABLE {table}_rtree")
+            conn.execute(f"DROP TABLE {table}_fts")
+            conn.execute("DELETE FROM event_partitions WHERE table_name = ?", (table,))
+        if doomed:
+            conn.execute("DELETE FROM event_label_counts WHERE n <= 0")
+            conn.execute(
+                "UPDATE event_meta SET value = value + 1 WHERE key IN ('delete_gen', 'write_gen')"
+            )
+            rebuild_view(conn)
+        conn.commit()
+    return [m for m, _, _, _ in doomed]
+
+
+def retention_months() -> int:
+    """Months of events to keep (EVENTS_RETENTION_MONTHS); 0 keeps everything"""
+    months = int(os.environ.get("EVENTS_RETENTION_MONTHS", "0"))
+    if months < 0:
+        raise ValueError("EVENTS_RETENTION_MONTHS must be 0 or more")
+    return months
+
+
+def apply_retention(
+    conn: sqlite3.Connection, keep_months: Optional[int] = None, now: Optional[datetime] = None
+) -> list[str]:
+    """Drop partitions outside the newest `keep_months` calendar months (the current one included)"""
+    keep_months = retention_months() if keep_months is None else keep_months
+    if keep_months <= 0:
+        return []
+    now = now or datetime.now(timezone.utc)
+    index = now.year * 12 + now.month - 1 - (keep_months - 1)
+    cutoff = f"{index // 12:04d}-{index % 12 + 1:02d}"
+    return drop_partitions_before(conn, cutoff)
@@ -0,0 +1,171 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+# Idle connections older than this are probed with a trivial query before being handed out
+HEALTH_CHECK_INTERVAL = 30.0
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout"""
+
+
+class PoolClosed(Exception):
+    """Raised when acquiring from a pool that has been shut down"""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared by the request threads.
+
+    Connections are opened lazily up to `size`. A thread that releases a connection
+    gets that same connection back on its next acquire if it is still idle, so the
+    threadpool workers that FastAPI runs sync endpoints on keep a warm page cache.
+    A connection is only ever used by one thread at a time.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        connect: Callable[[], sqlite3.Connection],
+        size: int = 8,
+        timeout: float = 10.0,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._connect = connect
+        self._cond = threading.Condition()
+        self._idle: list[sqlite3.Connection] = []
+        self._last_used: dict[int, float] = {}
+        self._open = 0
+        self._closed = False
+        self._local = threading.local()
+        self._acquired_total = 0
+        self._reused_by_thread = 0
+        self._discarded = 0
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, waiting up to `timeout` seconds for one to free up"""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed("Connection pool is closed")
+                if self._idle:
+                    conn = self._take_idle()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                self._cond.wait(remaining)
+            self._acquired_total += 1
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                self._forget()
+                raise
+        elif not self._healthy(conn):
+            self._discard(conn)
+            return self.acquire()
+
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, rolling back anything left uncommitted"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._last_used[id(conn)] = time.monotonic()
+            self._local.conn = conn
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager that acquires a connection and always releases it"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close idle connections and make checked-out ones close when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._last_used.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> dict:
+        """Snapshot of pool occupancy and reuse counters"""
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "acquired_total": self._acquired_total,
+                "reused_by_thread": self._reused_by_thread,
+                "discarded": self._discarded,
+            }
+
+    def _take_idle(self) -> sqlite3.Connection:
+        """Pop an idle connection, preferring the one this thread used last (lock held)"""
+        preferred: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if preferred is not None:
+            for i, conn in enumerate(self._idle):
+                if conn is preferred:
+                    self._reused_by_thread += 1
+                    return self._idle.pop(i)
+        return self._idle.pop()
+
+    def _healthy(self, conn: sqlite3.Connection) -> bool:
+        """Probe connections that have sat idle for a while"""
+        last_used = self._last_used.get(id(conn), 0.0)
+        if time.monotonic() - last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        """Drop a broken connection and free its slot"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._last_used.pop(id(conn), None)
+            self._discarded += 1
+        self._forget()
+
+    def _forget(self) -> None:
+        """Give back a slot that no longer has a connection behind it"""
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
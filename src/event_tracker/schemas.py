@@ -1,20 +1,30 @@
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Literal, Optional
 from pydantic import BaseModel, Field
+from typing_extensions import NotRequired, TypedDict
 
 class EventCreate(BaseModel):
     """Input model for creating an event (no id)"""
-    ts: datetime = Field(..., description="ISO datetime string")
+    ts: datetime = Field(..., description="ISO datetime string; converted to UTC, naive values are taken as UTC")
     label: str = Field(..., min_length=1, max_length=32, description="Short tag like 'crack' or 'rust' or 'note'")
     description: Optional[str] = Field(None, max_length=500, description="Optional longer text")
     x: Optional[float] = Field(None, description="Optional X coordinate")
     y: Optional[float] = Field(None, description="Optional Y coordinate")
     source: Optional[str] = Field(None, description="Optional source like 'manual' or 'video' or 'sensor'")
 
+class EventRow(TypedDict):
+    """Plain-dict form of EventCreate for validating large batches without building models"""
+    ts: datetime
+    label: Annotated[str, Field(min_length=1, max_length=32)]
+    description: NotRequired[Optional[Annotated[str, Field(max_length=500)]]]
+    x: NotRequired[Optional[float]]
+    y: NotRequired[Optional[float]]
+    source: NotRequired[Optional[str]]
+
 class EventOut(BaseModel):
     """Output model for an event (with id)"""
     id: int
-    ts: datetime
+    ts: datetime = Field(..., description="UTC, without an offset")
     label: str
     description: Optional[str] = None
     x: Optional[float] = None
@@ -26,7 +36,45 @@ class EventOut(BaseModel):
 
 class EventListResponse(BaseModel):
     """Output model for a list of events"""
-    total: int = Field(..., description="Total number of events for the filters")
+    total: Optional[int] = Field(..., description="Total number of events for the filters, or null when include_total=false")
+    total_exact: bool = Field(True, description="False when the total was capped by estimate_total=true")
     limit: int = Field(..., ge=1, le=200, description="Items per page")
     offset: int = Field(..., description="Offset of the returned events")
-    items: list[EventOut] = Field(..., description="List of event items")
\ No newline at end of file
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, or null on the last page")
+    items: list[EventOut] = Field(..., description="List of event items")
+
+class BulkItemError(BaseModel):
+    """Validation failure for one item of a bulk request"""
+    index: int = Field(..., description="Zero-based position of the item in the request")
+    errors: list[dict] = Field(..., description="Validation errors with loc, msg and type")
+
+class BulkIngestResponse(BaseModel):
+    """Output model for a bulk ingest request"""
+    inserted: int = Field(..., description="Number of events written")
+    ids: list[int] = Field(..., description="IDs of the written events, in request order")
+    errors: list[BulkItemError] = Field(default_factory=list, description="Items that failed validation and were skipped")
+
+class ImportResponse(BaseModel):
+    """Output model for a file import"""
+    inserted: int = Field(..., description="Number of events written")
+    rejected: int = Field(..., description="Number of records that failed validation and were skipped")
+    errors: list[BulkItemError] = Field(default_factory=list, description="The first rejected records, by zero-based record number")
+
+class StatsBucket(BaseModel):
+    """Event count for one time bucket and group"""
+    bucket: datetime = Field(..., description="Start of the time bucket")
+    label: Optional[str] = Field(None, description="Label of the group, when grouping by label")
+    source: Optional[str] = Field(None, description="Source of the group, when grouping by source")
+    count: int = Field(..., description="Number of events in the bucket")
+    min_x: Optional[float] = Field(None, description="Smallest x in the bucket")
+    max_x: Optional[float] = Field(None, description="Largest x in the bucket")
+    avg_x: Optional[float] = Field(None, description="Mean x over events that have one")
+    min_y: Optional[float] = Field(None, description="Smallest y in the bucket")
+    max_y: Optional[float] = Field(None, description="Largest y in the bucket")
+    avg_y: Optional[float] = Field(None, description="Mean y over events that have one")
+
+class StatsResponse(BaseModel):
+    """Output model for time-bucketed event counts"""
+    interval: Literal["minute", "hour", "day"] = Field(..., description="Bucket width")
+    group_by: list[Literal["label", "source"]] = Field(..., description="Columns the counts are split by")
+    buckets: list[StatsBucket] = Field(..., description="Counts ordered by bucket, oldest first")
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+from typing import Union
+
+from pydantic import TypeAdapter
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+MICROS_PER_SECOND = 1_000_000
+
+# Microseconds per stats interval; the hourly rollups are HOUR-wide buckets
+INTERVAL_MICROS = {
+    "minute": 60 * MICROS_PER_SECOND,
+    "hour": 3600 * MICROS_PER_SECOND,
+    "day": 86400 * MICROS_PER_SECOND,
+}
+HOUR = INTERVAL_MICROS["hour"]
+
+# Parses what POST /events accepts for ts, for strings datetime.fromisoformat() rejects
+# (a trailing Z before Python 3.11, for one)
+_DATETIME = TypeAdapter(datetime)
+
+
+def to_micros(value: Union[str, datetime, int]) -> int:
+    """Microseconds since 1970-01-01 UTC of an ISO 8601 string, a datetime or an int (returned as is).
+
+    Values with a UTC offset are converted to UTC; naive values are taken to be UTC
+    already. Strings are parsed like the ts of POST /events. Raises ValueError if a
+    string is not a timestamp.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            value = _DATETIME.validate_python(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def to_iso(micros: int) -> str:
+    """ISO 8601 text of a stored timestamp: UTC without an offset, as datetime.isoformat() writes it"""
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def month_of(micros: int) -> str:
+    """UTC month ('YYYY-MM') of a stored timestamp"""
+    return to_iso(micros)[:7]
+
+
+def month_start(month: str) -> int:
+    """Stored timestamp of the first instant of a 'YYYY-MM' month"""
+    return to_micros(datetime(int(month[:4]), int(month[5:7]), 1))
+
+
+def floor_sql(column: str, width: int) -> str:
+    """SQL rounding an integer timestamp column down to a multiple of `width` microseconds, also before 1970"""
+    return f"({column} - ({column} % {width} + {width}) % {width})"
+
+
+def iso_sql(column: str = "ts") -> str:
+    """SQL turning an integer timestamp column into the text to_iso() gives, inside SQLite"""
+    seconds = f"{floor_sql(column, MICROS_PER_SECOND)} / {MICROS_PER_SECOND}"
+    fraction = f"({column} % {MICROS_PER_SECOND} + {MICROS_PER_SECOND}) % {MICROS_PER_SECOND}"
+    return (
+        f"(strftime('%Y-%m-%dT%H:%M:%S', {seconds}, 'unixepoch') "
+        f"|| CASE WHEN {fraction} THEN printf('.%06d', {fraction}) ELSE '' END)"
+    )
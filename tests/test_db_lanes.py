@@ -0,0 +1,84 @@
+import asyncio
+import os
+import tempfile
+import threading
+from contextlib import ExitStack
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.aio import DBExecutor, DBOverloaded, get_lane
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_lane_rejects_when_full():
+    """Test that a lane refuses work beyond max_pending instead of queueing it"""
+    lane = DBExecutor("test", workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(lane.call_admitted(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(DBOverloaded):
+            await lane.call_admitted(lambda: None)
+        release.set()
+        await asyncio.gather(*blocked)
+        # Slots are free again once the calls finish
+        assert await lane.call_admitted(lambda: 42) == 42
+
+    asyncio.run(scenario())
+    assert lane.stats()["rejected"] == 1
+    lane.shutdown()
+
+
+def test_busy_heavy_lane_does_not_block_reads(test_app):
+    """Test that point reads still complete while the heavy lane is saturated"""
+    client = test_app
+    event_id = client.post("/events", json={"ts": "2026-01-21T10:00:00", "label": "crack"}).json()[
+        "id"
+    ]
+
+    heavy = get_lane("heavy")
+    release = threading.Event()
+    blockers = [heavy._executor.submit(release.wait) for _ in range(heavy.workers)]
+    try:
+        response = client.get(f"/events/{event_id}")
+        assert response.status_code == 200
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+
+
+def test_full_heavy_lane_returns_503(test_app):
+    """Test that exports are turned away with 503 while the heavy lane is full"""
+    client = test_app
+    heavy = get_lane("heavy")
+
+    with ExitStack() as stack:
+        for _ in range(heavy.max_pending):
+            stack.enter_context(heavy.admission())
+        response = client.get("/events/export")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    assert client.get("/events/export").status_code == 200
@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+from src.event_tracker.timestamps import month_start, to_micros
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def seed_months(client):
+    """Two events in each of January to March 2026"""
+    events = [
+        {
+            "ts": f"2026-0{month}-{day:02d}T12:00:00",
+            "label": f"m{month}",
+            "x": 10.0 * month,
+            "y": 5.0,
+        }
+        for month in (1, 2, 3)
+        for day in (1, 28)
+    ]
+    assert client.post("/events/bulk", json=events).status_code == 201
+
+
+def test_events_are_routed_to_monthly_partitions(test_app):
+    """Test that inserts create one table per month and range queries only read matching months"""
+    from src.event_tracker import partitions
+    from src.event_tracker.db import get_conn
+
+    client = test_app
+    seed_months(client)
+    conn = get_conn()
+    try:
+        assert [p[0] for p in partitions.list_partitions(conn)] == ["2026-01", "2026-02", "2026-03"]
+        assert conn.execute("SELECT COUNT(*) FROM events_p202602").fetchone()[0] == 2
+        tables, everything = partitions.tables_for_range(
+            conn, to_micros("2026-02-10T00:00:00"), to_micros("2026-03-01T00:00:00")
+        )
+        assert tables == ["events_p202602", "events_p202603"]
+        assert not everything
+    finally:
+        conn.close()
+
+    response = client.get(
+        "/events", params={"start": "2026-02-01T00:00:00", "end": "2026-02-28T23:59:59"}
+    )
+    assert [item["label"] for item in response.json()["items"]] == ["m2", "m2"]
+    response = client.get("/events", params={"min_x": 15, "max_x": 25, "min_y": 0, "max_y": 10})
+    assert response.json()["total"] == 2
+
+
+def test_newest_pages_walk_partitions_in_index_order(test_app):
+    """Test that newest-first pages read each month on its ts index and join up across months"""
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+
+    client = test_app
+    seed_months(client)
+    expected = ["m3", "m3", "m2", "m2", "m1", "m1"]
+    for offset in range(7):
+        response = client.get("/events", params={"limit": 3, "offset": offset})
+        assert [item["label"] for item in response.json()["items"]] == expected[offset : offset + 3]
+    first = client.get("/events", params={"limit": 3}).json()
+    second = client.get("/events", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    assert [item["label"] for item in second["items"]] == ["m2", "m1", "m1"]
+
+    conn = get_conn()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        crud.list_event_rows(conn, limit=3, offset=1)
+    finally:
+        conn.set_trace_callback(None)
+    plans = [
+        row[3]
+        for statement in statements
+        if "ORDER BY" in statement
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")
+    ]
+    conn.close()
+    assert plans and not any("TEMP B-TREE" in detail for detail in plans)
+
+
+def test_drop_partitions_updates_counts_stats_and_caches(test_app):
+    """Test that dropping a month removes its events everywhere and ids are never reused"""
+    from src.event_tracker import partitions
+    from src.event_tracker.db import get_conn
+
+    client = test_app
+    seed_months(client)
+    first_id = client.get("/events", params={"label": "m1"}).json()["items"][0]["id"]
+    assert client.get(f"/events/{first_id}").status_code == 200
+
+    conn = get_conn()
+    try:
+        assert partitions.drop_partitions_before(conn, "2026-02") == ["2026-01"]
+        assert (
+            conn.execute("SELECT n FROM event_label_counts WHERE label = 'm1'").fetchone() is None
+        )
+        assert (
+            conn.execute(
+                "SELECT COUNT(*) FROM event_rollup_hourly WHERE bucket < ?",
+                (month_start("2026-02"),),
+            ).fetchone()[0]
+            == 0
+        )
+        assert partitions.drop_partitions_before(conn, "2026-02") == []
+    finally:
+        conn.close()
+
+    assert client.get(f"/events/{first_id}").status_code == 404
+    assert client.get("/events").json()["total"] == 4
+    assert client.get("/events", params={"label": "m1"}).json()["total"] == 0
+    stats = client.get("/events/stats", params={"interval": "day"}).json()
+    assert sum(bucket["count"] for bucket in stats["buckets"]) == 4
+
+    new = client.post("/events", json={"ts": "2026-01-15T00:00:00", "label": "back"}).json()
+    assert new["id"] == 7
+
+
+def test_apply_retention_keeps_recent_months(test_app):
+    """Test that retention keeps the current month and the ones before it up to the limit"""
+    from src.event_tracker import partitions
+    from src.event_tracker.db import get_conn
+
+    seed_months(test_app)
+    conn = get_conn()
+    try:
+        now = datetime(2026, 4, 10, tzinfo=timezone.utc)
+        assert partitions.apply_retention(conn, keep_months=0, now=now) == []
+        assert partitions.apply_retention(conn, keep_months=3, now=now) == ["2026-01"]
+        assert [p[0] for p in partitions.list_partitions(conn)] == ["2026-02", "2026-03"]
+    finally:
+        conn.close()
+
+
+def test_view_insert_without_partition_fails(test_app):
+    """Test that writing through the view into a month without a partition raises"""
+    from src.event_tracker.db import get_conn
+
+    conn = get_conn()
+    try:
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO events (ts, label) VALUES ('2031-05-01T00:00:00', 'x')")
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def test_migration_partitions_existing_events(test_app):
+    """Test that an unpartitioned database keeps its events, counters and id sequence"""
+    from src.event_tracker import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "old.db")
+        conn = sqlite3.connect(path, isolation_level=None)
+        for version, migration in enumerate(db.MIGRATIONS[:7]):
+            migration(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.executemany(
+            "INSERT INTO events (ts, label, x, y) VALUES (?, ?, ?, ?)",
+            [
+                ("2025-12-31T23:00:00", "a", 1.0, 1.0),
+                ("2026-01-01T00:00:00", "b", 2.0, 2.0),
+                ("2026-01-02T00:00:00", "a", None, None),
+            ],
+        )
+        conn.execute("DELETE FROM events WHERE label = 'b'")
+        conn.close()
+
+        os.environ["EVENTS_DB_PATH"] = path
+        init_db()
+        from src.event_tracker.main import app
+
+        client = TestClient(app)
+        assert client.get("/events").json()["total"] == 2
+        assert (
+            client.get(
+                "/events", params={"min_x": 0, "max_x": 1.5, "min_y": 0, "max_y": 1.5}
+            ).json()["total"]
+            == 1
+        )
+        assert (
+            client.post("/events", json={"ts": "2026-01-03T00:00:00", "label": "c"}).json()["id"]
+            == 4
+        )
+        conn = sqlite3.connect(path)
+        tables = [
+            row[0] for row in conn.execute("SELECT table_name FROM event_partitions ORDER BY month")
+        ]
+        assert tables == ["events_p202512", "events_p202601"]
+        assert conn.execute("SELECT n FROM event_label_counts WHERE label = 'a'").fetchone()[0] == 2
+        conn.close()
+
+
+def test_cli_partition_commands(test_app, capsys):
+    """Test listing, dropping and retention from the command line"""
+    from src.event_tracker.cli import main
+
+    seed_months(test_app)
+    assert main(["partitions"]) == 0
+    assert "2026-02  events_p202602  2 events" in capsys.readouterr().out
+
+    assert main(["drop-partitions", "--before", "2026-13"]) == 2
+    assert main(["drop-partitions", "--before", "2026-02"]) == 0
+    assert "Dropped 1 partitions: 2026-01" in capsys.readouterr().out
+    assert main(["apply-retention", "--keep-months", "0"]) == 0
+    assert "Dropped 0 partitions" in capsys.readouterr().out
+    assert test_app.get("/events").json()["total"] == 4
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import tempfile
+import threading
+
+import pytest
+
+from src.event_tracker.pool import ConnectionPool, PoolClosed, PoolTimeout
+
+
+@pytest.fixture
+def db_path():
+    """Create an isolated database file for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        path = f.name
+
+    yield path
+
+    # Cleanup
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def make_pool(db_path, **kwargs):
+    return ConnectionPool(
+        db_path, lambda: sqlite3.connect(db_path, check_same_thread=False), **kwargs
+    )
+
+
+def test_same_thread_gets_its_connection_back(db_path):
+    """Test that a thread reuses the connection it released last"""
+    pool = make_pool(db_path, size=2)
+
+    mine = pool.acquire()
+    other_thread = {}
+
+    def borrow():
+        other_thread["conn"] = pool.acquire()
+
+    worker = threading.Thread(target=borrow)
+    worker.start()
+    worker.join()
+
+    pool.release(mine)
+    worker = threading.Thread(target=pool.release, args=(other_thread["conn"],))
+    worker.start()
+    worker.join()
+
+    # LIFO alone would hand out the other thread's connection
+    assert pool.acquire() is mine
+    assert pool.stats()["reused_by_thread"] == 1
+
+
+def test_pool_is_bounded(db_path):
+    """Test that acquire times out once every connection is checked out"""
+    pool = make_pool(db_path, size=1, timeout=0.05)
+
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    # A release from another thread wakes up a waiter
+    released = threading.Timer(0.01, pool.release, args=(conn,))
+    pool.timeout = 1.0
+    released.start()
+    assert pool.acquire() is conn
+    released.join()
+
+
+def test_release_rolls_back_open_transaction(db_path):
+    """Test that uncommitted work does not leak to the next borrower"""
+    pool = make_pool(db_path, size=1)
+
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_close_shuts_down_pool(db_path):
+    """Test that close closes idle connections and rejects new acquires"""
+    pool = make_pool(db_path, size=2)
+
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+    pool.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        idle.execute("SELECT 1")
+    with pytest.raises(PoolClosed):
+        pool.acquire()
+
+    # Connections checked out during shutdown are closed when they come back
+    pool.release(busy)
+    assert pool.stats()["open"] == 0
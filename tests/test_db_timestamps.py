@@ -0,0 +1,218 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+from src.event_tracker.timestamps import to_iso, to_micros
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_timestamps_are_stored_as_utc_microseconds(test_app):
+    """Test that offsets are normalized to UTC on the way in and ISO strings come back out"""
+    client = test_app
+    created = client.post(
+        "/events", json={"ts": "2026-02-01T01:30:00.250000+02:00", "label": "a"}
+    ).json()
+    assert created["ts"] == "2026-01-31T23:30:00.250000"
+    client.post("/events", json={"ts": "2026-01-31T23:00:00", "label": "b"})
+    client.post("/events", json={"ts": "2026-01-31T23:45:00Z", "label": "c"})
+
+    from src.event_tracker.db import get_conn
+
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT typeof(ts), ts FROM events_p202601 ORDER BY ts").fetchall()
+        assert [tuple(row) for row in rows] == [
+            ("integer", to_micros("2026-01-31T23:00:00")),
+            ("integer", to_micros("2026-01-31T23:30:00.250000")),
+            ("integer", to_micros("2026-01-31T23:45:00")),
+        ]
+        assert (
+            conn.execute("SELECT name FROM sqlite_master WHERE name = 'events_p202602'").fetchone()
+            is None
+        )
+    finally:
+        conn.close()
+
+    # Bounds with different offsets compare as instants
+    params = {"start": "2026-02-01T01:15:00+02:00", "end": "2026-01-31T18:40:00-05:00"}
+    assert [item["label"] for item in client.get("/events", params=params).json()["items"]] == ["a"]
+    assert client.get("/events", params={"start": "yesterday"}).status_code == 400
+    # Filters parse ts like POST /events does, a trailing Z included on every Python version
+    assert client.get("/events", params={"start": "2026-01-31T23:40:00Z"}).json()["total"] == 1
+    buckets = client.get("/events/stats", params={"interval": "hour"}).json()["buckets"]
+    assert [(b["bucket"], b["count"]) for b in buckets] == [("2026-01-31T23:00:00", 3)]
+
+    page = client.get("/events", params={"limit": 1}).json()
+    rest = client.get("/events", params={"limit": 5, "cursor": page["next_cursor"]}).json()["items"]
+    assert [item["label"] for item in rest] == ["a", "b"]
+    assert to_iso(to_micros(page["items"][0]["ts"])) == page["items"][0]["ts"]
+
+
+def test_stats_bucket_at_the_epoch(test_app):
+    """Test that the 1970-01-01T00:00 bucket, stored as 0, sorts with the other buckets"""
+    client = test_app
+    for ts in ("1970-01-01T00:10:00", "1970-01-01T05:10:00"):
+        assert client.post("/events", json={"ts": ts, "label": "epoch"}).status_code == 201
+    for params in ({"interval": "hour"}, {"interval": "hour", "group_by": "source"}):
+        response = client.get("/events/stats", params=params)
+        assert response.status_code == 200
+        assert [b["bucket"] for b in response.json()["buckets"]] == [
+            "1970-01-01T00:00:00",
+            "1970-01-01T05:00:00",
+        ]
+
+
+def legacy_partition(conn: sqlite3.Connection, month: str, rows: list[tuple]) -> None:
+    """A partition with ISO 8601 text timestamps, as databases before the integer timestamps have them"""
+    from src.event_tracker import partitions
+
+    table = partitions.partition_table(month)
+    upper = partitions.next_month(month)
+    conn.execute(
+        f"""
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY,
+            ts TEXT NOT NULL CHECK (ts >= '{month}' AND ts < '{upper}'),
+            label TEXT NOT NULL,
+            description TEXT,
+            x REAL,
+            y REAL,
+            source TEXT
+        )
+        """
+    )
+    # Adds the indexes, R*Tree, search index and triggers around the existing table
+    partitions.create_partition(conn, month)
+    partitions.rebuild_view(conn)
+    for row in rows:
+        event_id = conn.execute(
+            "UPDATE event_meta SET value = value + 1 WHERE key = 'last_id' RETURNING value"
+        ).fetchone()[0]
+        conn.execute(
+            f"INSERT INTO {table} ({partitions.PARTITION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (event_id, *row),
+        )
+
+
+def test_migration_converts_text_partitions_in_batches(test_app, monkeypatch):
+    """Test that text timestamps are converted batch by batch, keeping writes made between batches"""
+    from src.event_tracker import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "old.db")
+        conn = sqlite3.connect(path, isolation_level=None)
+        for version, migration in enumerate(db.MIGRATIONS[:10]):
+            migration(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        legacy_partition(
+            conn,
+            "2026-01",
+            [
+                (f"2026-01-{day:02d}T10:00:00", "crack", "hairline crack", float(day), 1.0, "video")
+                for day in range(1, 6)
+            ],
+        )
+        legacy_partition(
+            conn,
+            "2026-02",
+            [
+                ("2026-02-01T01:00:00+02:00", "rust", "rust spot", None, None, None),
+                ("2026-02-03T08:30:00.500000", "rust", None, 7.0, 7.0, "manual"),
+            ],
+        )
+        conn.close()
+
+        # Another writer deletes a copied event and adds one between two batches
+        batches = []
+        copy_batch = db._copy_timestamp_batch
+
+        def interleaved(conn, table, lower, upper):
+            batches.append(table)
+            if len(batches) == 2:
+                conn.execute("DELETE FROM events_p202601 WHERE id = 1")
+                conn.execute(
+                    "INSERT INTO events_p202601 (id, ts, label) SELECT value + 1, '2026-01-20T00:00:00', 'late' FROM event_meta WHERE key = 'last_id'"
+                )
+                conn.execute("UPDATE event_meta SET value = value + 1 WHERE key = 'last_id'")
+            return copy_batch(conn, table, lower, upper)
+
+        monkeypatch.setattr(db, "TIMESTAMP_MIGRATION_BATCH", 2)
+        monkeypatch.setattr(db, "_copy_timestamp_batch", interleaved)
+        os.environ["EVENTS_DB_PATH"] = path
+        init_db()
+        assert batches == ["events_p202601"] * 4 + ["events_p202602"] * 2
+
+        from src.event_tracker.main import app
+
+        client = TestClient(app)
+        items = client.get("/events", params={"limit": 10}).json()["items"]
+        assert [(item["ts"], item["label"]) for item in items] == [
+            ("2026-02-03T08:30:00.500000", "rust"),
+            ("2026-01-31T23:00:00", "rust"),
+            ("2026-01-20T00:00:00", "late"),
+            *[(f"2026-01-{day:02d}T10:00:00", "crack") for day in range(5, 1, -1)],
+        ]
+        assert client.get("/events", params={"label": "rust"}).json()["total"] == 2
+        assert (
+            client.get("/events", params={"q": "spot"}).json()["items"][0]["ts"]
+            == "2026-01-31T23:00:00"
+        )
+        assert (
+            client.get(
+                "/events", params={"min_x": 6.5, "max_x": 7.5, "min_y": 0, "max_y": 10}
+            ).json()["total"]
+            == 1
+        )
+        buckets = client.get(
+            "/events/stats", params={"interval": "day", "group_by": "label"}
+        ).json()["buckets"]
+        assert [(b["bucket"][:10], b["label"], b["count"]) for b in buckets][-3:] == [
+            ("2026-01-20", "late", 1),
+            ("2026-01-31", "rust", 1),
+            ("2026-02-03", "rust", 1),
+        ]
+
+        conn = sqlite3.connect(path)
+        assert conn.execute("SELECT COUNT(*) FROM events_p202601").fetchone()[0] == 6
+        assert (
+            conn.execute(
+                "SELECT COUNT(*) FROM events_p202602_fts WHERE events_p202602_fts MATCH 'spot'"
+            ).fetchone()[0]
+            == 0
+        )
+        assert (
+            conn.execute("SELECT n FROM event_label_counts WHERE label = 'rust'").fetchone()[0] == 2
+        )
+        assert (
+            conn.execute(
+                "SELECT type FROM pragma_table_info('event_rollup_hourly') WHERE name = 'bucket'"
+            ).fetchone()[0]
+            == "INTEGER"
+        )
+        leftovers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE '%_new' OR name = 'event_ts_moves'"
+        ).fetchall()
+        conn.close()
+        assert leftovers == []
@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+fcntl = pytest.importorskip("fcntl")
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    for path in (db_path, f"{db_path}-writer.lock", f"{db_path}-startup.lock"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def start_and_write(db_path: str, n_events: int) -> tuple[int, list[int]]:
+    """One worker process: initialize the database, then create events; returns (migrations applied, ids)"""
+    os.environ["EVENTS_DB_PATH"] = db_path
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+    from src.event_tracker.schemas import EventCreate
+
+    applied = init_db()
+    conn = get_conn()
+    try:
+        ids = [
+            crud.create_event(
+                conn, EventCreate(ts=f"2026-01-21T12:00:{i % 60:02d}", label=f"worker{os.getpid()}")
+            )["id"]
+            for i in range(n_events)
+        ]
+    finally:
+        conn.close()
+    return applied, ids
+
+
+def test_workers_migrate_once_and_take_turns_writing():
+    """Test that worker processes starting together run each migration once and write without errors"""
+    from src.event_tracker.db import MIGRATIONS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "shared.db")
+        with multiprocessing.get_context("spawn").Pool(4) as pool:
+            results = pool.starmap(start_and_write, [(db_path, 25)] * 4)
+
+        assert sum(applied for applied, _ in results) == len(MIGRATIONS)
+        ids = sorted(event_id for _, worker_ids in results for event_id in worker_ids)
+        assert ids == list(range(1, 101))
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 100
+        assert conn.execute("SELECT SUM(n) FROM event_label_counts").fetchone()[0] == 100
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        conn.close()
+
+
+def test_write_without_a_turn_returns_503(test_app, monkeypatch):
+    """Test that a write waits for the writer lock held by another process and gives up with a retryable 503"""
+    from src.event_tracker.db import get_db_path
+    from src.event_tracker.locks import get_writer_lock
+
+    client = test_app
+    db_path = get_db_path()
+    monkeypatch.setattr(get_writer_lock(db_path), "timeout", 0.2)
+
+    # Another process's hold on the lock file looks the same from here
+    fd = os.open(f"{db_path}-writer.lock", os.O_RDWR | os.O_CREAT)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        response = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "blocked"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+    finally:
+        os.close(fd)
+
+    assert (
+        client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "free"}).status_code
+        == 201
+    )
+    writer = client.get("/health").json()["writer"]
+    assert writer["cross_process"] and writer["timeouts"] == 1 and writer["acquired"] >= 1
+    assert client.get("/events").json()["total"] == 1
+
+
+def test_write_outlasts_writers_without_the_lock(test_app, monkeypatch):
+    """Test that BEGIN IMMEDIATE is retried past busy_timeout while a writer that skips the lock file holds the database"""
+    monkeypatch.setenv("EVENTS_DB_BUSY_TIMEOUT", "20")
+    from src.event_tracker.db import close_pool, get_db_path
+
+    close_pool()
+    client = test_app
+    outsider = sqlite3.connect(get_db_path(), isolation_level=None, check_same_thread=False)
+    outsider.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(0.3, outsider.execute, ("COMMIT",))
+    timer.start()
+    try:
+        response = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "patient"})
+    finally:
+        timer.join()
+        outsider.close()
+        close_pool()
+
+    assert response.status_code == 201
+    assert client.get("/health").json()["writer"]["busy_retries"] > 0
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import tempfile
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.cache import LRUCache, close_event_cache
+from src.event_tracker.db import init_db
+from src.event_tracker.timestamps import to_micros
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    close_event_cache()
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def cache_stats(client):
+    return client.get("/health").json()["event_cache"]
+
+
+def test_repeated_get_is_served_from_cache(test_app):
+    """Test that the second read of an event is a cache hit"""
+    client = test_app
+    event = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "note"}).json()
+
+    assert client.get(f"/events/{event['id']}").json() == event
+    assert client.get(f"/events/{event['id']}").json() == event
+
+    stats = cache_stats(client)
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["size"] == 1
+
+
+def test_delete_invalidates_entry(test_app):
+    """Test that deleting through the API drops the cached event but keeps the others"""
+    client = test_app
+    first = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "a"}).json()
+    second = client.post("/events", json={"ts": "2026-01-21T12:01:00", "label": "b"}).json()
+    client.get(f"/events/{first['id']}")
+    client.get(f"/events/{second['id']}")
+
+    assert client.delete(f"/events/{first['id']}").status_code == 204
+    assert client.get(f"/events/{first['id']}").status_code == 404
+    assert client.get(f"/events/{second['id']}").json() == second
+
+    stats = cache_stats(client)
+    assert stats["invalidations"] == 1
+    assert stats["hits"] == 1
+
+
+def test_delete_from_another_connection_is_noticed(test_app):
+    """Test that a delete made outside this process's crud layer clears the cache"""
+    client = test_app
+    event = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "note"}).json()
+    client.get(f"/events/{event['id']}")
+
+    # Simulates another worker process sharing the database file
+    other = sqlite3.connect(os.environ["EVENTS_DB_PATH"])
+    other.execute("DELETE FROM events WHERE id = ?", (event["id"],))
+    other.commit()
+    other.close()
+
+    assert client.get(f"/events/{event['id']}").status_code == 404
+
+
+def test_lookup_checks_for_commits_off_the_event_loop(test_app, monkeypatch):
+    """Test that the cache's check for other processes' commits runs on a database lane thread"""
+    import threading
+
+    from src.event_tracker.cache import DataVersionWatch
+
+    client = test_app
+    event = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "note"}).json()
+    threads = []
+    check = DataVersionWatch.check
+
+    def recording_check(self):
+        threads.append(threading.current_thread().name)
+        check(self)
+
+    monkeypatch.setattr(DataVersionWatch, "check", recording_check)
+    client.get(f"/events/{event['id']}")
+    client.get(f"/events/{event['id']}")
+
+    assert len(threads) == 2
+    assert all(name.startswith("db-interactive") for name in threads)
+
+
+def test_inserts_from_another_connection_keep_cache(test_app):
+    """Test that commits without deletes do not clear the cache"""
+    client = test_app
+    event = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "note"}).json()
+    client.get(f"/events/{event['id']}")
+
+    other = sqlite3.connect(os.environ["EVENTS_DB_PATH"])
+    other.execute(
+        "INSERT INTO events (ts, label) VALUES (?, 'other')", (to_micros("2026-01-21T13:00:00"),)
+    )
+    other.commit()
+    other.close()
+
+    client.get(f"/events/{event['id']}")
+    assert cache_stats(client)["hits"] == 1
+
+
+def test_fill_on_create(test_app, monkeypatch):
+    """Test that EVENTS_CACHE_FILL_ON_CREATE caches the row written by POST /events"""
+    monkeypatch.setenv("EVENTS_CACHE_FILL_ON_CREATE", "1")
+    close_event_cache()
+    client = test_app
+    event = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "note"}).json()
+
+    assert client.get(f"/events/{event['id']}").json() == event
+    stats = cache_stats(client)
+    assert stats["hits"] == 1
+    assert stats["misses"] == 0
+
+
+def test_cache_disabled(test_app, monkeypatch):
+    """Test that EVENTS_CACHE_SIZE=0 turns the cache off"""
+    monkeypatch.setenv("EVENTS_CACHE_SIZE", "0")
+    close_event_cache()
+    client = test_app
+    event = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "note"}).json()
+
+    assert client.get(f"/events/{event['id']}").json() == event
+    assert cache_stats(client) is None
+
+
+def test_lru_eviction_and_ttl():
+    """Test that the least recently used entry is evicted and old entries expire"""
+    cache = LRUCache(maxsize=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    cache.get(1)
+    cache.put(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.stats()["evictions"] == 1
+
+    expiring = LRUCache(maxsize=2, ttl=0.01)
+    expiring.put(1, "a")
+    time.sleep(0.02)
+    assert expiring.get(1) is None
+    assert expiring.stats()["expirations"] == 1
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_bulk_json_array(test_app):
+    """Test bulk ingest of a JSON array returns contiguous ids in request order"""
+    client = test_app
+
+    response = client.post(
+        "/events/bulk",
+        json=[
+            {"ts": f"2026-01-21T{10 + i:02d}:00:00", "label": f"event_{i}", "x": float(i)}
+            for i in range(3)
+        ],
+    )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["inserted"] == 3
+    assert data["ids"] == [1, 2, 3]
+    assert data["errors"] == []
+
+    # Each id points at the matching item
+    assert client.get("/events/2").json()["label"] == "event_1"
+
+
+def test_bulk_ndjson_with_invalid_items(test_app):
+    """Test NDJSON ingest skips invalid lines and reports them by index"""
+    client = test_app
+    lines = [
+        json.dumps({"ts": "2026-01-21T10:00:00", "label": "crack"}),
+        json.dumps({"ts": "not a date", "label": "rust"}),
+        json.dumps({"ts": "2026-01-21T11:00:00", "label": "rust"}),
+    ]
+
+    response = client.post(
+        "/events/bulk",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["inserted"] == 2
+    assert len(data["ids"]) == 2
+    assert len(data["errors"]) == 1
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["errors"][0]["loc"] == ["ts"]
+
+    assert client.get("/events").json()["total"] == 2
+
+
+def test_bulk_atomic_rejects_everything(test_app):
+    """Test that atomic=true writes nothing when any item is invalid"""
+    client = test_app
+
+    response = client.post(
+        "/events/bulk?atomic=true",
+        json=[
+            {"ts": "2026-01-21T10:00:00", "label": "crack"},
+            {"ts": "2026-01-21T11:00:00", "label": ""},
+        ],
+    )
+
+    assert response.status_code == 422
+    assert client.get("/events").json()["total"] == 0
+
+
+def test_bulk_rejects_non_array(test_app):
+    """Test that a JSON object body is rejected"""
+    client = test_app
+
+    response = client.post("/events/bulk", json={"ts": "2026-01-21T10:00:00", "label": "crack"})
+    assert response.status_code == 400
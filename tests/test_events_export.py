@@ -112,3 +112,106 @@ def test_export_csv_empty(test_app):
     # Check that no rows are returned
     assert csv_reader.fieldnames == ["id", "ts", "label", "description", "x", "y", "source"]
     assert len(rows) == 0
+
+def test_export_csv_streams_in_chunks(test_app):
+    """Test that the streaming writer emits the header and then one chunk per fetchmany batch"""
+    from src.event_tracker import crud, csv_export
+    from src.event_tracker.db import get_conn
+
+    client = test_app
+    for i in range(5):
+        client.post(
+            "/events",
+            json={
+                "ts": f"2026-01-21T{10+i:02d}:00:00",
+                "label": f"event_{i}",
+            },
+        )
+
+    conn = get_conn()
+    try:
+        chunks = list(csv_export.iter_csv(crud.iter_events(conn), chunk_size=2))
+    finally:
+        conn.close()
+
+    # header + 3 chunks of at most 2 rows
+    assert len(chunks) == 4
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert [row["label"] for row in rows] == [f"event_{i}" for i in reversed(range(5))]
+
+    # The endpoint produces the same document
+    response = client.get("/events/export")
+    assert response.text == "".join(chunks)
+
+def seed_events(client):
+    client.post("/events/bulk", json=[
+        {"ts": "2026-01-21T12:00:00", "label": "a", "description": "first", "x": 1.5, "y": 2.5, "source": "manual"},
+        {"ts": "2026-01-21T13:00:00", "label": "b"},
+    ])
+
+def test_export_ndjson(test_app):
+    """Test that NDJSON export writes one typed JSON object per event"""
+    import json
+
+    client = test_app
+    seed_events(client)
+
+    response = client.get("/events/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "events.ndjson" in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows[0] == {"id": 2, "ts": "2026-01-21T13:00:00", "label": "b", "description": None, "x": None, "y": None, "source": None}
+    assert rows[1]["x"] == 1.5
+
+def test_export_gzip(test_app):
+    """Test that compression=gzip encodes the stream and clients decode it transparently"""
+    client = test_app
+    seed_events(client)
+
+    plain = client.get("/events/export", params={"format": "ndjson"})
+    compressed = client.get("/events/export", params={"format": "ndjson", "compression": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.text == plain.text
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_export_columnar(test_app, fmt):
+    """Test that Arrow IPC and Parquet exports round-trip typed columns"""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    client = test_app
+    seed_events(client)
+
+    response = client.get("/events/export", params={"format": fmt, "label": "a"})
+    assert response.status_code == 200
+    if fmt == "arrow":
+        table = pyarrow.ipc.open_stream(response.content).read_all()
+    else:
+        table = pyarrow.parquet.read_table(pa.BufferReader(response.content))
+    assert table.schema.field("x").type == pa.float64()
+    assert table.to_pylist() == [
+        {"id": 1, "ts": "2026-01-21T12:00:00", "label": "a", "description": "first", "x": 1.5, "y": 2.5, "source": "manual"}
+    ]
+
+def test_export_columnar_empty_and_compressed(test_app):
+    """Test that an empty Parquet export is still a valid file and zstd pages work"""
+    pa = pytest.importorskip("pyarrow")
+    pytest.importorskip("zstandard")
+    import pyarrow.parquet
+
+    client = test_app
+    response = client.get("/events/export", params={"format": "parquet", "compression": "zstd"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert pyarrow.parquet.read_table(pa.BufferReader(response.content)).num_rows == 0
+
+def test_export_unavailable_format(test_app, monkeypatch):
+    """Test that a format needing a missing optional package answers 501"""
+    from src.event_tracker import export
+
+    monkeypatch.setattr(export, "pa", None)
+    response = test_app.get("/events/export", params={"format": "arrow"})
+    assert response.status_code == 501
+    assert "pyarrow" in response.json()["detail"]
@@ -194,3 +194,128 @@ def test_newest_first_sorting(test_app):
     assert items[0]["label"] == "first"
     assert items[1]["label"] == "second"
     assert items[2]["label"] == "third"
+
+def test_cursor_pagination(test_app):
+    """Test walking all pages with next_cursor, including events that share a timestamp"""
+    client = test_app
+
+    for i in range(5):
+        client.post(
+            "/events",
+            json={
+                "ts": f"2026-01-21T{10 + i // 2:02d}:00:00",
+                "label": f"event_{i}",
+            },
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/events?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        data = client.get(url).json()
+        assert data["total"] == 5
+        seen.extend(item["label"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    # Newest first, ties broken by id descending, nothing skipped or repeated
+    assert seen == ["event_4", "event_3", "event_2", "event_1", "event_0"]
+
+def test_cursor_pagination_with_filters(test_app):
+    """Test that the cursor continues within the same filtered result"""
+    client = test_app
+
+    for i in range(4):
+        client.post(
+            "/events",
+            json={
+                "ts": f"2026-01-21T{10 + i:02d}:00:00",
+                "label": "crack" if i % 2 == 0 else "rust",
+            },
+        )
+
+    first = client.get("/events?label=crack&limit=1").json()
+    second = client.get(f"/events?label=crack&limit=1&cursor={first['next_cursor']}").json()
+    assert first["items"][0]["ts"] == "2026-01-21T12:00:00"
+    assert second["items"][0]["ts"] == "2026-01-21T10:00:00"
+    assert second["next_cursor"] is None
+
+def test_invalid_cursor(test_app):
+    """Test that a malformed cursor is rejected"""
+    client = test_app
+    response = client.get("/events?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+def test_skip_total(test_app):
+    """Test that include_total=false returns the page without a count"""
+    client = test_app
+    client.post("/events", json={"ts": "2026-01-21T10:00:00", "label": "crack"})
+
+    data = client.get("/events?include_total=false").json()
+    assert data["total"] is None
+    assert len(data["items"]) == 1
+
+def test_label_counts_follow_inserts_and_deletes(test_app):
+    """Test that the maintained counters used for label-only totals stay correct"""
+    client = test_app
+    ids = []
+    for label in ["crack", "rust", "crack"]:
+        ids.append(client.post("/events", json={"ts": "2026-01-21T10:00:00", "label": label}).json()["id"])
+    client.post("/events/bulk", json=[{"ts": "2026-01-21T11:00:00", "label": "rust"}] * 3)
+    client.delete(f"/events/{ids[0]}")
+
+    assert client.get("/events").json()["total"] == 5
+    assert client.get("/events?label=crack").json()["total"] == 1
+    assert client.get("/events?label=rust").json()["total"] == 4
+    assert client.get("/events?label=none").json()["total"] == 0
+
+def test_estimated_total_is_capped(test_app):
+    """Test that a capped count stops at the cap"""
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+
+    client = test_app
+    client.post("/events/bulk", json=[{"ts": f"2026-01-21T{10+i:02d}:00:00", "label": "crack"} for i in range(5)])
+
+    conn = get_conn()
+    try:
+        assert crud.count_events(conn, start="2026-01-21T00:00:00", cap=3) == 3
+        assert crud.count_events(conn, start="2026-01-21T00:00:00", cap=10) == 5
+    finally:
+        conn.close()
+
+    data = client.get("/events?start=2026-01-21T00:00:00&estimate_total=true").json()
+    assert data["total"] == 5
+    assert data["total_exact"] is True
+
+@pytest.mark.parametrize("max_candidates", [20000, 1, 0])
+def test_bbox_with_partial_coordinates(test_app, monkeypatch, max_candidates):
+    """Test bbox filters give the same answer through the spatial index and the scan fallback"""
+    from src.event_tracker import crud
+
+    monkeypatch.setattr(crud, "SPATIAL_INDEX_MAX_CANDIDATES", max_candidates)
+    client = test_app
+    events = [
+        {"label": "inside", "x": 5.0, "y": 5.0},
+        {"label": "edge", "x": 10.0, "y": 0.0},
+        {"label": "outside", "x": 50.0, "y": 5.0},
+        {"label": "x_only", "x": 5.0},
+        {"label": "y_only", "y": 5.0},
+        {"label": "no_coords"},
+    ]
+    client.post("/events/bulk", json=[{"ts": "2026-01-21T10:00:00", **event} for event in events])
+
+    def labels(query):
+        data = client.get(f"/events?{query}").json()
+        assert data["total"] == len(data["items"])
+        return sorted(item["label"] for item in data["items"])
+
+    assert labels("min_x=0&max_x=10&min_y=0&max_y=10") == ["edge", "inside"]
+    assert labels("min_x=0&max_x=10") == ["edge", "inside", "x_only"]
+    assert labels("min_y=4&max_y=6") == ["inside", "outside", "y_only"]
+
+    # Deleted events leave the index too
+    inside_id = client.get("/events?label=inside").json()["items"][0]["id"]
+    client.delete(f"/events/{inside_id}")
+    assert labels("min_x=0&max_x=10&min_y=0&max_y=10") == ["edge"]
@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def seed(client):
+    """Events over two months with several labels and sources, some without source or description"""
+    events = []
+    for i in range(24):
+        events.append(
+            {
+                "ts": f"2026-0{1 + i % 2}-{1 + i:02d}T{i % 24:02d}:30:00",
+                "label": ["crack", "rust", "dent", "leak"][i % 4],
+                "source": [None, "video", "manual"][i % 3],
+                "description": "checked" if i % 5 == 0 else None,
+                "x": float(i),
+                "y": float(i),
+            }
+        )
+    assert client.post("/events/bulk", json=events).status_code == 201
+    return events
+
+
+def expected(events, **filters):
+    """Timestamps (newest first) of the seeded events passing the in-memory filters"""
+    from src.event_tracker.filters import EventFilters
+
+    event_filters = EventFilters(**filters)
+    return sorted((event["ts"] for event in events if event_filters.matches(event)), reverse=True)
+
+
+def test_multi_value_and_negated_filters(test_app):
+    """Test repeated label/source, not_label, not_source and has_description on list and count"""
+    client = test_app
+    events = seed(client)
+
+    for params, filters in [
+        ({"label": ["crack", "leak"]}, {"label": ["crack", "leak"]}),
+        ({"source": ["video", "manual"]}, {"source": ["video", "manual"]}),
+        ({"not_label": ["crack", "rust"]}, {"not_label": ["crack", "rust"]}),
+        ({"not_source": "video"}, {"not_source": "video"}),
+        ({"has_description": "true"}, {"has_description": True}),
+        (
+            {"has_description": "false", "label": "rust"},
+            {"has_description": False, "label": "rust"},
+        ),
+        (
+            {
+                "label": ["crack", "rust", "dent"],
+                "not_source": "manual",
+                "start": "2026-02-01T00:00:00",
+            },
+            {
+                "label": ["crack", "rust", "dent"],
+                "not_source": "manual",
+                "start": "2026-02-01T00:00:00",
+            },
+        ),
+    ]:
+        data = client.get("/events", params={**params, "limit": 100}).json()
+        assert [item["ts"] for item in data["items"]] == expected(events, **filters), params
+        assert data["total"] == len(data["items"])
+
+    # Events without a source are never excluded by not_source
+    items = client.get("/events", params={"not_source": ["video", "manual"]}).json()["items"]
+    assert items and all(item["source"] is None for item in items)
+    assert client.get("/events/stream", params={"q": "checked"}).status_code == 400
+
+
+def test_stats_rollups_match_raw_events_with_filters(test_app, monkeypatch):
+    """Test that stats over label and source lists agree between rollups and raw events"""
+    from src.event_tracker import crud
+
+    client = test_app
+    seed(client)
+    params = {
+        "interval": "day",
+        "group_by": ["label", "source"],
+        "label": ["crack", "rust"],
+        "not_source": "video",
+        "start": "2026-01-03T12:00:00",
+        "end": "2026-02-20T12:00:00",
+    }
+    from_rollups = client.get("/events/stats", params=params).json()["buckets"]
+    monkeypatch.setattr(crud, "USE_ROLLUPS", False)
+    from_events = client.get("/events/stats", params=params).json()["buckets"]
+
+    assert from_rollups == from_events
+    assert (
+        sum(bucket["count"] for bucket in from_rollups)
+        == client.get("/events", params=params).json()["total"]
+    )
+
+
+def test_large_lists_walk_the_ts_index(test_app, monkeypatch):
+    """Test that label lists matching many events skip their index and still return the same pages"""
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+    from src.event_tracker.filters import EventFilters
+
+    client = test_app
+    seed(client)
+    params = {"label": ["crack", "dent"], "source": ["manual", "video"], "limit": 3}
+    first = client.get("/events", params=params).json()
+
+    conn = get_conn()
+    try:
+        filters = EventFilters(label=params["label"], source=params["source"])
+        tables = [table for _, table, _, _ in crud.partitions.list_partitions(conn)]
+        assert crud._avoided_indexes(conn, tables, filters, "newest") == {"source"}
+        monkeypatch.setattr(crud, "FILTER_SORT_MAX_ROWS", 1)
+        assert crud._avoided_indexes(conn, tables, filters, "newest") == {"label", "source"}
+        assert (
+            crud._avoided_indexes(conn, tables, EventFilters(label="crack"), "newest")
+            == frozenset()
+        )
+    finally:
+        conn.close()
+
+    # Any write moves the generation, so the result cache cannot answer the repeat query
+    client.post("/events", json={"ts": "2025-12-01T00:00:00", "label": "old"})
+    second = client.get("/events", params=params).json()
+    assert second["items"] == first["items"]
+    page = client.get("/events", params={**params, "cursor": second["next_cursor"]}).json()
+    six = client.get("/events", params={**params, "limit": 6}).json()
+    assert page["items"] == six["items"][3:]
+
+
+def test_filter_index_migration(test_app):
+    """Test that existing partitions get the (label, ts) and (source, ts) indexes"""
+    from src.event_tracker import db, partitions
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "old.db")
+        conn = sqlite3.connect(path, isolation_level=None)
+        for version, migration in enumerate(db.MIGRATIONS[:9]):
+            migration(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        # A partition as the earlier migrations left it, with a plain label index
+        table = partitions.create_partition(conn, "2026-03")
+        partitions.rebuild_view(conn)
+        conn.execute(f"DROP INDEX {table}_label_ts")
+        conn.execute(f"DROP INDEX {table}_source_ts")
+        conn.execute(f"CREATE INDEX {table}_label ON {table} (label)")
+        conn.close()
+
+        os.environ["EVENTS_DB_PATH"] = path
+        init_db()
+        from src.event_tracker.main import app
+
+        client = TestClient(app)
+        client.post("/events", json={"ts": "2026-03-01T00:00:00", "label": "a", "source": "video"})
+        conn = sqlite3.connect(path)
+        indexes = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name LIKE 'events_p%'"
+            )
+        }
+        conn.close()
+        assert {
+            "events_p202603_label_ts",
+            "events_p202603_source_ts",
+            "events_p202603_ts",
+        } <= indexes
+        assert "events_p202603_label" not in indexes
+        assert client.get("/events", params={"source": "video"}).json()["total"] == 1
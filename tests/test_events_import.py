@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_import_csv_export_roundtrip(test_app):
+    """Test that a CSV export can be imported back with the same values"""
+    client = test_app
+    client.post(
+        "/events/bulk",
+        json=[
+            {
+                "ts": "2026-01-21T12:00:00",
+                "label": "a",
+                "description": "first",
+                "x": 1.5,
+                "y": 2.5,
+                "source": "manual",
+            },
+            {"ts": "2026-01-21T13:00:00", "label": "b"},
+        ],
+    )
+    exported = client.get("/events/export").content
+
+    response = client.post("/events/import", content=exported, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 201
+    assert response.json() == {"inserted": 2, "rejected": 0, "errors": []}
+
+    items = client.get("/events", params={"label": "a"}).json()["items"]
+    assert len(items) == 2
+    assert {k: v for k, v in items[0].items() if k != "id"} == {
+        k: v for k, v in items[1].items() if k != "id"
+    }
+    assert client.get("/events", params={"label": "b"}).json()["items"][0]["x"] is None
+
+
+def test_import_ndjson_reports_rejected_records(test_app):
+    """Test that invalid records are skipped and reported by record number"""
+    client = test_app
+    lines = [
+        json.dumps({"ts": "2026-01-21T12:00:00", "label": "ok"}),
+        "{not json",
+        "",
+        json.dumps({"ts": "2026-01-21T12:00:00"}),
+        json.dumps({"ts": "2026-01-21T12:00:00", "label": "x" * 40}),
+        json.dumps({"ts": "2026-01-21T12:01:00", "label": "ok", "x": 3}),
+    ]
+
+    response = client.post(
+        "/events/import", content="\n".join(lines), headers={"Content-Type": "application/x-ndjson"}
+    )
+    data = response.json()
+    assert data["inserted"] == 2
+    assert data["rejected"] == 3
+    assert [error["index"] for error in data["errors"]] == [1, 2, 3]
+    assert data["errors"][0]["errors"][0]["type"] == "json_invalid"
+    assert data["errors"][1]["errors"][0]["loc"] == ["label"]
+    assert client.get("/events").json()["total"] == 2
+
+
+def test_import_rejects_unknown_body(test_app):
+    """Test that the body format must be given and a CSV needs the export header"""
+    client = test_app
+    assert client.post("/events/import", content="a,b\n1,2\n").status_code == 415
+
+    response = client.post("/events/import", params={"format": "csv"}, content="a,b\n1,2\n")
+    assert response.status_code == 400
+    assert "ts" in response.json()["detail"]
+
+
+def test_import_resumes_after_failure(test_app):
+    """Test that a failed import keeps committed transactions and resume skips exactly those"""
+    from src.event_tracker import importer
+    from src.event_tracker.db import get_conn
+
+    records = [{"ts": f"2026-01-21T12:{i:02d}:00", "label": "bulk"} for i in range(50)]
+
+    def failing():
+        for i, record in enumerate(records):
+            if i == 37:
+                raise OSError("disk went away")
+            yield record
+
+    conn = get_conn()
+    try:
+        with pytest.raises(OSError):
+            importer.import_records(conn, failing(), name="backfill", batch_size=4, commit_every=10)
+        assert importer.get_checkpoint(conn, "backfill")["records"] == 36
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 36
+
+        result = importer.import_records(
+            conn, iter(records), name="backfill", resume=True, batch_size=4, commit_every=10
+        )
+        assert result["records"] == 50
+        assert result["inserted"] == 50
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 50
+        assert conn.execute("SELECT COUNT(DISTINCT ts) FROM events").fetchone()[0] == 50
+    finally:
+        conn.close()
+
+
+def test_cli_import(test_app, tmp_path, capsys):
+    """Test that the import command loads a file, reports progress and resumes idempotently"""
+    from src.event_tracker.cli import main
+
+    path = tmp_path / "events.ndjson"
+    path.write_text(
+        "".join(
+            json.dumps({"ts": f"2026-01-21T12:00:{i:02d}", "label": "cli"}) + "\n"
+            for i in range(25)
+        )
+    )
+
+    assert main(["import", str(path), "--commit-every", "10", "--batch-size", "5"]) == 0
+    captured = capsys.readouterr()
+    assert "Imported 25 events" in captured.out
+    assert "10 records read" in captured.err
+
+    assert main(["import", str(path), "--resume"]) == 0
+    assert "Imported 25 events" in capsys.readouterr().out
+    assert test_app.get("/events").json()["total"] == 25
@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def seed(client):
+    """A few events across two months with free-text descriptions"""
+    events = [
+        {
+            "ts": "2026-01-05T10:00:00",
+            "label": "alarm",
+            "description": "Smoke detected in the café kitchen",
+            "x": 1.0,
+            "y": 1.0,
+        },
+        {
+            "ts": "2026-01-06T10:00:00",
+            "label": "door",
+            "description": "Door left open near the kitchen",
+            "x": 50.0,
+            "y": 50.0,
+        },
+        {
+            "ts": "2026-02-01T10:00:00",
+            "label": "kitchen",
+            "description": "Routine kitchen inspection",
+            "x": 2.0,
+            "y": 2.0,
+        },
+        {"ts": "2026-02-02T10:00:00", "label": "alarm", "description": None},
+    ]
+    assert client.post("/events/bulk", json=events).status_code == 201
+
+
+def test_search_matches_words_prefixes_and_phrases(test_app):
+    """Test that q matches label and description, ignoring case and accents"""
+    client = test_app
+    seed(client)
+
+    def labels(**params):
+        response = client.get("/events", params=params)
+        assert response.status_code == 200
+        return [item["label"] for item in response.json()["items"]], response.json()["total"]
+
+    assert labels(q="KITCHEN") == (["kitchen", "door", "alarm"], 3)
+    assert labels(q="cafe") == (["alarm"], 1)
+    assert labels(q="insp*") == (["kitchen"], 1)
+    assert labels(q='"open near"') == (["door"], 1)
+    assert labels(q="alarm smoke") == (["alarm"], 1)
+    assert labels(q="NEAR OR kitchen") == ([], 0)
+
+
+def test_search_combines_with_filters(test_app):
+    """Test that q combines with the time, label and bounding-box filters and the export"""
+    client = test_app
+    seed(client)
+
+    assert (
+        client.get("/events", params={"q": "kitchen", "start": "2026-01-06T00:00:00"}).json()[
+            "total"
+        ]
+        == 2
+    )
+    assert client.get("/events", params={"q": "kitchen", "label": "alarm"}).json()["total"] == 1
+    box = {"min_x": 0, "max_x": 10, "min_y": 0, "max_y": 10}
+    assert [
+        item["label"]
+        for item in client.get("/events", params={"q": "kitchen", **box}).json()["items"]
+    ] == ["kitchen", "alarm"]
+
+    response = client.get("/events/export", params={"q": "door"})
+    assert response.status_code == 200
+    assert response.text.count("\n") == 2
+
+
+def test_common_terms_walk_the_ts_index(test_app, monkeypatch):
+    """Test that searches with many matches return the same newest-first pages"""
+    from src.event_tracker import crud
+
+    client = test_app
+    seed(client)
+    expected = client.get("/events", params={"q": "kitchen", "limit": 2}).json()
+    monkeypatch.setattr(crud, "SEARCH_SORT_MAX_MATCHES", 1)
+    # Any write moves the generation, so the result cache cannot answer the repeat query
+    client.post("/events", json={"ts": "2025-12-01T00:00:00", "label": "old"})
+
+    response = client.get("/events", params={"q": "kitchen", "limit": 2}).json()
+    assert response["items"] == expected["items"]
+    assert response["next_cursor"] == expected["next_cursor"]
+    page = client.get("/events", params={"q": "kitchen", "cursor": response["next_cursor"]}).json()
+    assert [item["label"] for item in page["items"]] == ["alarm"]
+
+
+def test_search_ranks_by_relevance(test_app):
+    """Test that sort=relevance puts label matches first and needs q without a cursor"""
+    client = test_app
+    seed(client)
+
+    items = client.get("/events", params={"q": "kitchen", "sort": "relevance"}).json()["items"]
+    assert items[0]["label"] == "kitchen"
+    assert client.get("/events", params={"sort": "relevance"}).status_code == 400
+    assert client.get("/events", params={"q": "***"}).status_code == 400
+
+
+def test_deleted_events_leave_the_index(test_app):
+    """Test that deleting an event removes it from search results"""
+    client = test_app
+    seed(client)
+    event_id = client.get("/events", params={"q": "routine"}).json()["items"][0]["id"]
+
+    assert client.delete(f"/events/{event_id}").status_code == 204
+    assert client.get("/events", params={"q": "routine"}).json()["total"] == 0
+
+
+def test_migration_indexes_existing_events(test_app):
+    """Test that events stored before the search index existed become searchable"""
+    from src.event_tracker import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "old.db")
+        conn = sqlite3.connect(path, isolation_level=None)
+        for version, migration in enumerate(db.MIGRATIONS[:7]):
+            migration(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.executemany(
+            "INSERT INTO events (ts, label, description) VALUES (?, ?, ?)",
+            [
+                ("2026-01-01T00:00:00", "a", "broken sensor"),
+                ("2026-01-02T00:00:00", "b", "sensor fixed"),
+            ],
+        )
+        conn.close()
+
+        os.environ["EVENTS_DB_PATH"] = path
+        init_db()
+        from src.event_tracker.main import app
+
+        client = TestClient(app)
+        assert client.get("/events", params={"q": "sensor"}).json()["total"] == 2
+        client.post(
+            "/events", json={"ts": "2026-01-03T00:00:00", "label": "c", "description": "new sensor"}
+        )
+        assert client.get("/events", params={"q": "sensor"}).json()["total"] == 3
@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_list_page_matches_response_model_and_json_response(test_app):
+    """Test that the fast-path page validates as EventListResponse and is byte-identical to JSONResponse"""
+    from src.event_tracker.schemas import EventListResponse
+
+    client = test_app
+    client.post(
+        "/events",
+        json={
+            "ts": "2026-01-21T12:00:00",
+            "label": "crack",
+            "description": "Fissure près du pilier",
+            "x": 0.1,
+            "y": 2.5,
+        },
+    )
+    client.post("/events", json={"ts": "2026-01-21T12:00:01", "label": "rust", "source": "video"})
+
+    response = client.get("/events", params={"limit": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    page = EventListResponse.model_validate_json(response.content)
+    assert page.total == 2 and page.next_cursor is not None and page.items[0].label == "rust"
+    assert response.content == JSONResponse(response.json()).body
+
+    # Cache hits replay the same bytes
+    assert client.get("/events", params={"limit": 1}).content == response.content
+    second = client.get("/events", params={"cursor": page.next_cursor}).json()
+    assert second["items"][0]["description"] == "Fissure près du pilier"
+    assert second["items"][0]["x"] == 0.1
+
+    # The fast path enforces the model's page bounds itself
+    for params in ({"limit": 0}, {"limit": -2}, {"limit": 201}, {"offset": -1}):
+        assert client.get("/events", params=params).status_code == 422
+
+
+@pytest.mark.parametrize("backend", ["orjson", "stdlib"])
+def test_dumps_backends_render_like_json_response(backend, monkeypatch):
+    """Test that dumps() gives JSONResponse's bytes with orjson and with the stdlib fallback"""
+    from src.event_tracker import fastjson
+
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(fastjson, "orjson", None)
+    value = {
+        "total": None,
+        "total_exact": True,
+        "items": [
+            {
+                "id": 1,
+                "ts": "2026-01-21T12:00:00",
+                "label": "ünï",
+                "x": 0.1,
+                "y": 12.25,
+                "source": None,
+            }
+        ],
+    }
+    assert fastjson.dumps(value) == JSONResponse(value).body
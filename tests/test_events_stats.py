@@ -0,0 +1,166 @@
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+@pytest.fixture
+def seeded_app(test_app):
+    """App with a handful of events across two days"""
+    test_app.post(
+        "/events/bulk",
+        json=[
+            {"ts": "2026-01-21T10:05:00", "label": "crack", "source": "manual", "x": 1.0, "y": 1.0},
+            {"ts": "2026-01-21T10:45:00", "label": "crack", "source": "sensor", "x": 2.0, "y": 2.0},
+            {
+                "ts": "2026-01-21T10:50:00",
+                "label": "rust",
+                "source": "sensor",
+                "x": 50.0,
+                "y": 50.0,
+            },
+            {"ts": "2026-01-21T13:00:00", "label": "crack", "source": "sensor"},
+            {"ts": "2026-01-22T09:30:00", "label": "rust"},
+        ],
+    )
+    return test_app
+
+
+def test_stats_hourly_totals(seeded_app):
+    """Test hourly buckets without grouping"""
+    response = seeded_app.get("/events/stats?interval=hour")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["interval"] == "hour"
+    assert [(b["bucket"], b["count"]) for b in data["buckets"]] == [
+        ("2026-01-21T10:00:00", 3),
+        ("2026-01-21T13:00:00", 1),
+        ("2026-01-22T09:00:00", 1),
+    ]
+
+
+def test_stats_daily_by_label_and_source(seeded_app):
+    """Test daily buckets split by label and source"""
+    data = seeded_app.get("/events/stats?interval=day&group_by=label&group_by=source").json()
+    assert [(b["bucket"], b["label"], b["source"], b["count"]) for b in data["buckets"]] == [
+        ("2026-01-21T00:00:00", "crack", "manual", 1),
+        ("2026-01-21T00:00:00", "crack", "sensor", 2),
+        ("2026-01-21T00:00:00", "rust", "sensor", 1),
+        ("2026-01-22T00:00:00", "rust", None, 1),
+    ]
+
+
+def test_stats_with_filters(seeded_app):
+    """Test that stats honour the time, label and bbox filters"""
+    data = seeded_app.get(
+        "/events/stats?interval=minute&label=crack&start=2026-01-21T00:00:00&end=2026-01-21T23:59:59&min_x=0&max_x=10"
+    ).json()
+    assert [(b["bucket"], b["count"]) for b in data["buckets"]] == [
+        ("2026-01-21T10:05:00", 1),
+        ("2026-01-21T10:45:00", 1),
+    ]
+
+
+def test_stats_rejects_unknown_interval(seeded_app):
+    """Test that only minute, hour and day are accepted"""
+    assert seeded_app.get("/events/stats?interval=week").status_code == 422
+    assert seeded_app.get("/events/stats?group_by=description").status_code == 422
+
+
+def test_stats_from_rollups_match_raw_events(test_app, monkeypatch):
+    """Test that rollup-backed stats equal raw aggregation, including partial hours and deletes"""
+    import random
+
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+
+    rng = random.Random(7)
+    client = test_app
+    events = []
+    for _ in range(300):
+        event = {
+            "ts": f"2026-01-{rng.randint(20, 22)}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+            "label": rng.choice(["crack", "rust"]),
+            "source": rng.choice(["manual", "sensor", None]),
+        }
+        if rng.random() < 0.8:
+            event["x"] = rng.uniform(0, 100)
+        if rng.random() < 0.8:
+            event["y"] = rng.uniform(0, 100)
+        events.append(event)
+    ids = client.post("/events/bulk", json=events).json()["ids"]
+    for event_id in rng.sample(ids, 100):
+        client.delete(f"/events/{event_id}")
+
+    queries = [
+        {"interval": "hour"},
+        {"interval": "day", "group_by": ["label", "source"]},
+        {
+            "interval": "hour",
+            "group_by": ["source"],
+            "start": "2026-01-20T05:30:00",
+            "end": "2026-01-22T17:15:00",
+        },
+        {"interval": "day", "group_by": ["label"], "label": "rust", "start": "2026-01-21T00:00:00"},
+        {"interval": "hour", "end": "2026-01-21T08:59:59"},
+        {"interval": "hour", "start": "2026-01-21T10:20:00", "end": "2026-01-21T10:40:00"},
+    ]
+    conn = get_conn()
+    try:
+        for query in queries:
+            monkeypatch.setattr(crud, "USE_ROLLUPS", True)
+            from_rollups = crud.event_stats(conn, **query)
+            monkeypatch.setattr(crud, "USE_ROLLUPS", False)
+            from_events = crud.event_stats(conn, **query)
+            assert len(from_rollups) == len(from_events), query
+            for got, expected in zip(from_rollups, from_events):
+                assert got == {
+                    key: pytest.approx(value) if isinstance(value, float) else value
+                    for key, value in expected.items()
+                }, query
+    finally:
+        conn.close()
+
+
+def test_rebuild_rollups_command(seeded_app, capsys):
+    """Test that the CLI rebuild recreates the rollups from raw events"""
+    from src.event_tracker.cli import main
+    from src.event_tracker.db import get_conn
+
+    conn = get_conn()
+    conn.execute("DELETE FROM event_rollup_hourly")
+    conn.commit()
+    conn.close()
+    assert seeded_app.get("/events/stats?interval=day").json()["buckets"] == []
+
+    assert main(["rebuild-rollups"]) == 0
+    assert "Rebuilt 5 hourly rollup rows" in capsys.readouterr().out
+    buckets = seeded_app.get("/events/stats?interval=day").json()["buckets"]
+    assert [(b["bucket"], b["count"]) for b in buckets] == [
+        ("2026-01-21T00:00:00", 4),
+        ("2026-01-22T00:00:00", 1),
+    ]
+    assert buckets[0]["min_x"] == 1.0
+    assert buckets[0]["max_x"] == 50.0
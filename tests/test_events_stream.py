@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def messages(body: str) -> list[dict]:
+    """Parse an SSE body into (id, event, data) dicts, skipping comments and retry hints"""
+    parsed = []
+    for block in body.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1)
+            for line in block.splitlines()
+            if line and not line.startswith((":", "retry"))
+        )
+        if fields:
+            parsed.append(
+                {
+                    "id": fields.get("id"),
+                    "event": fields.get("event", "message"),
+                    "data": json.loads(fields["data"]),
+                }
+            )
+    return parsed
+
+
+def write_then_close(events: list[dict]) -> threading.Thread:
+    """Once a client has subscribed, create events through crud and end every stream"""
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+    from src.event_tracker.hub import get_hub
+    from src.event_tracker.schemas import EventCreate
+
+    def run():
+        hub = get_hub()
+        deadline = time.monotonic() + 5
+        while not hub.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+        conn = get_conn()
+        try:
+            for event in events:
+                crud.create_event(conn, EventCreate(**event))
+        finally:
+            conn.close()
+        hub.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_stream_pushes_matching_events(test_app):
+    """Test that new events matching the label and bbox filters are pushed with their ids"""
+    thread = write_then_close(
+        [
+            {"ts": "2026-01-21T12:00:00", "label": "crack", "x": 5, "y": 5},
+            {"ts": "2026-01-21T12:00:01", "label": "rust", "x": 5, "y": 5},
+            {"ts": "2026-01-21T12:00:02", "label": "crack", "x": 50, "y": 5},
+            {"ts": "2026-01-21T12:00:03", "label": "crack"},
+            {"ts": "2026-01-21T12:00:04", "label": "crack", "x": 9, "y": 0, "source": "video"},
+        ]
+    )
+    response = test_app.get(
+        "/events/stream", params={"label": "crack", "max_x": 10, "min_y": 0, "max_y": 10}
+    )
+    thread.join()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    received = messages(response.text)
+    assert [message["data"]["ts"] for message in received] == [
+        "2026-01-21T12:00:00",
+        "2026-01-21T12:00:04",
+    ]
+    assert [int(message["id"]) for message in received] == [1, 5]
+    assert received[1]["data"]["source"] == "video"
+
+
+def test_stream_resumes_after_last_event_id(test_app):
+    """Test that a reconnecting client first gets the events it missed, then live ones"""
+    client = test_app
+    client.post(
+        "/events/bulk",
+        json=[{"ts": f"2026-01-21T12:00:0{i}", "label": "a" if i % 2 else "b"} for i in range(6)],
+    )
+
+    thread = write_then_close([{"ts": "2026-01-21T13:00:00", "label": "a"}])
+    response = client.get("/events/stream", params={"label": "a"}, headers={"Last-Event-ID": "2"})
+    thread.join()
+
+    assert [int(message["id"]) for message in messages(response.text)] == [4, 6, 7]
+    assert client.get("/events/stream", headers={"Last-Event-ID": "x"}).status_code == 400
+
+
+def test_slow_consumer_policies():
+    """Test that a full queue disconnects the subscriber or drops its oldest events"""
+    from src.event_tracker.filters import EventFilters
+    from src.event_tracker.hub import EventHub, TooManySubscribers
+
+    events = [{"id": i, "label": "a", "source": None, "x": None, "y": None} for i in range(5)]
+
+    async def run(policy: str):
+        hub = EventHub(queue_size=3, policy=policy, max_subscribers=1)
+        subscription = hub.subscribe(asyncio.get_running_loop(), EventFilters(label="a"))
+        with pytest.raises(TooManySubscribers):
+            hub.subscribe(asyncio.get_running_loop(), EventFilters())
+        hub.publish(events)
+        batch = await subscription.next_batch(1)
+        hub.unsubscribe(subscription)
+        return batch, hub.stats()
+
+    batch, stats = asyncio.run(run("disconnect"))
+    assert batch is None
+    assert stats["disconnected"] == 1
+
+    batch, stats = asyncio.run(run("drop_oldest"))
+    assert [event["id"] for event in batch] == [2, 3, 4]
+    assert stats["dropped"] == 2
+    assert stats["subscribers"] == 0
+
+
+def test_stream_follows_other_writers(test_app):
+    """Test that events committed without this process's hub (another worker, an import) are streamed in id order"""
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+    from src.event_tracker.hub import get_hub
+    from src.event_tracker.schemas import EventCreate
+
+    def outside_write(conn, label: str) -> None:
+        # What another worker process's commit looks like from here: nothing is published
+        crud.insert_event_rows(conn, [("2026-01-21T12:00:00", label, None, None, None, None)])
+        conn.commit()
+
+    def run():
+        hub = get_hub()
+        deadline = time.monotonic() + 5
+        while not hub.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+        conn = get_conn()
+        try:
+            outside_write(conn, "first")
+            # Picked up by the follower's poll
+            while hub.last_id < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            outside_write(conn, "second")
+            # Publishing this one reads the unpublished one before it from the database first
+            crud.create_event(conn, EventCreate(ts="2026-01-21T12:00:01", label="third"))
+        finally:
+            conn.close()
+        hub.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    response = test_app.get("/events/stream")
+    thread.join()
+
+    received = messages(response.text)
+    assert [(int(message["id"]), message["data"]["label"]) for message in received] == [
+        (1, "first"),
+        (2, "second"),
+        (3, "third"),
+    ]
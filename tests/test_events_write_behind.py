@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker import ingest
+from src.event_tracker.db import init_db
+from src.event_tracker.schemas import EventCreate
+
+
+@pytest.fixture
+def test_app(monkeypatch):
+    """Create a fresh app with isolated DB and write-behind enabled for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    monkeypatch.setenv("EVENTS_WRITE_BEHIND", "1")
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    ingest.close_buffer()
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def test_committed_ack_returns_event(test_app):
+    """Test that the default ack waits for the group commit and returns the stored event"""
+    client = test_app
+
+    response = client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "note", "x": 1.5})
+    assert response.status_code == 201
+    data = response.json()
+    assert data["id"] == 1
+    assert data["label"] == "note"
+    assert client.get("/events/1").json() == data
+
+    # An offset is normalized to UTC, as the synchronous path and every read return it
+    data = client.post(
+        "/events", json={"ts": "2026-01-21T12:00:00+02:00", "label": "offset"}
+    ).json()
+    assert data["ts"] == "2026-01-21T10:00:00"
+    assert client.get(f"/events/{data['id']}").json() == data
+
+
+def test_accepted_ack_and_drain_on_shutdown(test_app):
+    """Test that accepted events are queued, answered with 202, and written on shutdown"""
+    client = test_app
+
+    for i in range(20):
+        response = client.post(
+            "/events?durability=accepted", json={"ts": "2026-01-21T12:00:00", "label": f"event_{i}"}
+        )
+        assert response.status_code == 202
+        assert response.json() == {"status": "accepted"}
+
+    ingest.close_buffer()
+    assert client.get("/events").json()["total"] == 20
+
+
+def test_events_are_grouped_into_batches():
+    """Test that events arriving within the window share one commit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["EVENTS_DB_PATH"] = os.path.join(tmp, "buffer.db")
+        init_db()
+        buffer = ingest.WriteBehindBuffer(max_batch=100, window=0.2)
+        try:
+            futures = [
+                buffer.submit(EventCreate(ts="2026-01-21T12:00:00", label="crack"))
+                for _ in range(30)
+            ]
+            ids = [future.result(timeout=5) for future in futures]
+        finally:
+            buffer.close()
+
+    assert ids == list(range(1, 31))
+    stats = buffer.stats()
+    assert stats["events"] == 30
+    assert stats["batches"] < 30
+    assert stats["depth"] == 0
+
+
+def test_closed_buffer_rejects_events():
+    """Test that nothing can be queued once shutdown has started"""
+    buffer = ingest.WriteBehindBuffer()
+    buffer.close()
+    with pytest.raises(ingest.BufferClosed):
+        buffer.submit(EventCreate(ts="2026-01-21T12:00:00", label="crack"))
+
+
+def test_failure_after_commit_is_not_retried(test_app, monkeypatch):
+    """Test that a batch failing after its commit (here in the hot window update) is not written again"""
+    from src.event_tracker import crud
+
+    class BrokenWindow:
+        def apply_inserts(self, ids, rows, write_gen):
+            raise RuntimeError("window update failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(crud, "get_hot_window", lambda: BrokenWindow())
+        buffer = ingest.WriteBehindBuffer(max_batch=10, window=0.05)
+        try:
+            future = buffer.submit(EventCreate(ts="2026-01-21T12:00:00", label="once"))
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        finally:
+            buffer.close()
+
+    assert test_app.get("/events", params={"label": "once"}).json()["total"] == 1
@@ -27,4 +27,43 @@ def test_health_check(test_app):
     client = test_app
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
\ No newline at end of file
+    assert response.json()["status"] == "ok"
+
+def test_health_reports_db_settings(test_app):
+    """Test /health exposes the PRAGMA values of the default profile"""
+    client = test_app
+    response = client.get("/health")
+    db = response.json()["db"]
+    assert db == {
+        "profile": "balanced",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    }
+
+def test_profile_and_overrides_from_env(monkeypatch):
+    """Test that a named preset is applied and single settings can be overridden"""
+    from src.event_tracker.db import get_conn, read_settings
+
+    monkeypatch.setenv("EVENTS_DB_PROFILE", "durable")
+    monkeypatch.setenv("EVENTS_DB_BUSY_TIMEOUT", "250")
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setenv("EVENTS_DB_PATH", os.path.join(tmp, "profile.db"))
+        conn = get_conn()
+        settings = read_settings(conn)
+        conn.close()
+
+    assert settings["synchronous"] == "FULL"
+    assert settings["mmap_size"] == 0
+    assert settings["busy_timeout"] == 250
+
+def test_unknown_profile_is_rejected(monkeypatch):
+    """Test that a typo in EVENTS_DB_PROFILE fails loudly"""
+    from src.event_tracker.db import get_db_settings
+
+    monkeypatch.setenv("EVENTS_DB_PROFILE", "fastest")
+    with pytest.raises(ValueError):
+        get_db_settings()
\ No newline at end of file
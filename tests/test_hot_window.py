@@ -0,0 +1,183 @@
+import os
+import random
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+from src.event_tracker.hotwindow import close_hot_window
+from src.event_tracker.timestamps import to_micros
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def test_app(monkeypatch):
+    """Create a fresh app with isolated DB for each test, with the hot window on and result caching off"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    monkeypatch.setenv("EVENTS_HOT_WINDOW_EVENTS", "1000")
+    monkeypatch.setenv("EVENTS_RESULT_CACHE_SIZE", "0")
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    close_hot_window()
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def seed(client, n: int = 300):
+    rng = random.Random(7)
+    events = []
+    for i in range(n):
+        event = {
+            "ts": f"2026-01-{20 + i % 3}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+            "label": rng.choice(["a", "b", "c"]),
+        }
+        if rng.random() < 0.7:
+            event.update(x=rng.uniform(0, 100), y=rng.uniform(0, 100))
+        if rng.random() < 0.5:
+            event["source"] = rng.choice(["cam", "manual"])
+        if rng.random() < 0.3:
+            event["description"] = rng.choice(["", "leak", "rust spot"])
+        events.append(event)
+    assert client.post("/events/bulk", json=events).status_code == 201
+
+
+def hot_stats(client):
+    return client.get("/health").json()["hot_window"]
+
+
+# Filter sets compared between the hot window and SQLite
+FILTER_CASES = [
+    {},
+    {"start": "2026-01-21T00:00:00", "end": "2026-01-21T12:30:00"},
+    {"label": ["a", "c"], "source": "cam"},
+    {"not_label": "b", "not_source": "manual", "has_description": True},
+    {"has_description": False, "min_x": 20.0, "max_x": 70.0, "min_y": 10.0},
+    {"label": "nope"},
+]
+
+
+def test_window_answers_like_sqlite(test_app, monkeypatch):
+    """Test that list pages, cursors, counts and stats from the window match SQLite's"""
+    from src.event_tracker import crud
+    from src.event_tracker.db import get_conn
+
+    seed(test_app)
+    conn = get_conn()
+
+    def both(fn, *args, **kwargs):
+        hot = fn(conn, *args, **kwargs)
+        with monkeypatch.context() as m:
+            m.setenv("EVENTS_HOT_WINDOW_EVENTS", "0")
+            return hot, fn(conn, *args, **kwargs)
+
+    for filters in FILTER_CASES:
+        hot, cold = both(crud.list_event_rows, limit=7, offset=3, **filters)
+        assert hot == cold
+        if cold:
+            after = (to_micros(cold[-1][1]), cold[-1][0])
+            hot, cold = both(crud.list_event_rows, limit=20, after=after, **filters)
+            assert hot == cold
+        hot, cold = both(crud.count_events, **filters)
+        assert hot == cold
+        for interval, group_by in (
+            ("hour", ["label"]),
+            ("day", ["label", "source"]),
+            ("minute", []),
+        ):
+            hot, cold = both(crud.event_stats, interval=interval, group_by=group_by, **filters)
+            assert [{k: v for k, v in b.items() if not k.startswith("avg")} for b in hot] == [
+                {k: v for k, v in b.items() if not k.startswith("avg")} for b in cold
+            ]
+            assert [b["avg_x"] for b in hot] == pytest.approx([b["avg_x"] for b in cold])
+    conn.close()
+
+    stats = hot_stats(test_app)
+    assert stats["size"] == 300 and stats["floor"] is None
+    assert stats["reloads"] == 1 and stats["misses"] == 0
+
+
+def test_crud_writes_keep_the_window_current(test_app):
+    """Test that creates and deletes are applied in place, without reloading"""
+    client = test_app
+    seed(client, 20)
+    assert client.get("/events", params={"limit": 1}).json()["total"] == 20
+
+    created = client.post(
+        "/events", json={"ts": "2026-01-23T08:00:00", "label": "new", "source": "cam"}
+    ).json()
+    page = client.get("/events", params={"limit": 1}).json()
+    assert page["total"] == 21 and page["items"][0] == created
+
+    assert client.delete(f"/events/{created['id']}").status_code == 204
+    assert client.get("/events", params={"label": "new"}).json()["total"] == 0
+
+    stats = hot_stats(client)
+    assert stats["reloads"] == 1 and stats["misses"] == 0 and stats["size"] == 20
+
+
+def test_partial_window_falls_back_to_sqlite(test_app, monkeypatch):
+    """Test that queries reaching past the window's floor go to SQLite"""
+    monkeypatch.setenv("EVENTS_HOT_WINDOW_EVENTS", "50")
+    client = test_app
+    seed(client)
+
+    newest = client.get("/events", params={"limit": 10, "include_total": "false"}).json()["items"]
+    assert hot_stats(client)["hits"] == 1
+    deep = client.get(
+        "/events", params={"limit": 10, "offset": 100, "include_total": "false"}
+    ).json()["items"]
+    assert hot_stats(client)["misses"] == 1
+    assert newest[0]["ts"] >= deep[0]["ts"]
+
+    floor = hot_stats(client)["floor"]
+    assert client.get("/events", params={"start": floor, "limit": 1}).json()["total"] < 50
+    assert (
+        client.get("/events", params={"start": "2026-01-20T00:00:00", "limit": 1}).json()["total"]
+        == 300
+    )
+    assert hot_stats(client)["size"] < 50
+
+
+def test_outside_writes_make_the_window_reload(test_app, monkeypatch):
+    """Test that a write the window was not told about is served by SQLite until a reload"""
+    from src.event_tracker import crud, hotwindow
+    from src.event_tracker.db import get_conn
+
+    client = test_app
+    seed(client, 20)
+    assert client.get("/events", params={"limit": 1}).json()["total"] == 20
+
+    conn = get_conn()
+    crud.insert_event_rows(conn, [("2026-01-23T09:00:00", "bulk", None, None, None, None)])
+    conn.commit()
+    conn.close()
+    assert client.get("/events", params={"limit": 1}).json()["items"][0]["label"] == "bulk"
+    assert hot_stats(client)["reloads"] == 1
+
+    monkeypatch.setattr(hotwindow, "RELOAD_INTERVAL_SECONDS", 0.0)
+    assert client.get("/events", params={"limit": 1}).json()["items"][0]["label"] == "bulk"
+    stats = hot_stats(client)
+    assert stats["reloads"] == 2 and stats["size"] == 21
+
+
+def test_missing_numpy_is_logged_once(monkeypatch, caplog):
+    """Test that without numpy the window is off and the warning is not repeated per request"""
+    from src.event_tracker import hotwindow
+
+    monkeypatch.setenv("EVENTS_HOT_WINDOW_EVENTS", "1000")
+    monkeypatch.setattr(hotwindow, "np", None)
+    monkeypatch.setattr(hotwindow, "_warned_no_numpy", False)
+    with caplog.at_level("WARNING", logger=hotwindow.__name__):
+        assert [hotwindow.get_hot_window() for _ in range(3)] == [None] * 3
+    assert len([record for record in caplog.records if "numpy" in record.getMessage()]) == 1
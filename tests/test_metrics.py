@@ -0,0 +1,100 @@
+import logging
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.db import init_db
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def sample(text: str, prefix: str) -> float:
+    """Value of the first metric line starting with `prefix`"""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample {prefix!r} in:\n{text}")
+
+
+def test_metrics_count_requests_crud_calls_and_exports(test_app):
+    """Test that /metrics reports per-route requests, crud SQL time and export serialization"""
+    client = test_app
+    before = client.get("/metrics").text
+    client.post(
+        "/events/bulk", json=[{"ts": f"2026-01-21T12:00:0{i}", "label": "a"} for i in range(3)]
+    )
+    client.get("/events/1")
+    client.get("/events/999")
+    client.get("/events", params={"label": "a", "include_total": "false"})
+    client.get("/events/export", params={"label": "a"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    def grew(prefix: str) -> float:
+        old = sample(before, prefix) if prefix in before else 0
+        return sample(text, prefix) - old
+
+    assert (
+        grew('events_http_requests_total{method="GET",route="/events/{event_id}",status="404"}')
+        == 1
+    )
+    assert grew('events_http_request_duration_seconds_count{method="GET",route="/events"}') == 1
+    assert grew('events_crud_duration_seconds_count{function="list_event_rows"}') == 1
+    assert grew('events_crud_sql_duration_seconds_count{function="create_events"}') == 1
+    assert grew('events_crud_rows_returned_sum{function="iter_events"}') == 3
+    assert grew('events_serialize_duration_seconds_count{format="csv"}') == 1
+    assert grew('events_serialize_duration_seconds_count{format="json"}') == 1
+    assert sample(text, 'events_crud_duration_seconds_bucket{function="get_event",le="+Inf"}') >= 2
+    assert "# TYPE events_db_pool_connections gauge" in text
+
+
+def test_slow_query_log_explains_the_plan(test_app, monkeypatch, caplog):
+    """Test that statements over the threshold are counted and logged with their query plan"""
+    from src.event_tracker.metrics import get_metrics
+
+    client = test_app
+    client.post("/events", json={"ts": "2026-01-21T12:00:00", "label": "crack"})
+    monkeypatch.setattr(get_metrics(), "slow_query_seconds", 0.0)
+
+    with caplog.at_level(logging.WARNING, logger="src.event_tracker.metrics"):
+        client.get("/events", params={"label": "crack", "include_total": "false"})
+
+    logged = [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("Slow query")
+    ]
+    assert any(
+        "ORDER BY ts DESC, id DESC" in message and "USING INDEX events_p202601_label_ts" in message
+        for message in logged
+    )
+    assert "events_slow_queries_total" in client.get("/metrics").text
+
+
+def test_metrics_can_be_disabled(test_app, monkeypatch):
+    """Test that EVENTS_METRICS=0 turns off /metrics"""
+    monkeypatch.setenv("EVENTS_METRICS", "0")
+    assert test_app.get("/metrics").status_code == 404
+    assert test_app.get("/health").status_code == 200
@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.event_tracker.cache import close_result_cache
+from src.event_tracker.db import init_db
+from src.event_tracker.timestamps import to_micros
+
+
+@pytest.fixture
+def test_app():
+    """Create a fresh app with isolated DB for each test"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".db") as f:
+        db_path = f.name
+
+    os.environ["EVENTS_DB_PATH"] = db_path
+    init_db()
+
+    # Import app AFTER setting env var
+    from src.event_tracker.main import app
+
+    yield TestClient(app)
+
+    # Cleanup
+    close_result_cache()
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+def seed(client):
+    client.post(
+        "/events/bulk",
+        json=[
+            {"ts": "2026-01-21T12:00:00", "label": "a", "x": 1.0},
+            {"ts": "2026-01-21T13:00:00", "label": "b", "x": 2.0},
+        ],
+    )
+
+
+def result_stats(client):
+    return client.get("/health").json()["result_cache"]
+
+
+def test_repeated_list_is_cached(test_app):
+    """Test that the same filters are answered from the cache until the next write"""
+    client = test_app
+    seed(client)
+
+    first = client.get("/events", params={"label": "a"})
+    second = client.get("/events", params={"label": "a"})
+    assert first.json() == second.json()
+    assert first.headers["etag"] == second.headers["etag"]
+    assert result_stats(client)["hits"] == 1
+
+    client.post("/events", json={"ts": "2026-01-21T14:00:00", "label": "a"})
+    third = client.get("/events", params={"label": "a"})
+    assert third.json()["total"] == 2
+    assert third.headers["etag"] != first.headers["etag"]
+
+
+def test_list_if_none_match(test_app):
+    """Test that a matching If-None-Match returns 304 until the data changes"""
+    client = test_app
+    seed(client)
+
+    etag = client.get("/events").headers["etag"]
+    response = client.get("/events", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert (
+        client.get("/events", params={"limit": 1}, headers={"If-None-Match": etag}).status_code
+        == 200
+    )
+
+    client.delete("/events/1")
+    assert client.get("/events", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_write_from_another_connection_invalidates(test_app):
+    """Test that inserts by another process are noticed through the write generation"""
+    client = test_app
+    seed(client)
+    etag = client.get("/events").headers["etag"]
+
+    other = sqlite3.connect(os.environ["EVENTS_DB_PATH"])
+    other.execute(
+        "INSERT INTO events (ts, label) VALUES (?, 'c')", (to_micros("2026-01-21T15:00:00"),)
+    )
+    other.commit()
+    other.close()
+
+    response = client.get("/events", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total"] == 3
+
+
+def test_export_etag_and_cache(test_app):
+    """Test that exports carry an ETag, honour If-None-Match and replay from the cache"""
+    client = test_app
+    seed(client)
+
+    first = client.get("/events/export")
+    etag = first.headers["etag"]
+    second = client.get("/events/export")
+    assert second.text == first.text
+    assert second.headers["content-type"].startswith("text/csv")
+    assert result_stats(client)["hits"] == 1
+    assert client.get("/events/export", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    client.post("/events", json={"ts": "2026-01-21T14:00:00", "label": "c"})
+    third = client.get("/events/export", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert len(third.text.splitlines()) == 4
+
+
+def test_generation_is_read_on_the_query_lanes(test_app, monkeypatch):
+    """Test that the list and export generation checks run on database lane threads"""
+    import threading
+
+    from src.event_tracker.cache import DataVersionWatch
+
+    client = test_app
+    seed(client)
+    threads = []
+    check = DataVersionWatch.check
+
+    def recording_check(self):
+        threads.append(threading.current_thread().name)
+        check(self)
+
+    monkeypatch.setattr(DataVersionWatch, "check", recording_check)
+    assert client.get("/events").status_code == 200
+    assert client.get("/events/export").status_code == 200
+
+    assert len(threads) == 2
+    assert threads[0].startswith("db-interactive")
+    assert threads[1].startswith("db-heavy")
+
+
+def test_result_cache_disabled(test_app, monkeypatch):
+    """Test that EVENTS_RESULT_CACHE_SIZE=0 turns off caching and ETags"""
+    monkeypatch.setenv("EVENTS_RESULT_CACHE_SIZE", "0")
+    close_result_cache()
+    client = test_app
+    seed(client)
+
+    response = client.get("/events")
+    assert response.json()["total"] == 2
+    assert "etag" not in response.headers